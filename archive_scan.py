@@ -0,0 +1,166 @@
+import os
+import zlib
+import tarfile
+import zipfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import lzma
+except ImportError:
+    # 没有编译 lzma 支持的 Python 上无法读取 .tar.xz
+    lzma = None
+
+
+# 作为压缩包扫描其成员的文件后缀（不区分大小写）
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+# 读取损坏或不支持的压缩包时可能出现的错误，统一转换为 OSError
+ARCHIVE_ERRORS = (zipfile.BadZipFile, zipfile.LargeZipFile, tarfile.TarError, EOFError, zlib.error,
+                  NotImplementedError, RuntimeError) + ((lzma.LZMAError,) if lzma is not None else ())
+
+
+def is_archive_name(name):
+    """按文件名判断是否为支持的压缩包"""
+    return name.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def _member_name(name):
+    """规范化包内路径，目录项、绝对路径中的前导 / 和指向包外的 .. 路径返回 None"""
+    name = name.replace("\\", "/")
+    parts = [part for part in name.split("/") if part not in ("", ".")]
+    if not parts or ".." in parts or name.endswith("/"):
+        return None
+    return "/".join(parts)
+
+
+class ArchiveIndex:
+    """扫描到的压缩包及其成员，成员无需解压到磁盘即可参与比对
+
+    成员的虚拟路径为 压缩包路径 + os.sep + 包内路径，就像压缩包所在位置下的一个目录，
+    因此可以和普通文件进入同一个文件名索引或大小分桶。read_members() 顺序读取一遍压缩包，
+    依次产出需要的成员，.tar.gz 这样只能顺序解压的格式也只需解压一次。
+    """
+
+    def __init__(self):
+        # 压缩包路径 -> (st_dev, st_size, st_mtime_ns)
+        self.archives = {}
+        # 虚拟路径 -> (压缩包路径, 包内路径)
+        self._members = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # 随检查点保存时不保存锁
+        state = dict(self.__dict__)
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _signature(st):
+        return (st.st_dev, st.st_size, st.st_mtime_ns)
+
+    def scan(self, archive_path):
+        """列出压缩包中的普通文件并登记，返回 [(虚拟路径, 大小)]；无法读取时抛出 OSError
+
+        重新扫描同一个压缩包时，先移除上一次登记的成员。
+        """
+        st = os.stat(archive_path)
+        members = {}
+        try:
+            if archive_path.lower().endswith(".zip"):
+                with zipfile.ZipFile(archive_path) as archive:
+                    for info in archive.infolist():
+                        name = _member_name(info.filename)
+                        if name is not None and not info.is_dir():
+                            members[name] = info.file_size
+            else:
+                with tarfile.open(archive_path) as archive:
+                    # 同名成员以最后出现的为准，与解压的结果一致
+                    for info in archive:
+                        name = _member_name(info.name)
+                        if name is not None and info.isfile():
+                            members[name] = info.size
+        except ARCHIVE_ERRORS as e:
+            raise OSError(f"无法读取压缩包 {archive_path}: {e}") from None
+
+        result = [(self.member_path(archive_path, name), size) for name, size in members.items()]
+        with self._lock:
+            self.forget(archive_path)
+            self.archives[archive_path] = self._signature(st)
+            for (path, _), name in zip(result, members):
+                self._members[path] = (archive_path, name)
+        return result
+
+    def forget(self, archive_path):
+        """移除压缩包及其成员的登记，返回被移除的成员虚拟路径"""
+        if self.archives.pop(archive_path, None) is None:
+            return []
+        prefix = archive_path + os.sep
+        removed = [path for path in self._members if path.startswith(prefix)]
+        for path in removed:
+            del self._members[path]
+        return removed
+
+    @staticmethod
+    def member_path(archive_path, name):
+        return os.path.join(archive_path, *name.split("/"))
+
+    def member(self, path):
+        """返回成员的 (压缩包路径, 包内路径)，path 不是压缩包成员时返回 None"""
+        return self._members.get(path)
+
+    def device(self, path):
+        """成员所在压缩包的设备号，用于按设备调度哈希任务"""
+        return self.archives[self._members[path][0]][0]
+
+    def signature(self, archive_path):
+        """压缩包登记时的 (st_dev, st_size, st_mtime_ns)"""
+        return self.archives.get(archive_path)
+
+    def _check_unchanged(self, archive_path):
+        st = os.stat(archive_path)
+        if self._signature(st) != self.archives.get(archive_path):
+            raise OSError(f"压缩包在扫描期间被修改: {archive_path}")
+
+    def read_members(self, archive_path, names):
+        """顺序读取一遍压缩包，依次产出 (包内路径, 只读文件对象)，只包括 names 中的成员
+
+        文件对象只在产出后、读取下一个成员之前有效；压缩包损坏时抛出 OSError。
+        """
+        self._check_unchanged(archive_path)
+        names = set(names)
+        try:
+            if archive_path.lower().endswith(".zip"):
+                with zipfile.ZipFile(archive_path) as archive:
+                    for info in archive.infolist():
+                        name = _member_name(info.filename)
+                        if name in names and not info.is_dir():
+                            with archive.open(info) as f:
+                                yield name, f
+            else:
+                # 流式模式只向前读取，压缩的 tar 包不会为了定位成员而反复解压
+                with tarfile.open(archive_path, mode="r|*") as archive:
+                    for info in archive:
+                        name = _member_name(info.name)
+                        if name in names and info.isfile():
+                            yield name, archive.extractfile(info)
+        except ARCHIVE_ERRORS as e:
+            raise OSError(f"无法读取压缩包 {archive_path}: {e}") from None
+
+    @contextmanager
+    def open_member(self, path):
+        """打开单个成员用于逐字节比较（tar 包需要从头读到该成员）"""
+        archive_path, name = self._members[path]
+        stream = self.read_members(archive_path, [name])
+        try:
+            for found, f in stream:
+                yield f
+                break
+            else:
+                raise OSError(f"压缩包中没有 {name}: {archive_path}")
+        finally:
+            stream.close()
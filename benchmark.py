@@ -0,0 +1,182 @@
+"""扫描引擎的基准测试
+
+在 create_test_files.py 生成的合成目录树上运行扫描引擎，报告每秒处理的文件数、
+峰值内存（RSS）和各阶段耗时。每个测试用例在独立的子进程中运行，峰值内存互不影响：
+
+    python benchmark.py --files 100000 --depth 4 --fanout 8 --json results.json
+    python benchmark.py --files 100000 --depth 4 --fanout 8 --compare results.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+
+import create_test_files
+from scan_engine import DuplicateScanner, MATCH_BY_NAME, MATCH_BY_CONTENT
+
+try:
+    import resource
+except ImportError:
+    # Windows 上没有 resource 模块，不报告峰值内存
+    resource = None
+
+
+# 与基线相比耗时增加超过该比例时视为性能退化
+DEFAULT_REGRESSION_THRESHOLD = 0.10
+
+
+def peak_rss():
+    """返回当前进程的峰值内存（字节），无法获取时返回 None"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 上单位为 KB，macOS 上为字节
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def run_case(folder, mode, workers, byte_compare=False):
+    """在当前进程中运行一次扫描，返回测量结果"""
+    started = time.perf_counter()
+    result = DuplicateScanner(folder, match_mode=mode, byte_compare=byte_compare, walk_workers=workers).run()
+    elapsed = time.perf_counter() - started
+    metrics = result.metrics.summary()
+    return {
+        'files': result.total_files,
+        'groups': len(result.duplicates),
+        'seconds': elapsed,
+        'files_per_sec': result.total_files / elapsed if elapsed else None,
+        'phases': {phase: times['wall'] for phase, times in metrics['phases'].items()},
+        'hashed_bytes': metrics['hash']['bytes'],
+        'peak_rss': peak_rss(),
+        'metrics': metrics,
+    }
+
+
+def run_case_isolated(folder, mode, workers, byte_compare=False):
+    """在新的子进程中运行一次扫描，使峰值内存只反映这一次扫描"""
+    command = [sys.executable, os.path.abspath(__file__), "--run-case", folder, mode, str(workers)]
+    if byte_compare:
+        command.append("--byte-compare")
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def case_name(mode, workers, byte_compare):
+    return f"{mode}-w{workers}" + ("-bytes" if byte_compare else "")
+
+
+def run_benchmark(folder, modes, workers_list, repeat, byte_compare=False):
+    """运行所有测试用例，每个用例重复 repeat 次取最快的一次"""
+    results = {}
+    for mode in modes:
+        for workers in workers_list:
+            runs = [run_case_isolated(folder, mode, workers, byte_compare and mode == MATCH_BY_CONTENT)
+                    for _ in range(repeat)]
+            results[case_name(mode, workers, byte_compare and mode == MATCH_BY_CONTENT)] = \
+                min(runs, key=lambda run: run['seconds'])
+    return results
+
+
+def format_report(results):
+    """生成文本报告"""
+    lines = [f"{'用例':<22}{'文件数':>10}{'耗时(s)':>10}{'文件/秒':>12}{'峰值内存(MB)':>14}  各阶段耗时(s)"]
+    for name, run in results.items():
+        rss = f"{run['peak_rss'] / 1024 / 1024:.1f}" if run['peak_rss'] else "-"
+        phases = ", ".join(f"{phase} {seconds:.3f}" for phase, seconds in run['phases'].items())
+        lines.append(f"{name:<22}{run['files']:>10}{run['seconds']:>10.3f}{run['files_per_sec']:>12.0f}{rss:>14}  {phases}")
+    return "\n".join(lines)
+
+
+def compare_results(results, baseline, threshold):
+    """与基线比较耗时，返回 (报告行列表, 是否有退化)"""
+    lines = []
+    regressed = False
+    for name, run in results.items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            continue
+        change = run['seconds'] / base['seconds'] - 1 if base['seconds'] else 0
+        flag = ""
+        if change > threshold:
+            flag = "  <-- 性能退化"
+            regressed = True
+        lines.append(f"{name:<22}{base['seconds']:>10.3f} -> {run['seconds']:<10.3f}{change:+.1%}{flag}")
+    return lines, regressed
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="在合成目录树上对扫描引擎做基准测试")
+    create_test_files.add_spec_arguments(parser)
+    parser.add_argument("--tree", default=None,
+                        help="合成目录树的位置；不存在时生成并保留，默认在临时目录中生成并在结束后删除")
+    parser.add_argument("--modes", default=f"{MATCH_BY_NAME},{MATCH_BY_CONTENT}", help="要测试的匹配方式，逗号分隔")
+    parser.add_argument("--workers", default="1,4", help="要测试的遍历线程数，逗号分隔")
+    parser.add_argument("--byte-compare", action="store_true", help="内容模式下启用逐字节校验")
+    parser.add_argument("--repeat", type=int, default=3, help="每个用例重复的次数，取最快的一次")
+    parser.add_argument("--json", default=None, help="把结果保存为 JSON 文件，可作为之后比较的基线")
+    parser.add_argument("--compare", default=None, help="与之前保存的 JSON 结果比较")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help="耗时增加超过该比例时视为性能退化（默认 0.10）")
+    parser.add_argument("--run-case", nargs=3, metavar=("FOLDER", "MODE", "WORKERS"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        folder, mode, workers = args.run_case
+        print(json.dumps(run_case(folder, mode, int(workers), args.byte_compare)))
+        return 0
+
+    spec = create_test_files.spec_from_args(args)
+    temp_dir = None
+    if args.tree is None:
+        temp_dir = tempfile.mkdtemp(prefix="dup_bench_")
+        tree = os.path.join(temp_dir, "tree")
+    else:
+        tree = args.tree
+
+    try:
+        if not os.path.isdir(tree) or not os.listdir(tree):
+            print(f"正在生成合成目录树: {tree}", file=sys.stderr)
+            stats = create_test_files.generate_tree(tree, spec)
+            print(f"已生成 {stats['files']} 个文件、{stats['dirs']} 个目录", file=sys.stderr)
+
+        modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+        workers_list = [int(workers) for workers in args.workers.split(",") if workers.strip()]
+        results = run_benchmark(tree, modes, workers_list, args.repeat, args.byte_compare)
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    print(format_report(results))
+
+    report = {
+        'spec': spec.to_dict(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'results': results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get('spec') != report['spec']:
+            print("警告: 基线使用的目录树参数不同，比较结果可能没有意义", file=sys.stderr)
+        lines, regressed = compare_results(results, baseline, args.threshold)
+        print("\n与基线比较:")
+        print("\n".join(lines))
+        if regressed:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
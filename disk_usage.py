@@ -0,0 +1,135 @@
+import os
+import json
+import heapq
+import bisect
+
+
+class DiskUsage:
+    """扫描时顺带统计的磁盘占用，不需要再遍历一次或另外运行 du
+
+    遍历每个目录时记录其中文件的大小（使用遍历时已有的 stat 结果），扫描结束后向上汇总出
+    每个目录（含子目录）的总大小，并按文件大小区间和扩展名分别统计文件数和字节数。
+    同一 inode 的多个硬链接只计一次。只统计参与扫描的文件：被过滤规则排除的文件不计入，
+    压缩包按其本身的大小计入，其中的文件不重复计入。
+    add_group() 记录每个内容重复组的副本数和其中一个路径，浪费的空间为 大小 × (副本数 - 1)。
+    """
+    # 文件大小区间的下界（字节），最后一个区间没有上界
+    SIZE_BINS = (0, 1024, 4 * 1024, 16 * 1024, 64 * 1024, 256 * 1024, 1024 ** 2, 4 * 1024 ** 2,
+                 16 * 1024 ** 2, 64 * 1024 ** 2, 256 * 1024 ** 2, 1024 ** 3, 4 * 1024 ** 3)
+
+    # 摘要中列出的目录、扩展名和重复组个数
+    TOP_ENTRIES = 20
+
+    def __init__(self, roots):
+        self.roots = list(roots)
+        # 目录路径 -> [直接包含的文件字节数, 文件数]
+        self._dirs = {}
+        # 每个大小区间的 [文件数, 字节数]
+        self.size_histogram = [[0, 0] for _ in self.SIZE_BINS]
+        # 扩展名（小写，没有扩展名时为空字符串）-> [文件数, 字节数]
+        self.extensions = {}
+        # 链接数大于 1 的已统计 inode
+        self._inodes = set()
+        # 内容重复组的组标识 -> (文件大小, 副本数, 其中一个路径)
+        self.groups = {}
+        self.total_files = 0
+        self.total_bytes = 0
+
+    def add_directory(self, dir_path, file_stats):
+        """记录一个目录中的文件 [(文件名, stat 结果)]"""
+        total = count = 0
+        for name, st in file_stats:
+            if st.st_nlink > 1:
+                key = (st.st_dev, st.st_ino)
+                if key in self._inodes:
+                    continue
+                self._inodes.add(key)
+            size = st.st_size
+            total += size
+            count += 1
+            bucket = self.size_histogram[bisect.bisect_right(self.SIZE_BINS, size) - 1]
+            bucket[0] += 1
+            bucket[1] += size
+            ext = os.path.splitext(name)[1].lower()
+            totals = self.extensions.get(ext)
+            if totals is None:
+                totals = self.extensions[ext] = [0, 0]
+            totals[0] += 1
+            totals[1] += size
+        entry = self._dirs.setdefault(dir_path, [0, 0])
+        entry[0] += total
+        entry[1] += count
+        self.total_files += count
+        self.total_bytes += total
+
+    def add_group(self, group_id, size, copies, path=None):
+        """记录一个内容重复组或重复目录组，path 为其中一个文件或目录，用于在报告中指出是哪一组"""
+        self.groups[group_id] = (size, copies, path)
+
+    @property
+    def wasted_bytes(self):
+        """删除所有多余副本可回收的字节数"""
+        return sum(size * (copies - 1) for size, copies, _ in self.groups.values())
+
+    def rollup(self):
+        """返回 目录路径 -> (总字节数, 文件数)，包括所有下级目录中的文件"""
+        totals = {path: list(entry) for path, entry in self._dirs.items()}
+        roots = set(self.roots)
+        # 下级目录总是比上级目录深，按深度从深到浅逐级累加到上级目录
+        for dir_path in sorted(totals, key=lambda path: path.count(os.sep), reverse=True):
+            if dir_path in roots:
+                continue
+            parent = os.path.dirname(dir_path)
+            if parent == dir_path:
+                continue
+            entry = totals[dir_path]
+            parent_entry = totals.setdefault(parent, [0, 0])
+            parent_entry[0] += entry[0]
+            parent_entry[1] += entry[1]
+        return {path: tuple(entry) for path, entry in totals.items()}
+
+    def top_directories(self, limit=TOP_ENTRIES):
+        """总大小最大的目录 [(目录路径, 总字节数, 文件数)]"""
+        return [(path, size, files) for path, (size, files) in
+                heapq.nlargest(limit, self.rollup().items(), key=lambda item: (item[1][0], item[0]))]
+
+    def top_extensions(self, limit=TOP_ENTRIES):
+        """总字节数最大的扩展名 [(扩展名, 文件数, 字节数)]"""
+        return [(ext, count, size) for ext, (count, size) in
+                heapq.nlargest(limit, self.extensions.items(), key=lambda item: (item[1][1], item[0]))]
+
+    def top_groups(self, limit=TOP_ENTRIES):
+        """可回收空间最大的重复组 [(组标识, 文件大小, 副本数, 可回收字节数, 其中一个路径)]"""
+        groups = [(group_id, size, copies, size * (copies - 1), path)
+                  for group_id, (size, copies, path) in self.groups.items()]
+        return heapq.nlargest(limit, groups, key=lambda group: (group[3], group[0]))
+
+    def size_bins(self):
+        """文件大小区间的统计 [(下界, 上界或 None, 文件数, 字节数)]"""
+        bounds = list(self.SIZE_BINS[1:]) + [None]
+        return [(low, high, count, size) for low, high, (count, size) in zip(self.SIZE_BINS, bounds, self.size_histogram)]
+
+    def summary(self, limit=TOP_ENTRIES):
+        """返回可直接序列化为 JSON 的统计摘要"""
+        return {
+            'roots': self.roots,
+            'files': self.total_files,
+            'bytes': self.total_bytes,
+            'wasted_bytes': self.wasted_bytes,
+            'duplicate_groups': len(self.groups),
+            'top_directories': [{'path': path, 'bytes': size, 'files': files}
+                                for path, size, files in self.top_directories(limit)],
+            'size_histogram': [{'min': low, 'max': high, 'files': count, 'bytes': size}
+                               for low, high, count, size in self.size_bins()],
+            'extensions': [{'extension': ext, 'files': count, 'bytes': size}
+                           for ext, count, size in self.top_extensions(limit)],
+            'top_groups': [{'group': group_id, 'size': size, 'copies': copies, 'wasted_bytes': wasted, 'path': path}
+                           for group_id, size, copies, wasted, path in self.top_groups(limit)],
+        }
+
+    def write_json(self, path, limit=TOP_ENTRIES):
+        """把统计摘要写入 JSON 文件"""
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(limit), f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
@@ -1,494 +1,1450 @@
-import os
-import sys
-import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
-from collections import Counter
-import threading
-import platform
-
-class FileDuplicateChecker:
-    # 应用程序信息
-    APP_VERSION = "1.0.0"
-    
-    def __init__(self, root):
-        self.root = root
-        self.root.title(f"文件重复检查工具 v{self.APP_VERSION}")
-        self.root.geometry("700x500")
-        self.root.resizable(True, True)
-        
-        # 尝试设置窗口图标
-        self._set_window_icon()
-        
-        # 设置中文字体支持
-        self._setup_fonts()
-        
-        # 扫描控制变量
-        self.scanning = False
-        self.scan_thread = None
-        
-        # 确保应用程序正确退出
-        self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
-        
-        # 创建主框架
-        self.main_frame = ttk.Frame(root, padding="20")
-        self.main_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # 创建文件夹选择区域
-        self.folder_frame = ttk.Frame(self.main_frame)
-        self.folder_frame.pack(fill=tk.X, pady=(0, 15))
-        
-        self.folder_label = ttk.Label(self.folder_frame, text="选择文件夹:", font=('SimHei', 10))
-        self.folder_label.pack(side=tk.LEFT, padx=(0, 10))
-        
-        self.folder_path_var = tk.StringVar()
-        self.folder_entry = ttk.Entry(self.folder_frame, textvariable=self.folder_path_var, width=50, font=('SimHei', 10))
-        self.folder_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
-        
-        self.browse_button = ttk.Button(self.folder_frame, text="浏览...", command=self.browse_folder)
-        self.browse_button.pack(side=tk.RIGHT)
-        
-        # 创建扫描控制区域
-        self.scan_control_frame = ttk.Frame(self.main_frame)
-        self.scan_control_frame.pack(fill=tk.X, pady=(0, 15))
-        
-        # 创建扫描按钮
-        self.scan_button = ttk.Button(self.scan_control_frame, text="开始扫描", command=self.scan_files)
-        self.scan_button.pack(side=tk.LEFT, padx=(0, 10))
-        
-        # 创建取消按钮
-        self.cancel_button = ttk.Button(self.scan_control_frame, text="取消扫描", command=self.cancel_scan, state=tk.DISABLED)
-        self.cancel_button.pack(side=tk.LEFT)
-        
-        # 创建进度条
-        self.progress_var = tk.DoubleVar()
-        self.progress_bar = ttk.Progressbar(self.scan_control_frame, variable=self.progress_var, length=300, mode='determinate')
-        self.progress_bar.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(10, 0))
-        
-        # 添加键盘快捷键
-        self.root.bind("<Return>", lambda event: self.scan_files())
-        self.root.bind("<KP_Enter>", lambda event: self.scan_files())  # 小键盘的Enter键
-        
-        # 设置浏览按钮的快捷键
-        self.browse_button.bind("<Return>", lambda event: self.browse_folder())
-        self.browse_button.bind("<KP_Enter>", lambda event: self.browse_folder())
-        
-        # 创建结果显示区域
-        self.result_frame = ttk.LabelFrame(self.main_frame, text="扫描结果")
-        self.result_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 15))
-        
-        # 创建结果树状视图
-        columns = ("filename", "count", "locations")
-        self.result_tree = ttk.Treeview(self.result_frame, columns=columns, show="headings")
-        
-        # 设置列宽和标题
-        self.result_tree.heading("filename", text="文件名")
-        self.result_tree.heading("count", text="重复次数")
-        self.result_tree.heading("locations", text="位置")
-        
-        self.result_tree.column("filename", width=150, anchor=tk.W)
-        self.result_tree.column("count", width=80, anchor=tk.CENTER)
-        self.result_tree.column("locations", width=350, anchor=tk.W)
-        
-        # 添加垂直滚动条
-        vscrollbar = ttk.Scrollbar(self.result_frame, orient=tk.VERTICAL, command=self.result_tree.yview)
-        self.result_tree.configure(yscroll=vscrollbar.set)
-        
-        # 添加水平滚动条
-        hscrollbar = ttk.Scrollbar(self.result_frame, orient=tk.HORIZONTAL, command=self.result_tree.xview)
-        self.result_tree.configure(xscroll=hscrollbar.set)
-        
-        # 放置树状视图和滚动条
-        self.result_tree.grid(row=0, column=0, sticky=tk.NSEW)
-        vscrollbar.grid(row=0, column=1, sticky=tk.NS)
-        hscrollbar.grid(row=1, column=0, sticky=tk.EW)
-        
-        # 配置网格权重，使树状视图能够随窗口大小调整
-        self.result_frame.grid_rowconfigure(0, weight=1)
-        self.result_frame.grid_columnconfigure(0, weight=1)
-        
-        # 添加双击事件绑定，用于显示详细信息
-        self.result_tree.bind("\u003cDouble-1\u003e", self.show_file_details)
-        
-        # 添加右键菜单支持
-        self.result_tree.bind("\u003cButton-3\u003e", self.show_context_menu)
-        self._create_context_menu()
-        
-        # 添加排序功能
-        self.sort_column = None
-        self.sort_order = "ascending"
-        for col in ("filename", "count", "locations"):
-            self.result_tree.heading(col, text=self.result_tree.heading(col)["text"], 
-                                    command=lambda _col=col: self.sort_by_column(_col))
-        
-        # 创建底部状态栏
-        self.status_frame = ttk.Frame(self.main_frame)
-        self.status_frame.pack(fill=tk.X, side=tk.BOTTOM, pady=(10, 0))
-        
-        # 创建统计信息标签
-        self.stats_var = tk.StringVar(value="准备就绪，请选择文件夹并点击扫描按钮")
-        self.stats_label = ttk.Label(self.status_frame, textvariable=self.stats_var, font=('SimHei', 10))
-        self.stats_label.pack(side=tk.LEFT, padx=(5, 10))
-        
-        # 创建版本信息标签
-        self.version_label = ttk.Label(self.status_frame, text=f"v{self.APP_VERSION}", font=('SimHei', 8))
-        self.version_label.pack(side=tk.RIGHT, padx=5)
-        
-        # 存储完整的文件路径信息，用于右键菜单和详细信息显示
-        self.full_file_info = {}
-        
-        # 欢迎信息
-        self._show_welcome_message()
-    
-    def _setup_fonts(self):
-        """设置中文字体支持"""
-        self.style = ttk.Style()
-        
-        # 根据操作系统调整字体设置
-        system = platform.system()
-        if system == "Windows":
-            # Windows 系统通常支持 SimHei 或 Microsoft YaHei
-            default_font = ('Microsoft YaHei UI', 9)
-        elif system == "Darwin":  # macOS
-            default_font = ('Heiti TC', 9)
-        else:  # Linux 或其他系统
-            default_font = ('WenQuanYi Micro Hei', 9)
-        
-        # 设置默认字体样式
-        self.style.configure('.', font=default_font)
-        
-    def _set_window_icon(self):
-        """尝试设置窗口图标"""
-        # 在实际使用中，可以添加自定义图标
-        # 这里只是一个示例，实际使用时需要提供图标文件路径
-        try:
-            # 这里可以添加图标设置代码，例如：
-            # icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'icon.ico')
-            # if os.path.exists(icon_path):
-            #     self.root.iconbitmap(icon_path)
-            pass
-        except Exception:
-            # 如果图标设置失败，静默忽略
-            pass
-    
-    def _show_welcome_message(self):
-        """显示欢迎信息"""
-        # 可以在这里添加欢迎信息或使用提示
-        pass
-    
-    def _on_closing(self):
-        """处理窗口关闭事件"""
-        if self.scanning:
-            if messagebox.askyesno("确认退出", "扫描正在进行中，确定要退出吗？"):
-                self.scanning = False
-                # 等待扫描线程结束
-                if self.scan_thread and self.scan_thread.is_alive():
-                    self.scan_thread.join(timeout=1.0)  # 等待最多1秒
-                self.root.destroy()
-        else:
-            self.root.destroy()
-    
-    def browse_folder(self):
-        """打开文件夹选择对话框"""
-        try:
-            # 设置对话框的初始目录为当前选择的目录
-            initial_dir = self.folder_path_var.get()
-            if not initial_dir or not os.path.isdir(initial_dir):
-                initial_dir = os.path.expanduser("~")  # 使用用户主目录作为默认目录
-                
-            folder_path = filedialog.askdirectory(
-                initialdir=initial_dir,
-                title="选择要扫描的文件夹",
-                mustexist=True  # 确保选择的是已存在的文件夹
-            )
-            
-            if folder_path:
-                self.folder_path_var.set(folder_path)
-                # 自动聚焦到扫描按钮，方便用户按Enter键开始扫描
-                self.scan_button.focus_set()
-        except Exception as e:
-            messagebox.showerror("错误", f"选择文件夹时发生错误: {str(e)}")
-    
-    def scan_files(self):
-        """开始扫描过程，在单独的线程中执行以避免UI冻结"""
-        folder_path = self.folder_path_var.get()
-        
-        if not folder_path or not os.path.isdir(folder_path):
-            messagebox.showerror("错误", "请选择有效的文件夹路径")
-            return
-        
-        # 防止重复点击
-        self.scan_button.config(state=tk.DISABLED)
-        self.cancel_button.config(state=tk.NORMAL)
-        self.progress_var.set(0)
-        
-        # 清空结果树
-        for item in self.result_tree.get_children():
-            self.result_tree.delete(item)
-        
-        # 更新状态
-        self.stats_var.set("正在计算文件总数...")
-        self.root.update()
-        
-        # 开始在单独线程中扫描
-        self.scanning = True
-        self.scan_thread = threading.Thread(target=self._scan_files_thread, args=(folder_path,))
-        self.scan_thread.daemon = True  # 使线程在主程序退出时自动终止
-        self.scan_thread.start()
-        
-        # 开始检查扫描进度
-        self._check_scan_progress()
-    
-    def _count_total_files(self, folder_path):
-        """计算文件夹中的文件总数"""
-        total = 0
-        try:
-            for _, _, files in os.walk(folder_path):
-                total += len(files)
-                # 允许在计数过程中取消
-                if not self.scanning:
-                    return -1
-        except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("错误", f"计算文件数量时出错: {str(e)}"))
-            return -1
-        return total
-    
-    def _scan_files_thread(self, folder_path):
-        """在单独线程中执行的扫描逻辑"""
-        try:
-            # 先计算文件总数，用于进度显示
-            total_files = self._count_total_files(folder_path)
-            if total_files == -1 or not self.scanning:
-                self.root.after(0, self._reset_scan_ui)
-                return
-            
-            # 存储文件名和对应的路径
-            file_dict = {}
-            processed_files = 0
-            
-            # 递归扫描文件夹
-            for root_dir, _, files in os.walk(folder_path):
-                for filename in files:
-                    # 检查是否取消扫描
-                    if not self.scanning:
-                        self.root.after(0, self._reset_scan_ui)
-                        return
-                    
-                    # 处理文件
-                    if filename in file_dict:
-                        file_dict[filename].append(root_dir)
-                    else:
-                        file_dict[filename] = [root_dir]
-                    
-                    # 更新进度
-                    processed_files += 1
-                    progress = (processed_files / total_files) * 100
-                    self.root.after(0, lambda p=progress: self.progress_var.set(p))
-                    
-                    # 每处理100个文件更新一次状态，避免UI过于频繁刷新
-                    if processed_files % 100 == 0:
-                        self.root.after(0, lambda pf=processed_files, tf=total_files: 
-                                       self.stats_var.set(f"正在扫描文件... {pf}/{tf} ({int(pf/tf*100)}%)"))
-            
-            if not self.scanning:
-                self.root.after(0, self._reset_scan_ui)
-                return
-            
-            # 找出重复的文件名
-            duplicate_files = {name: paths for name, paths in file_dict.items() if len(paths) > 1}
-            
-            # 按重复次数排序
-            sorted_duplicates = sorted(duplicate_files.items(), key=lambda x: len(x[1]), reverse=True)
-            
-            # 在主线程中更新UI显示结果
-            self.root.after(0, lambda duplicates=sorted_duplicates, total=total_files: 
-                           self._display_results(duplicates, total))
-            
-        except PermissionError:
-            self.root.after(0, lambda: messagebox.showerror("权限错误", "无法访问某些文件或文件夹，请检查权限后重试。"))
-            self.root.after(0, lambda: self.stats_var.set("扫描失败：权限不足"))
-            self.root.after(0, self._reset_scan_ui)
-        except Exception as e:
-            self.root.after(0, lambda err=str(e): messagebox.showerror("错误", f"扫描过程中发生错误: {err}"))
-            self.root.after(0, lambda: self.stats_var.set("扫描失败，请重试"))
-            self.root.after(0, self._reset_scan_ui)
-    
-    def _display_results(self, sorted_duplicates, total_files):
-        """在主线程中显示扫描结果"""
-        # 清空之前的文件信息
-        self.full_file_info.clear()
-        
-        # 在结果树中显示重复文件
-        for filename, paths in sorted_duplicates:
-            # 限制显示的路径数量，避免UI过于拥挤
-            display_paths = paths[:3]
-            path_text = "; ".join(display_paths)
-            if len(paths) > 3:
-                path_text += f"; ...等{len(paths) - 3}个位置"
-            
-            # 插入结果并保存完整信息
-            item_id = self.result_tree.insert("", tk.END, values=(filename, len(paths), path_text))
-            self.full_file_info[item_id] = (filename, paths)
-        
-        # 更新统计信息
-        self.stats_var.set(f"扫描完成。总共扫描了 {total_files} 个文件，发现 {len(sorted_duplicates)} 个重复的文件名。")
-        
-        # 重置UI状态
-        self._reset_scan_ui()
-    
-    def _create_context_menu(self):
-        """创建右键菜单"""
-        self.context_menu = tk.Menu(self.root, tearoff=0)
-        self.context_menu.add_command(label="复制文件名", command=self.copy_filename)
-        self.context_menu.add_command(label="查看所有位置", command=self.show_file_details)
-        self.context_menu.add_command(label="复制所有位置", command=self.copy_all_locations)
-        self.context_menu.add_separator()
-        self.context_menu.add_command(label="清空结果", command=self.clear_results)
-    
-    def show_context_menu(self, event):
-        """显示右键菜单"""
-        # 选中点击的项目
-        item = self.result_tree.identify_row(event.y)
-        if item:
-            self.result_tree.selection_set(item)
-            self.result_tree.focus(item)
-            # 显示菜单
-            self.context_menu.post(event.x_root, event.y_root)
-    
-    def show_file_details(self, event=None):
-        """显示文件的详细信息，包括所有位置"""
-        selected_items = self.result_tree.selection()
-        if not selected_items:
-            return
-        
-        item_id = selected_items[0]
-        if item_id not in self.full_file_info:
-            return
-        
-        filename, all_paths = self.full_file_info[item_id]
-        
-        # 创建新窗口显示详细信息
-        detail_window = tk.Toplevel(self.root)
-        detail_window.title(f"文件详情: {filename}")
-        detail_window.geometry("600x400")
-        detail_window.resizable(True, True)
-        
-        # 创建标签显示文件名
-        ttk.Label(detail_window, text=f"文件名: {filename}", font=('SimHei', 10, 'bold')).pack(pady=(10, 5), padx=10, anchor=tk.W)
-        ttk.Label(detail_window, text=f"出现次数: {len(all_paths)}", font=('SimHei', 10)).pack(pady=(0, 10), padx=10, anchor=tk.W)
-        
-        # 创建带滚动条的文本框显示所有路径
-        text_frame = ttk.Frame(detail_window)
-        text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
-        
-        text_widget = tk.Text(text_frame, wrap=tk.WORD, font=('SimHei', 9))
-        
-        scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=text_widget.yview)
-        text_widget.configure(yscrollcommand=scrollbar.set)
-        
-        text_widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        # 插入所有路径
-        for i, path in enumerate(all_paths, 1):
-            full_path = os.path.join(path, filename)
-            text_widget.insert(tk.END, f"{i}. {full_path}\n")
-        
-        # 使文本框只读
-        text_widget.config(state=tk.DISABLED)
-    
-    def copy_filename(self):
-        """复制选中文件的文件名到剪贴板"""
-        selected_items = self.result_tree.selection()
-        if not selected_items:
-            return
-        
-        item_id = selected_items[0]
-        if item_id not in self.full_file_info:
-            return
-        
-        filename, _ = self.full_file_info[item_id]
-        self.root.clipboard_clear()
-        self.root.clipboard_append(filename)
-        self.stats_var.set(f"已复制文件名: {filename}")
-    
-    def copy_all_locations(self):
-        """复制选中文件的所有位置到剪贴板"""
-        selected_items = self.result_tree.selection()
-        if not selected_items:
-            return
-        
-        item_id = selected_items[0]
-        if item_id not in self.full_file_info:
-            return
-        
-        filename, all_paths = self.full_file_info[item_id]
-        
-        # 构建完整的文件路径
-        full_paths = [os.path.join(path, filename) for path in all_paths]
-        paths_text = "\n".join(full_paths)
-        
-        self.root.clipboard_clear()
-        self.root.clipboard_append(paths_text)
-        self.stats_var.set(f"已复制 {len(all_paths)} 个文件位置到剪贴板")
-    
-    def clear_results(self):
-        """清空结果列表"""
-        for item in self.result_tree.get_children():
-            self.result_tree.delete(item)
-        self.full_file_info.clear()
-        self.stats_var.set("结果已清空")
-    
-    def sort_by_column(self, col):
-        """按指定列排序结果"""
-        # 切换排序顺序
-        if self.sort_column == col:
-            self.sort_order = "descending" if self.sort_order == "ascending" else "ascending"
-        else:
-            self.sort_column = col
-            self.sort_order = "ascending"
-        
-        # 获取所有项目
-        items = [(self.result_tree.set(k, col), k) for k in self.result_tree.get_children('')]
-        
-        # 根据列类型进行排序
-        if col == "count":  # 数字列
-            items.sort(key=lambda t: int(t[0]), reverse=(self.sort_order == "descending"))
-        else:  # 文本列
-            items.sort(key=lambda t: t[0].lower(), reverse=(self.sort_order == "descending"))
-        
-        # 重新排列项目
-        for i, (val, k) in enumerate(items):
-            self.result_tree.move(k, '', i)
-        
-        # 更新标题，显示排序指示
-        for c in ("filename", "count", "locations"):
-            if c == col:
-                arrow = "↓" if self.sort_order == "descending" else "↑"
-                self.result_tree.heading(c, text=f"{self.result_tree.heading(c)['text']} {arrow}")
-            else:
-                # 移除其他列的排序指示
-                original_text = self.result_tree.heading(c)["text"].strip()
-                if original_text.endswith(" ↑") or original_text.endswith(" ↓"):
-                    self.result_tree.heading(c, text=original_text[:-2])
-    
-    def _check_scan_progress(self):
-        """检查扫描进度并更新UI"""
-        if self.scanning and self.scan_thread.is_alive():
-            self.root.after(100, self._check_scan_progress)  # 每100ms检查一次
-    
-    def cancel_scan(self):
-        """取消正在进行的扫描"""
-        self.scanning = False
-        self.stats_var.set("正在取消扫描...")
-        
-    def _reset_scan_ui(self):
-        """重置扫描相关的UI组件状态"""
-        self.scanning = False
-        self.scan_button.config(state=tk.NORMAL)
-        self.cancel_button.config(state=tk.DISABLED)
-        self.progress_var.set(0)
-
-if __name__ == "__main__":
-    root = tk.Tk()
-    app = FileDuplicateChecker(root)
+import os
+import sys
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+from collections import Counter
+import threading
+import platform
+import queue
+import time
+
+import scan_engine
+from scan_engine import ContentMatcher, DuplicateScanner, FolderKey, ScanProgress, content_result, hardlink_result, \
+    archive_members, name_duplicates, name_key_result, normalize_roots, root_of, root_labels, usage_report
+from archive_scan import is_archive_name
+from scan_checkpoint import ScanCheckpoint
+from scan_metrics import ScanMetrics
+from scan_filter import ScanFilter, COMMON_PRUNE_PATTERNS, parse_size, split_patterns
+from io_throttle import IOThrottle
+from name_index import NameKey
+from fs_watch import DirectoryWatcher, MultiRootWatcher, EVENT_CREATED, EVENT_DELETED, EVENT_MODIFIED
+from result_view import ResultModel, VirtualTreeview, VirtualTextList
+from reclaim import ReclaimJournal, Reclaimer, build_plan, groups_from_rows, folder_groups_from_rows, ACTION_LABELS, \
+    ACTION_HARDLINK, ACTION_REFLINK, ACTION_DELETE, KEEP_NEWEST, KEEP_PREFERRED_ROOT
+
+
+class FileDuplicateChecker:
+    # 应用程序信息
+    APP_VERSION = "1.0.0"
+    
+    # 匹配方式
+    MATCH_BY_NAME = scan_engine.MATCH_BY_NAME
+    MATCH_BY_CONTENT = scan_engine.MATCH_BY_CONTENT
+    MATCH_MODE_LABELS = {MATCH_BY_NAME: "按文件名", MATCH_BY_CONTENT: "按文件内容"}
+    
+    # 结果列及其标题
+    RESULT_COLUMNS = ("filename", "count", "wasted", "locations")
+    COLUMN_HEADINGS = {"filename": "文件名", "count": "重复次数", "wasted": "可节省空间", "locations": "位置"}
+    
+    # 目录遍历线程数：1 表示串行遍历，网络文件系统上可适当调大
+    DEFAULT_WALK_WORKERS = DuplicateScanner.DEFAULT_WALK_WORKERS
+    MAX_WALK_WORKERS = DuplicateScanner.MAX_WALK_WORKERS
+    
+    # 界面读取扫描进度的间隔（毫秒）
+    PROGRESS_POLL_INTERVAL = 100
+    
+    # 监视模式下界面应用增量更新的间隔（毫秒）
+    WATCH_POLL_INTERVAL = 200
+    # 监视线程通知重复目录结果已失效时使用的更新键
+    WATCH_FOLDERS_STALE = object()
+    
+    # 扫描期间把已确认的重复组合并到结果列表的最短间隔（秒），每次合并都要重新排序
+    STREAM_INTERVAL = 1.0
+    
+    def __init__(self, root):
+        self.root = root
+        self.root.title(f"文件重复检查工具 v{self.APP_VERSION}")
+        self.root.geometry("700x500")
+        self.root.resizable(True, True)
+        
+        # 尝试设置窗口图标
+        self._set_window_icon()
+        
+        # 设置中文字体支持
+        self._setup_fonts()
+        
+        # 扫描控制变量
+        self.scanning = False
+        self.scan_thread = None
+        self.scanner = None
+        # 关闭窗口时正在等待扫描线程保存进度
+        self._closing = False
+        self.progress = ScanProgress()
+        # 最近一次扫描的性能指标，可导出为 JSON
+        self.last_metrics = None
+        # 最近一次扫描顺带得到的磁盘占用统计（DiskUsage）
+        self.last_usage = None
+        # 正在执行的空间回收，reclaiming 置为 False 时在当前文件处理完后停止
+        self.reclaimer = None
+        self.reclaiming = False
+        # 结果中是否有可以回收空间的重复组，随结果到达更新，扫描结束时据此启用“清理重复”
+        self.has_reclaimable = False
+        
+        # 监视模式：保留最近一次扫描的内存索引，并根据文件系统事件增量更新
+        self.last_scan = None
+        self.watcher = None
+        self.watch_state = None
+        self.watch_matcher = None
+        self.watch_lock = threading.Lock()
+        self.watch_updates = queue.Queue()
+        self._watch_pump_id = None
+        # 扫描线程确认的重复组，由界面线程定时合并到结果列表：(分组键, 组标识, 路径列表或目录)
+        self.stream_updates = queue.Queue()
+        # 本次扫描已显示的重复组：内容模式为 文件大小 -> {组标识: 路径列表}，名称模式为 文件名 -> 目录列表
+        self._streamed = {}
+        self._stream_applied_at = 0.0
+        
+        # 确保应用程序正确退出
+        self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
+        
+        # 创建主框架
+        self.main_frame = ttk.Frame(root, padding="20")
+        self.main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # 创建文件夹选择区域
+        self.folder_frame = ttk.Frame(self.main_frame)
+        self.folder_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        self.folder_label = ttk.Label(self.folder_frame, text="选择文件夹:", font=('SimHei', 10))
+        self.folder_label.pack(side=tk.LEFT, padx=(0, 10))
+        
+        # 可以同时扫描多个文件夹（例如两个网络共享和一块本地磁盘），以路径分隔符分隔
+        self.folder_path_var = tk.StringVar()
+        self.folder_entry = ttk.Entry(self.folder_frame, textvariable=self.folder_path_var, width=50, font=('SimHei', 10))
+        self.folder_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
+        
+        self.add_folder_button = ttk.Button(self.folder_frame, text="添加...", command=self.add_folder)
+        self.add_folder_button.pack(side=tk.RIGHT)
+        self.browse_button = ttk.Button(self.folder_frame, text="浏览...", command=self.browse_folder)
+        self.browse_button.pack(side=tk.RIGHT, padx=(0, 5))
+        
+        # 创建匹配方式选择区域
+        self.option_frame = ttk.Frame(self.main_frame)
+        self.option_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        ttk.Label(self.option_frame, text="匹配方式:", font=('SimHei', 10)).pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.match_mode_var = tk.StringVar(value=self.MATCH_BY_NAME)
+        for mode, label in self.MATCH_MODE_LABELS.items():
+            ttk.Radiobutton(self.option_frame, text=label, value=mode,
+                            variable=self.match_mode_var).pack(side=tk.LEFT, padx=(0, 10))
+        
+        # 内容模式下，对哈希相同的文件再做一次逐字节比对
+        self.byte_compare_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.option_frame, text="逐字节校验", variable=self.byte_compare_var).pack(side=tk.LEFT, padx=(0, 10))
+        
+        # 内容模式下把内容完全相同的文件夹作为一个结果，其中的文件不再逐组列出
+        self.find_folders_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(self.option_frame, text="合并重复文件夹", variable=self.find_folders_var).pack(side=tk.LEFT, padx=(0, 10))
+        
+        # 把 zip/tar 压缩包中的文件也作为候选，无需解压
+        self.scan_archives_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.option_frame, text="扫描压缩包内容", variable=self.scan_archives_var).pack(side=tk.LEFT, padx=(0, 10))
+        
+        # 在同一次遍历中统计各文件夹的大小、文件大小和扩展名分布（名称模式下需要额外读取文件大小）
+        self.disk_usage_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(self.option_frame, text="统计磁盘占用", variable=self.disk_usage_var).pack(side=tk.LEFT, padx=(0, 10))
+        
+        # 增量扫描：使用磁盘上的扫描索引，只重新列举有变化的目录、只重新哈希有变化的文件
+        self.use_index_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.option_frame, text="增量扫描", variable=self.use_index_var).pack(side=tk.LEFT, padx=(0, 10))
+        
+        # 扫描完成后监视文件变化，增量更新结果
+        self.watch_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.option_frame, text="监视变化", variable=self.watch_var,
+                        command=self._toggle_watch).pack(side=tk.LEFT)
+        
+        # 并行遍历线程数，适用于 NFS/SMB 等高延迟文件系统
+        self.walk_workers_var = tk.IntVar(value=self.DEFAULT_WALK_WORKERS)
+        ttk.Spinbox(self.option_frame, from_=1, to=self.MAX_WALK_WORKERS, width=4,
+                    textvariable=self.walk_workers_var).pack(side=tk.RIGHT)
+        ttk.Label(self.option_frame, text="遍历线程数:", font=('SimHei', 10)).pack(side=tk.RIGHT, padx=(10, 5))
+        
+        # 名称模式的文件名比较方式：索引保存原始文件名，切换后立即在内存中重新分组，无需重新扫描
+        self.name_key_frame = ttk.Frame(self.main_frame)
+        self.name_key_frame.pack(fill=tk.X, pady=(0, 15))
+        ttk.Label(self.name_key_frame, text="文件名比较:", font=('SimHei', 10)).pack(side=tk.LEFT, padx=(0, 10))
+        self.ignore_case_var = tk.BooleanVar(value=False)
+        self.normalize_unicode_var = tk.BooleanVar(value=False)
+        self.ignore_extension_var = tk.BooleanVar(value=False)
+        for label, variable in (("忽略大小写", self.ignore_case_var), ("Unicode 规范化", self.normalize_unicode_var),
+                                ("忽略扩展名", self.ignore_extension_var)):
+            ttk.Checkbutton(self.name_key_frame, text=label, variable=variable,
+                            command=self._regroup_names).pack(side=tk.LEFT, padx=(0, 10))
+        
+        # 创建过滤规则区域：规则在遍历时应用，被跳过的目录不会被列举
+        self.filter_frame = ttk.LabelFrame(self.main_frame, text="过滤规则（多个规则以逗号分隔）")
+        self.filter_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        self.include_var = tk.StringVar()
+        self.exclude_var = tk.StringVar()
+        self.prune_var = tk.StringVar()
+        self.extensions_var = tk.StringVar()
+        self.min_size_var = tk.StringVar()
+        self.max_size_var = tk.StringVar()
+        filter_fields = (("只包含文件:", self.include_var), ("排除文件:", self.exclude_var),
+                         ("跳过目录:", self.prune_var), ("扩展名:", self.extensions_var),
+                         ("最小大小:", self.min_size_var), ("最大大小:", self.max_size_var))
+        for index, (label, variable) in enumerate(filter_fields):
+            row, column = divmod(index, 2)
+            ttk.Label(self.filter_frame, text=label, font=('SimHei', 10)).grid(
+                row=row, column=column * 2, sticky=tk.W, padx=(5, 5), pady=2)
+            ttk.Entry(self.filter_frame, textvariable=variable, width=24).grid(
+                row=row, column=column * 2 + 1, sticky=tk.EW, padx=(0, 10), pady=2)
+        self.filter_frame.grid_columnconfigure(1, weight=1)
+        self.filter_frame.grid_columnconfigure(3, weight=1)
+        
+        # 跳过 .git、node_modules 等版本库、依赖和缓存目录
+        self.prune_common_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.filter_frame, text="跳过常见的版本库和缓存目录",
+                        variable=self.prune_common_var).grid(row=3, column=0, columnspan=4, sticky=tk.W, padx=5)
+        
+        # I/O 限速：在繁忙的服务器上扫描时限制对存储的压力，留空表示不限制
+        self.throttle_frame = ttk.LabelFrame(self.main_frame, text="I/O 限速（留空表示不限制）")
+        self.throttle_frame.pack(fill=tk.X, pady=(0, 15))
+        self.max_read_rate_var = tk.StringVar()
+        self.max_ops_var = tk.StringVar()
+        for column, (label, variable) in enumerate((("读取速率（每秒）:", self.max_read_rate_var),
+                                                    ("元数据操作（次/秒）:", self.max_ops_var))):
+            ttk.Label(self.throttle_frame, text=label, font=('SimHei', 10)).grid(
+                row=0, column=column * 2, sticky=tk.W, padx=(5, 5), pady=2)
+            ttk.Entry(self.throttle_frame, textvariable=variable, width=12).grid(
+                row=0, column=column * 2 + 1, sticky=tk.W, padx=(0, 10), pady=2)
+        # 存储延迟升高时自动放慢；以最低的 CPU 和 I/O 优先级扫描
+        self.adaptive_throttle_var = tk.BooleanVar(value=False)
+        self.idle_priority_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.throttle_frame, text="存储繁忙时自动放慢",
+                        variable=self.adaptive_throttle_var).grid(row=0, column=4, sticky=tk.W, padx=(0, 10))
+        ttk.Checkbutton(self.throttle_frame, text="低优先级",
+                        variable=self.idle_priority_var).grid(row=0, column=5, sticky=tk.W, padx=(0, 5))
+        
+        # 创建扫描控制区域
+        self.scan_control_frame = ttk.Frame(self.main_frame)
+        self.scan_control_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        # 创建扫描按钮
+        self.scan_button = ttk.Button(self.scan_control_frame, text="开始扫描", command=self.scan_files)
+        self.scan_button.pack(side=tk.LEFT, padx=(0, 10))
+        
+        # 创建取消按钮
+        self.cancel_button = ttk.Button(self.scan_control_frame, text="取消扫描", command=self.cancel_scan, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT, padx=(0, 10))
+        
+        # 创建暂停按钮：保存进度，之后（包括程序重启后）可以从暂停处继续扫描
+        self.pause_button = ttk.Button(self.scan_control_frame, text="暂停扫描", command=self.pause_scan, state=tk.DISABLED)
+        self.pause_button.pack(side=tk.LEFT, padx=(0, 10))
+        
+        # 导出最近一次扫描的性能指标（各阶段耗时、列举和哈希统计、最慢的目录）
+        self.metrics_button = ttk.Button(self.scan_control_frame, text="导出指标", command=self.export_metrics,
+                                         state=tk.DISABLED)
+        self.metrics_button.pack(side=tk.LEFT, padx=(0, 10))
+        
+        # 清理重复文件：每组保留一份，其余替换为硬链接、reflink 或删除（只适用于按文件内容扫描的结果）
+        self.reclaim_button = ttk.Button(self.scan_control_frame, text="清理重复...", command=self.show_reclaim_dialog,
+                                         state=tk.DISABLED)
+        self.reclaim_button.pack(side=tk.LEFT, padx=(0, 10))
+        
+        # 查看最近一次扫描统计的磁盘占用：占用最大的文件夹、文件大小和扩展名分布、可回收空间最大的重复组
+        self.usage_button = ttk.Button(self.scan_control_frame, text="磁盘占用...", command=self.show_usage_dialog,
+                                       state=tk.DISABLED)
+        self.usage_button.pack(side=tk.LEFT)
+        
+        # 创建进度条
+        self.progress_var = tk.DoubleVar()
+        self.progress_bar = ttk.Progressbar(self.scan_control_frame, variable=self.progress_var, length=300, mode='determinate')
+        self.progress_bar.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(10, 0))
+        
+        # 添加键盘快捷键
+        self.root.bind("<Return>", lambda event: self.scan_files())
+        self.root.bind("<KP_Enter>", lambda event: self.scan_files())  # 小键盘的Enter键
+        
+        # 设置浏览按钮的快捷键
+        self.browse_button.bind("<Return>", lambda event: self.browse_folder())
+        self.browse_button.bind("<KP_Enter>", lambda event: self.browse_folder())
+        
+        # 创建结果显示区域
+        self.result_frame = ttk.LabelFrame(self.main_frame, text="扫描结果")
+        self.result_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 15))
+        
+        # 创建结果树状视图
+        self.result_tree = ttk.Treeview(self.result_frame, columns=self.RESULT_COLUMNS, show="headings")
+        
+        # 设置列宽和标题
+        for col in self.RESULT_COLUMNS:
+            self.result_tree.heading(col, text=self.COLUMN_HEADINGS[col])
+        
+        self.result_tree.column("filename", width=150, anchor=tk.W)
+        self.result_tree.column("count", width=80, anchor=tk.CENTER)
+        self.result_tree.column("wasted", width=90, anchor=tk.E)
+        self.result_tree.column("locations", width=350, anchor=tk.W)
+        
+        # 添加垂直滚动条，由虚拟视图控制，映射到全部结果
+        vscrollbar = ttk.Scrollbar(self.result_frame, orient=tk.VERTICAL)
+        
+        # 添加水平滚动条
+        hscrollbar = ttk.Scrollbar(self.result_frame, orient=tk.HORIZONTAL, command=self.result_tree.xview)
+        self.result_tree.configure(xscroll=hscrollbar.set)
+        
+        # 放置树状视图和滚动条
+        self.result_tree.grid(row=0, column=0, sticky=tk.NSEW)
+        vscrollbar.grid(row=0, column=1, sticky=tk.NS)
+        hscrollbar.grid(row=1, column=0, sticky=tk.EW)
+        
+        # 配置网格权重，使树状视图能够随窗口大小调整
+        self.result_frame.grid_rowconfigure(0, weight=1)
+        self.result_frame.grid_columnconfigure(0, weight=1)
+        
+        # 结果保存在紧凑的后备模型中，Treeview 只显示视口内可见的行
+        # 各列的排序键在结果加入模型时计算一次，点击列标题时只需在模型中排序
+        self.result_model = ResultModel(sort_keys={
+            "filename": lambda row: row[0].lower(),
+            "count": lambda row: len(row[1]),
+            "wasted": self._wasted_bytes,
+            "locations": lambda row: row[1][0].lower() if row[1] else "",
+        })
+        self.result_mode = self.MATCH_BY_NAME
+        # 名称模式结果当前的分组方式
+        self.result_name_key = NameKey()
+        # 扫描多个根目录时，位置列在每个路径前标出其所在的根目录
+        self.result_roots = []
+        self.result_root_labels = {}
+        self.result_view = VirtualTreeview(self.result_tree, vscrollbar, self.result_model, self._format_result_row)
+        
+        # 添加双击事件绑定，用于显示详细信息
+        self.result_tree.bind("\u003cDouble-1\u003e", self.show_file_details)
+        
+        # 添加右键菜单支持
+        self.result_tree.bind("\u003cButton-3\u003e", self.show_context_menu)
+        self._create_context_menu()
+        
+        # 添加排序功能
+        self.sort_column = None
+        self.sort_order = "ascending"
+        for col in self.RESULT_COLUMNS:
+            self.result_tree.heading(col, command=lambda _col=col: self.sort_by_column(_col))
+        
+        # 创建底部状态栏
+        self.status_frame = ttk.Frame(self.main_frame)
+        self.status_frame.pack(fill=tk.X, side=tk.BOTTOM, pady=(10, 0))
+        
+        # 创建统计信息标签
+        self.stats_var = tk.StringVar(value="准备就绪，请选择文件夹并点击扫描按钮")
+        self.stats_label = ttk.Label(self.status_frame, textvariable=self.stats_var, font=('SimHei', 10))
+        self.stats_label.pack(side=tk.LEFT, padx=(5, 10))
+        
+        # 创建版本信息标签
+        self.version_label = ttk.Label(self.status_frame, text=f"v{self.APP_VERSION}", font=('SimHei', 8))
+        self.version_label.pack(side=tk.RIGHT, padx=5)
+        
+        # 欢迎信息
+        self._show_welcome_message()
+    
+    def _setup_fonts(self):
+        """设置中文字体支持"""
+        self.style = ttk.Style()
+        
+        # 根据操作系统调整字体设置
+        system = platform.system()
+        if system == "Windows":
+            # Windows 系统通常支持 SimHei 或 Microsoft YaHei
+            default_font = ('Microsoft YaHei UI', 9)
+        elif system == "Darwin":  # macOS
+            default_font = ('Heiti TC', 9)
+        else:  # Linux 或其他系统
+            default_font = ('WenQuanYi Micro Hei', 9)
+        
+        # 设置默认字体样式
+        self.style.configure('.', font=default_font)
+        
+    def _set_window_icon(self):
+        """尝试设置窗口图标"""
+        # 在实际使用中，可以添加自定义图标
+        # 这里只是一个示例，实际使用时需要提供图标文件路径
+        try:
+            # 这里可以添加图标设置代码，例如：
+            # icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'icon.ico')
+            # if os.path.exists(icon_path):
+            #     self.root.iconbitmap(icon_path)
+            pass
+        except Exception:
+            # 如果图标设置失败，静默忽略
+            pass
+    
+    def _show_welcome_message(self):
+        """显示欢迎信息"""
+        # 可以在这里添加欢迎信息或使用提示
+        pass
+    
+    def _on_closing(self):
+        """处理窗口关闭事件"""
+        if self._closing:
+            return
+        self._stop_watch()
+        if self.scanning:
+            answer = messagebox.askyesnocancel("确认退出", "扫描正在进行中，是否保存进度以便下次继续？\n"
+                                                         "选择“否”将放弃本次扫描直接退出。")
+            if answer is None:
+                return
+            if answer and self.scanner is not None:
+                # 暂停扫描，等扫描线程写完检查点后再关闭窗口。不能在这里 join：扫描线程结束前
+                # 会调用 root.after，它要由主线程执行，主线程阻塞在 join 中会造成死锁
+                self.scanner.pause()
+                self._closing = True
+                self.stats_var.set("正在保存扫描进度，保存完成后自动退出...")
+                self._destroy_when_scan_stopped()
+                return
+            else:
+                self.scanning = False
+                # 等待扫描线程结束
+                if self.scan_thread and self.scan_thread.is_alive():
+                    self.scan_thread.join(timeout=1.0)  # 等待最多1秒
+            self.root.destroy()
+        else:
+            self.root.destroy()
+    
+    def _destroy_when_scan_stopped(self):
+        """扫描线程结束后关闭窗口，在此之前每隔 100 毫秒检查一次"""
+        if self.scan_thread is not None and self.scan_thread.is_alive():
+            self.root.after(100, self._destroy_when_scan_stopped)
+        else:
+            self.root.destroy()
+    
+    def browse_folder(self, append=False):
+        """打开文件夹选择对话框；append 为 True 时把选择的文件夹添加到已有的文件夹之后"""
+        try:
+            # 设置对话框的初始目录为当前选择的目录
+            selected = self._selected_folders()
+            initial_dir = selected[-1] if selected else ""
+            if not initial_dir or not os.path.isdir(initial_dir):
+                initial_dir = os.path.expanduser("~")  # 使用用户主目录作为默认目录
+                
+            folder_path = filedialog.askdirectory(
+                initialdir=initial_dir,
+                title="选择要扫描的文件夹",
+                mustexist=True  # 确保选择的是已存在的文件夹
+            )
+            
+            if folder_path:
+                if append and selected:
+                    folder_path = os.pathsep.join(selected + [folder_path])
+                self.folder_path_var.set(folder_path)
+                # 自动聚焦到扫描按钮，方便用户按Enter键开始扫描
+                self.scan_button.focus_set()
+        except Exception as e:
+            messagebox.showerror("错误", f"选择文件夹时发生错误: {str(e)}")
+    
+    def add_folder(self):
+        """再添加一个要同时扫描的文件夹"""
+        self.browse_folder(append=True)
+    
+    def _selected_folders(self):
+        """返回输入框中的文件夹列表，多个文件夹以路径分隔符分隔"""
+        return [path.strip() for path in self.folder_path_var.get().split(os.pathsep) if path.strip()]
+    
+    def scan_files(self):
+        """开始扫描过程，在单独的线程中执行以避免UI冻结"""
+        folders = self._selected_folders()
+        
+        invalid = [path for path in folders if not os.path.isdir(path)]
+        if not folders or invalid:
+            messagebox.showerror("错误", f"请选择有效的文件夹路径{': ' + invalid[0] if invalid else ''}")
+            return
+        # 单个文件夹时沿用原来的检查点键，多个文件夹时整个列表作为一个键
+        roots = normalize_roots(folders)
+        folder_path = roots[0] if len(roots) == 1 else roots
+        
+        try:
+            scan_filter = self._build_scan_filter()
+        except ValueError as e:
+            messagebox.showerror("错误", f"过滤规则无效: {e}")
+            return
+        try:
+            throttle = self._build_throttle()
+        except ValueError as e:
+            messagebox.showerror("错误", f"限速设置无效: {e}")
+            return
+        
+        # 该文件夹有暂停的扫描时，询问是否从暂停处继续（沿用暂停前的过滤规则）
+        match_mode = self.match_mode_var.get()
+        checkpoint = ScanCheckpoint.load(folder_path, match_mode)
+        if checkpoint is not None:
+            if messagebox.askyesno("继续扫描", f"该文件夹有一次暂停的扫描（已扫描 {checkpoint.total_files} 个文件），"
+                                               f"是否从暂停处继续？\n选择“否”将重新开始扫描。"):
+                self.byte_compare_var.set(checkpoint.byte_compare)
+                self.use_index_var.set(checkpoint.use_index)
+                scan_filter = checkpoint.scan_filter
+            else:
+                ScanCheckpoint.discard(folder_path, match_mode)
+                checkpoint = None
+        
+        # 重新扫描前停止监视，避免事件修改正在重建的索引
+        self._stop_watch()
+        
+        # 防止重复点击
+        self.scan_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.pause_button.config(state=tk.NORMAL)
+        self.reclaim_button.config(state=tk.DISABLED)
+        self.progress_var.set(0)
+        
+        # 清空结果
+        self.result_model.clear()
+        self.result_view.reset()
+        self.has_reclaimable = False
+        self._begin_streaming(match_mode, roots)
+        
+        # 更新状态
+        settings = [item.describe() for item in (scan_filter, throttle) if item is not None]
+        if settings:
+            self.stats_var.set(f"正在扫描文件（{'；'.join(settings)}）...")
+        else:
+            self.stats_var.set("正在扫描文件...")
+        self.root.update()
+        
+        # 开始在单独线程中扫描
+        self.scanning = True
+        self.progress.reset()
+        byte_compare = self.byte_compare_var.get()
+        use_index = self.use_index_var.get()
+        try:
+            walk_workers = max(1, min(self.MAX_WALK_WORKERS, int(self.walk_workers_var.get())))
+        except (tk.TclError, ValueError):
+            walk_workers = self.DEFAULT_WALK_WORKERS
+        self.scan_thread = threading.Thread(target=self._scan_files_thread,
+                                            args=(folder_path, match_mode, byte_compare, walk_workers, use_index,
+                                                  checkpoint, scan_filter, self._current_name_key(),
+                                                  self.find_folders_var.get(), self.scan_archives_var.get(),
+                                                  self.disk_usage_var.get(), throttle))
+        self.scan_thread.daemon = True  # 使线程在主程序退出时自动终止
+        self.scan_thread.start()
+        
+        # 开始检查扫描进度
+        self._check_scan_progress()
+    
+    def _build_scan_filter(self):
+        """由界面上的输入创建过滤规则，没有设置任何规则时返回 None；输入无效时抛出 ValueError"""
+        prune = split_patterns(self.prune_var.get())
+        if self.prune_common_var.get():
+            prune += COMMON_PRUNE_PATTERNS
+        scan_filter = ScanFilter(include=split_patterns(self.include_var.get()),
+                                 exclude=split_patterns(self.exclude_var.get()),
+                                 prune=prune,
+                                 extensions=split_patterns(self.extensions_var.get()),
+                                 min_size=parse_size(self.min_size_var.get()),
+                                 max_size=parse_size(self.max_size_var.get()))
+        return scan_filter if scan_filter.active else None
+    
+    def _build_throttle(self):
+        """由界面上的输入创建限速设置，没有设置任何限制时返回 None；输入无效时抛出 ValueError"""
+        max_ops = self.max_ops_var.get().strip()
+        try:
+            ops_per_sec = int(max_ops) if max_ops else None
+        except ValueError:
+            raise ValueError(f"无法识别的次数: {max_ops}") from None
+        throttle = IOThrottle(bytes_per_sec=parse_size(self.max_read_rate_var.get()), ops_per_sec=ops_per_sec,
+                              adaptive=self.adaptive_throttle_var.get(), idle=self.idle_priority_var.get())
+        return throttle if throttle.active else None
+    
+    def _current_name_key(self):
+        """返回界面上选择的文件名比较方式"""
+        return NameKey(self.ignore_case_var.get(), self.normalize_unicode_var.get(), self.ignore_extension_var.get())
+    
+    def _regroup_names(self):
+        """按新选择的文件名比较方式，在内存中重新分组上次名称模式扫描的结果"""
+        state = self.last_scan
+        if self.scanning or state is None or state['mode'] != self.MATCH_BY_NAME:
+            return
+        name_key = self._current_name_key()
+        with self.watch_lock:
+            state['name_key'] = None if name_key.exact else name_key
+            state['key_groups'] = None
+            duplicates = name_duplicates(state['names'], state['dirs'], name_key)
+            # 丢弃按旧分组方式计算、尚未应用的监视更新
+            while not self.watch_updates.empty():
+                self.watch_updates.get_nowait()
+        duplicates.sort(key=lambda x: (-len(x[1]), x[0]))
+        self.result_name_key = name_key
+        self.result_model.set_rows(duplicates)
+        self.result_view.reset()
+        self.stats_var.set(f"已按{name_key.describe()}重新分组，发现 {len(duplicates)} 组重复的文件名。")
+    
+    def _scan_files_thread(self, folder_path, match_mode=MATCH_BY_NAME, byte_compare=False, walk_workers=1,
+                           use_index=False, checkpoint=None, scan_filter=None, name_key=None, find_folders=False,
+                           scan_archives=False, disk_usage=False, throttle=None):
+        """在单独线程中执行的扫描逻辑"""
+        try:
+            scanner = DuplicateScanner(folder_path, match_mode=match_mode, byte_compare=byte_compare,
+                                       walk_workers=walk_workers, use_index=use_index,
+                                       progress=self.progress, keep_running=lambda: self.scanning,
+                                       checkpoint=checkpoint, scan_filter=scan_filter, name_key=name_key,
+                                       find_folders=find_folders, scan_archives=scan_archives, disk_usage=disk_usage,
+                                       throttle=throttle,
+                                       on_group=self._on_streamed_group if match_mode == self.MATCH_BY_CONTENT else None,
+                                       on_duplicate=self._on_streamed_name
+                                       if match_mode == self.MATCH_BY_NAME and (name_key is None or name_key.exact)
+                                       else None)
+            self.scanner = scanner
+            result = scanner.run()
+            self.last_metrics = scanner.metrics
+            if scanner.paused:
+                # 已确认的重复组保留在结果列表中
+                self.root.after(0, self._apply_streamed_results)
+                self.root.after(0, lambda n=self.progress.snapshot()['files']: self.stats_var.set(
+                    f"扫描已暂停，已扫描 {n} 个文件，进度已保存。再次扫描该文件夹即可继续。"))
+                self.root.after(0, self._reset_scan_ui)
+                return
+            if result is None or not self.scanning:
+                self.root.after(0, self._apply_streamed_results)
+                self.root.after(0, self._reset_scan_ui)
+                return
+            
+            # 在主线程中更新UI显示结果
+            self.root.after(0, lambda r=result: 
+                           self._display_results(r.duplicates, r.total_files, r.match_mode, r.state, r.hardlinks,
+                                                 r.metrics, r.folders, r.usage))
+            
+        except PermissionError:
+            self.root.after(0, lambda: messagebox.showerror("权限错误", "无法访问某些文件或文件夹，请检查权限后重试。"))
+            self.root.after(0, lambda: self.stats_var.set("扫描失败：权限不足"))
+            self.root.after(0, self._reset_scan_ui)
+        except Exception as e:
+            self.root.after(0, lambda err=str(e): messagebox.showerror("错误", f"扫描过程中发生错误: {err}"))
+            self.root.after(0, lambda: self.stats_var.set("扫描失败，请重试"))
+            self.root.after(0, self._reset_scan_ui)
+    
+    def _begin_streaming(self, match_mode, roots):
+        """准备在扫描期间显示已确认的重复组：按本次扫描的设置格式化结果行"""
+        self.result_mode = match_mode
+        self.result_roots = list(roots)
+        self.result_root_labels = root_labels(self.result_roots) if len(self.result_roots) > 1 else {}
+        self.result_name_key = NameKey()
+        self._discard_streamed_results()
+        self._stream_applied_at = time.monotonic()
+    
+    def _discard_streamed_results(self):
+        """丢弃尚未合并的流式结果"""
+        self._streamed = {}
+        while not self.stream_updates.empty():
+            self.stream_updates.get_nowait()
+    
+    def _on_streamed_group(self, size, group_id, paths):
+        """扫描线程中调用：记录刚确认的一组内容相同的文件"""
+        self.stream_updates.put((size, group_id, list(paths)))
+    
+    def _on_streamed_name(self, name, path, size):
+        """扫描线程中调用：记录又一次出现的重复文件名"""
+        self.stream_updates.put((name, None, os.path.dirname(path)))
+    
+    def _apply_streamed_results(self):
+        """在主线程中把扫描线程已确认的重复组合并到结果列表
+        
+        没有选择排序列时，内容模式按可回收空间、名称模式按重复次数从大到小排列，
+        最值得处理的重复组始终显示在最前面。
+        """
+        self._stream_applied_at = time.monotonic()
+        changed = set()
+        while True:
+            try:
+                key, group_id, value = self.stream_updates.get_nowait()
+            except queue.Empty:
+                break
+            if group_id is None:
+                self._streamed.setdefault(key, []).append(value)
+            else:
+                self._streamed.setdefault(key, {})[group_id] = value
+            changed.add(key)
+        if not changed:
+            return
+        if self.result_mode == self.MATCH_BY_CONTENT:
+            self.has_reclaimable = True
+        
+        updates = {}
+        for key in changed:
+            value = self._streamed[key]
+            if isinstance(value, dict):
+                updates[key] = [content_result(key, paths) for paths in value.values()]
+            else:
+                updates[key] = [(key, sorted(value), key)]
+        self.result_model.replace_keys(updates)
+        self._sort_results()
+        self.result_view.refresh()
+    
+    def _sort_results(self):
+        """按用户选择的排序列排序；没有选择时内容模式按可回收空间、名称模式按重复次数从大到小排列"""
+        if self.sort_column is not None:
+            self.result_model.sort(self.sort_column, reverse=(self.sort_order == "descending"))
+        elif self.result_mode == self.MATCH_BY_CONTENT:
+            self.result_model.sort("wasted", reverse=True)
+        else:
+            self.result_model.sort("count", reverse=True)
+    
+    def _display_results(self, sorted_duplicates, total_files, match_mode=MATCH_BY_NAME, last_scan=None,
+                         hardlinks=(), metrics=None, folders=(), usage=None):
+        """在主线程中显示扫描结果"""
+        # 结果只放入后备模型，由虚拟视图按需显示可见的行；重复文件夹排在最前，硬链接组排在内容重复之后
+        started = time.perf_counter(), time.process_time()
+        self.result_mode = match_mode
+        self.result_roots = (last_scan or {}).get('roots', [])
+        self.result_root_labels = root_labels(self.result_roots) if len(self.result_roots) > 1 else {}
+        if match_mode == self.MATCH_BY_NAME:
+            self.result_name_key = (last_scan or {}).get('name_key') or NameKey()
+        # 最终结果取代扫描期间提前显示的结果（其中一些组已并入重复文件夹）
+        self._discard_streamed_results()
+        self.result_model.set_rows(list(folders) + list(sorted_duplicates) + list(hardlinks))
+        self.has_reclaimable = match_mode == self.MATCH_BY_CONTENT and bool(folders or sorted_duplicates)
+        self._sort_results()
+        self.result_view.reset()
+        if metrics is not None:
+            metrics.add_phase_time(ScanMetrics.PHASE_DISPLAY, time.perf_counter() - started[0],
+                                   time.process_time() - started[1])
+        
+        # 更新统计信息
+        self.last_usage = usage
+        scope = f"在 {len(self.result_roots)} 个文件夹中" if len(self.result_roots) > 1 else ""
+        if match_mode == self.MATCH_BY_CONTENT:
+            message = f"扫描完成。{scope}总共扫描了 {total_files} 个文件，"
+            if folders:
+                message += f"发现 {len(folders)} 组内容相同的文件夹，另有 "
+            else:
+                message += "发现 "
+            message += f"{len(sorted_duplicates)} 组内容相同的文件。"
+            if hardlinks:
+                message += f"另有 {len(hardlinks)} 组硬链接（指向同一份数据，不占用额外空间）。"
+            if usage is not None:
+                message += f"共占用 {scan_engine.format_size(usage.total_bytes)}，" \
+                           f"删除多余副本可回收 {scan_engine.format_size(usage.wasted_bytes)}。"
+            self.stats_var.set(message)
+        else:
+            message = f"扫描完成。{scope}总共扫描了 {total_files} 个文件，发现 {len(sorted_duplicates)} 个重复的文件名。"
+            if usage is not None:
+                message += f"共占用 {scan_engine.format_size(usage.total_bytes)}。"
+            self.stats_var.set(message)
+        
+        # 重置UI状态
+        self._reset_scan_ui()
+        
+        # 保留内存索引，供监视模式增量更新
+        self.last_scan = last_scan
+        if self.watch_var.get():
+            self._start_watch()
+    
+    def _format_result_row(self, row):
+        """生成结果行在各列中显示的值"""
+        filename, paths, key = row
+        # 限制显示的路径数量，避免UI过于拥挤
+        path_text = "; ".join(self._location_text(path) for path in paths[:3])
+        if len(paths) > 3:
+            path_text += f"; ...等{len(paths) - 3}个位置"
+        wasted_text = scan_engine.format_size(self._wasted_bytes(row)) if self._occupies_space(key) else "-"
+        return (filename, len(paths), wasted_text, path_text)
+    
+    def _location_text(self, path):
+        """位置列中显示的路径：扫描多个根目录时显示为 [根目录标签] 相对路径"""
+        if not self.result_root_labels:
+            return path
+        root = root_of(path, self.result_roots)
+        if root is None:
+            return path
+        return f"[{self.result_root_labels[root]}] {os.path.relpath(path, root)}"
+    
+    @staticmethod
+    def _wasted_bytes(row):
+        """删除多余副本可节省的字节数
+        
+        只有内容重复组（分组键为文件大小）和重复文件夹（分组键为 FolderKey）占用额外空间；
+        硬链接组指向同一份数据，名称模式下不知道文件内容是否相同，二者均记为 0。
+        """
+        _, paths, key = row
+        if type(key) is int:
+            return key * (len(paths) - 1)
+        return key.size * (len(paths) - 1) if isinstance(key, FolderKey) else 0
+    
+    @staticmethod
+    def _occupies_space(key):
+        """该分组键的结果是否占用额外空间"""
+        return type(key) is int or isinstance(key, FolderKey)
+    
+    def _full_paths(self, row):
+        """返回结果行中所有文件的完整路径"""
+        filename, paths, _ = row
+        # 按完整文件名分组时保存的是所在目录，其他分组方式和内容模式下保存的是完整路径
+        if self.result_mode == self.MATCH_BY_CONTENT or not self.result_name_key.exact:
+            return paths
+        return [os.path.join(path, filename) for path in paths]
+    
+    def _toggle_watch(self):
+        """切换监视模式"""
+        if self.watch_var.get():
+            if self.last_scan is None:
+                self.stats_var.set("扫描完成后将开始监视文件变化")
+            elif not self.scanning:
+                self._start_watch()
+        else:
+            self._stop_watch()
+            self.stats_var.set("已停止监视")
+    
+    def _start_watch(self):
+        """开始监视上次扫描的目录，根据文件变化增量更新索引和结果"""
+        if self.watcher is not None or self.last_scan is None:
+            return
+        
+        state = self.last_scan
+        self.watch_state = state
+        # 监视期间重新比对变化文件所用的内容比对器，停止监视时随之中止
+        self.watch_matcher = ContentMatcher(state.get('byte_compare', False),
+                                            keep_running=lambda: self.watcher is not None,
+                                            archives=state.get('archives'))
+        # 扫描时被剪枝的目录也不监视
+        scan_filter = state.get('filter')
+        roots = state.get('roots', [state['root']])
+        accept_dir = (lambda dir_path: scan_filter.accepts_dir(root_of(dir_path, roots), dir_path)) \
+            if scan_filter else None
+        # 扫描了多个根目录时，每个根目录使用各自的监视器
+        watcher_class = MultiRootWatcher if len(roots) > 1 else DirectoryWatcher
+        self.watcher = watcher_class(roots if len(roots) > 1 else roots[0], self._on_watch_event,
+                                     track_modifications=(state['mode'] == self.MATCH_BY_CONTENT
+                                                          or state.get('archives') is not None),
+                                     on_resync=lambda: self.watch_updates.put((None, None)),
+                                     accept_dir=accept_dir)
+        # 为整棵目录树添加监视可能较慢，在后台线程中进行
+        threading.Thread(target=self._start_watch_thread, args=(self.watcher, state), daemon=True).start()
+        self.stats_var.set(f"正在启动监视: {os.pathsep.join(roots)}")
+        self._poll_watch_events()
+    
+    def _start_watch_thread(self, watcher, state):
+        """后台线程：准备增量更新所需的数据结构并启动监视器"""
+        with self.watch_lock:
+            if state['mode'] == self.MATCH_BY_CONTENT and 'path_sizes' not in state:
+                state['path_sizes'] = {path: size for size, paths in state['size_buckets'].items() for path in paths}
+                state['link_keys'] = {path: key for key, (_, paths) in state['hardlinks'].items() for path in paths}
+        try:
+            watcher.start()
+        except OSError as e:
+            self.root.after(0, lambda err=str(e): self.stats_var.set(f"无法监视文件变化: {err}"))
+    
+    def _stop_watch(self):
+        """停止监视"""
+        watcher = self.watcher
+        if watcher is not None:
+            # 先清除引用，使监视线程中正在进行的内容比对尽快结束
+            self.watcher = None
+            watcher.stop()
+        if self._watch_pump_id is not None:
+            self.root.after_cancel(self._watch_pump_id)
+            self._watch_pump_id = None
+        with self.watch_lock:
+            self.watch_state = None
+        # 丢弃尚未应用的更新
+        while not self.watch_updates.empty():
+            self.watch_updates.get_nowait()
+    
+    def _on_watch_event(self, kind, path, is_dir):
+        """监视线程中处理一个文件系统事件：更新内存索引并重新计算受影响的分组"""
+        with self.watch_lock:
+            state = self.watch_state
+            if state is None:
+                return
+            
+            if state['mode'] == self.MATCH_BY_CONTENT:
+                sizes, link_keys = self._apply_content_event(state, kind, path, is_dir)
+                if sizes and state.get('find_folders') and 'folder_covered' in state:
+                    # 重复目录只在扫描结束时整体计算，文件变化后不再可靠：移除重复目录组，
+                    # 改为逐个列出其中的重复文件，下面重新比对的分组会替换同一大小的这些行
+                    covered = [content_result(size, paths) for size, paths in state.pop('folder_covered')]
+                    self.watch_updates.put((self.WATCH_FOLDERS_STALE, covered))
+                for size in sizes:
+                    bucket = state['size_buckets'].get(size, [])
+                    groups = self.watch_matcher.find_duplicates({size: bucket}) or []
+                    self.watch_updates.put((size, [content_result(size, paths) for _, _, paths in groups]))
+                for key in link_keys:
+                    size, paths = state['hardlinks'].get(key, (0, []))
+                    rows = [hardlink_result(key, size, paths)] if len(paths) > 1 else []
+                    self.watch_updates.put((key, rows))
+            elif state.get('name_key') is None:
+                for name in self._apply_name_event(state, kind, path, is_dir):
+                    dir_ids = state['names'].dir_ids(name)
+                    rows = [(name, sorted(state['dirs'].path(dir_id) for dir_id in dir_ids), name)] \
+                        if len(dir_ids) > 1 else []
+                    self.watch_updates.put((name, rows))
+            else:
+                self._update_name_key_groups(state, self._apply_name_event(state, kind, path, is_dir))
+    
+    def _update_name_key_groups(self, state, changed_names):
+        """按规范化文件名分组时，重新计算受影响的分组
+        
+        key_groups 记录每个分组键对应的原始文件名，在第一次需要时建立，切换分组方式时清空。
+        """
+        names = state['names']
+        name_key = state['name_key']
+        if state.get('key_groups') is None:
+            state['key_groups'] = {key: set(members) for key, members in names.names_by_key(name_key).items()}
+        key_groups = state['key_groups']
+        for name in changed_names:
+            key = name_key(name)
+            members = key_groups.setdefault(key, set())
+            if names.dir_ids(name):
+                members.add(name)
+            else:
+                members.discard(name)
+            rows = [name_key_result(key, members, names, state['dirs'])] if names.count(members) > 1 else []
+            self.watch_updates.put((key, rows))
+    
+    def _apply_name_event(self, state, kind, path, is_dir):
+        """在文件名索引中应用事件，返回受影响的文件名"""
+        names = state['names']
+        dirs = state['dirs']
+        if kind == EVENT_DELETED and is_dir:
+            # 整个目录被删除或移走：移除其下的所有文件
+            removed_id = dirs.lookup(path)
+            if removed_id is None:
+                return []
+            self._forget_archives(state, path, is_dir)
+            return names.remove_where(lambda dir_id: dirs.is_within(dir_id, removed_id))
+        
+        dir_path, name = os.path.split(path)
+        changed = []
+        if state.get('archives') is not None and self._forget_archives(state, path, is_dir):
+            # 压缩包被删除或修改：移除其成员，修改后的压缩包随后重新读取
+            archive_id = dirs.lookup(path)
+            if archive_id is not None:
+                changed = names.remove_where(lambda dir_id: dirs.is_within(dir_id, archive_id))
+        if kind == EVENT_CREATED or (kind == EVENT_MODIFIED and state.get('archives') is not None
+                                     and is_archive_name(name)):
+            if not self._watch_accepts(state, path):
+                return changed
+            dir_id = dirs.intern(dir_path)
+            if dir_id not in names.dir_ids(name):
+                names.add(name, dir_id)
+                changed.append(name)
+            for member_path, _ in self._archive_members(state, path):
+                member_dir, member_name = os.path.split(member_path)
+                names.add(member_name, dirs.intern(member_dir))
+                changed.append(member_name)
+        elif kind == EVENT_DELETED:
+            dir_id = dirs.lookup(dir_path)
+            if dir_id is not None and names.remove(name, dir_id):
+                changed.append(name)
+        return list(dict.fromkeys(changed))
+    
+    def _apply_content_event(self, state, kind, path, is_dir):
+        """在大小分桶和硬链接索引中应用事件，返回受影响的 (文件大小集合, inode 键集合)
+        
+        同一 inode 只有一个代表路径在大小分桶中；代表路径被删除时由其余链接接替。
+        """
+        size_buckets = state['size_buckets']
+        path_sizes = state['path_sizes']
+        hardlinks = state['hardlinks']
+        link_keys = state['link_keys']
+        
+        if kind == EVENT_DELETED and is_dir:
+            prefix = path.rstrip(os.sep) + os.sep
+            removed = {p for p in path_sizes if p.startswith(prefix)}
+            removed.update(p for p in link_keys if p.startswith(prefix))
+        else:
+            removed = {path} if path in path_sizes or path in link_keys else set()
+        # 压缩包被删除或修改时移除其成员，修改后的压缩包随后重新读取
+        removed.update(p for p in self._forget_archives(state, path, is_dir) if p in path_sizes)
+        
+        affected = set()
+        affected_links = set()
+        for removed_path in removed:
+            if removed_path in path_sizes:
+                self._unbucket(state, removed_path, affected)
+            key = link_keys.pop(removed_path, None)
+            if key is None:
+                continue
+            affected_links.add(key)
+            size, paths = hardlinks[key]
+            paths.remove(removed_path)
+            if not paths:
+                del hardlinks[key]
+            elif not any(p in path_sizes for p in paths):
+                # 代表路径已删除：与扫描时一致，由剩余路径最小的链接接替参与内容比对
+                paths.sort()
+                path_sizes[paths[0]] = size
+                size_buckets.setdefault(size, []).append(paths[0])
+                affected.add(size)
+        
+        # 新建或修改的文件按当前大小重新入桶；修改后不再符合过滤规则的文件只移除
+        if kind != EVENT_DELETED and self._watch_accepts(state, path):
+            for member_path, size in self._archive_members(state, path):
+                path_sizes[member_path] = size
+                size_buckets.setdefault(size, []).append(member_path)
+                affected.add(size)
+            try:
+                st = os.stat(path)
+            except OSError:
+                return affected, affected_links
+            scan_filter = state.get('filter')
+            if scan_filter is not None and not scan_filter.accepts_size(st.st_size):
+                return affected, affected_links
+            if st.st_nlink > 1:
+                key = (st.st_dev, st.st_ino)
+                link_keys[path] = key
+                affected_links.add(key)
+                if key in hardlinks:
+                    size, paths = hardlinks[key]
+                    paths.append(path)
+                    if size != st.st_size:
+                        # 通过其他链接修改了内容：代表路径按新大小重新入桶
+                        hardlinks[key][0] = st.st_size
+                        for rep in [p for p in paths if p in path_sizes]:
+                            self._unbucket(state, rep, affected)
+                            path_sizes[rep] = st.st_size
+                            size_buckets.setdefault(st.st_size, []).append(rep)
+                            affected.add(st.st_size)
+                    elif kind == EVENT_MODIFIED:
+                        # 大小未变但内容可能变化：重新比对代表路径所在的分组
+                        affected.add(size)
+                    return affected, affected_links
+                hardlinks[key] = [st.st_size, [path]]
+            path_sizes[path] = st.st_size
+            size_buckets.setdefault(st.st_size, []).append(path)
+            affected.add(st.st_size)
+        return affected, affected_links
+    
+    @staticmethod
+    def _forget_archives(state, path, is_dir):
+        """移除 path（或目录 path 下所有压缩包）的登记，返回被移除的成员路径"""
+        archives = state.get('archives')
+        if archives is None:
+            return []
+        if not is_dir:
+            return archives.forget(path)
+        prefix = path.rstrip(os.sep) + os.sep
+        return [member for archive_path in [p for p in archives.archives if p.startswith(prefix)]
+                for member in archives.forget(archive_path)]
+    
+    @staticmethod
+    def _archive_members(state, path):
+        """扫描时启用了压缩包扫描且 path 为压缩包时，重新读取其成员 [(虚拟路径, 大小)]"""
+        archives = state.get('archives')
+        if archives is None or not is_archive_name(os.path.basename(path)):
+            return []
+        return archive_members(archives, path, state.get('filter'), state.get('roots', [state['root']]))
+    
+    @staticmethod
+    def _watch_accepts(state, path):
+        """监视到的新文件是否符合扫描时的过滤规则；名称模式下的大小限制也在这里检查"""
+        scan_filter = state.get('filter')
+        if scan_filter is None:
+            return True
+        root = root_of(path, state.get('roots', [state['root']]))
+        if root is None or not scan_filter.accepts_path(root, path):
+            return False
+        if state['mode'] == FileDuplicateChecker.MATCH_BY_NAME and scan_filter.size_bounded:
+            try:
+                return scan_filter.accepts_size(os.stat(path).st_size)
+            except OSError:
+                return False
+        return True
+    
+    @staticmethod
+    def _unbucket(state, path, affected):
+        """把代表路径从大小分桶中移除，并记录受影响的文件大小"""
+        size = state['path_sizes'].pop(path)
+        bucket = state['size_buckets'][size]
+        bucket.remove(path)
+        if not bucket:
+            del state['size_buckets'][size]
+        affected.add(size)
+    
+    def _poll_watch_events(self):
+        """在主线程中定期应用监视线程产生的结果更新"""
+        self._watch_pump_id = None
+        if self.watcher is None:
+            return
+        
+        # 同一分组在一个周期内多次变化时，只应用最后一次结果
+        latest = {}
+        overflowed = False
+        covered = None
+        while True:
+            try:
+                key, rows = self.watch_updates.get_nowait()
+            except queue.Empty:
+                break
+            if key is None:
+                overflowed = True
+            elif key is self.WATCH_FOLDERS_STALE:
+                covered = rows
+            else:
+                latest[key] = rows
+        
+        if covered is not None:
+            # 先于同一周期的分组更新应用，使重新比对的结果替换同一大小的旧行
+            rows = [row for row in self.result_model.rows if not isinstance(row[2], FolderKey)]
+            self.result_model.set_rows(rows + covered)
+            self.result_view.refresh()
+            self.has_reclaimable = any(type(row[2]) is int for row in self.result_model.rows)
+        
+        if latest:
+            self.result_model.replace_keys(latest)
+            self.result_view.refresh()
+            if self.result_mode == self.MATCH_BY_CONTENT and any(latest.values()):
+                self.has_reclaimable = True
+        
+        if overflowed:
+            self.stats_var.set("文件系统事件过多，部分变化可能未被记录，建议重新扫描")
+        elif covered is not None:
+            self.stats_var.set("文件已变化，重复文件夹结果不再可靠，已改为逐个列出其中的重复文件；"
+                               "重新扫描可再次合并重复文件夹")
+        elif latest:
+            mode = "inotify" if self.watcher.mode == 'inotify' else "定期轮询"
+            self.stats_var.set(f"正在监视文件变化（{mode}），当前共 {len(self.result_model)} 组重复。")
+        
+        self._watch_pump_id = self.root.after(self.WATCH_POLL_INTERVAL, self._poll_watch_events)
+    
+    def _create_context_menu(self):
+        """创建右键菜单"""
+        self.context_menu = tk.Menu(self.root, tearoff=0)
+        self.context_menu.add_command(label="复制文件名", command=self.copy_filename)
+        self.context_menu.add_command(label="查看所有位置", command=self.show_file_details)
+        self.context_menu.add_command(label="复制所有位置", command=self.copy_all_locations)
+        self.context_menu.add_command(label="清理重复...", command=self.show_reclaim_dialog)
+        self.context_menu.add_separator()
+        self.context_menu.add_command(label="清空结果", command=self.clear_results)
+    
+    def show_context_menu(self, event):
+        """显示右键菜单"""
+        # 选中点击的项目
+        index = self.result_view.index_at(event.y)
+        if index is not None:
+            self.result_view.select_index(index)
+            # 显示菜单
+            self.context_menu.post(event.x_root, event.y_root)
+    
+    def show_file_details(self, event=None):
+        """显示文件的详细信息，包括所有位置"""
+        row = self.result_view.selected_row()
+        if row is None:
+            return
+        
+        filename = row[0]
+        all_paths = self._full_paths(row)
+        
+        # 创建新窗口显示详细信息
+        detail_window = tk.Toplevel(self.root)
+        detail_window.title(f"文件详情: {filename}")
+        detail_window.geometry("600x400")
+        detail_window.resizable(True, True)
+        
+        # 创建标签显示文件名
+        ttk.Label(detail_window, text=f"文件名: {filename}", font=('SimHei', 10, 'bold')).pack(pady=(10, 5), padx=10, anchor=tk.W)
+        ttk.Label(detail_window, text=f"出现次数: {len(all_paths)}", font=('SimHei', 10)).pack(pady=(0, 10), padx=10, anchor=tk.W)
+        
+        # 创建带滚动条的文本框显示所有路径
+        text_frame = ttk.Frame(detail_window)
+        text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        
+        text_widget = tk.Text(text_frame, font=('SimHei', 9))
+        scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL)
+        hscrollbar = ttk.Scrollbar(text_frame, orient=tk.HORIZONTAL, command=text_widget.xview)
+        text_widget.configure(xscrollcommand=hscrollbar.set)
+        
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        hscrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+        text_widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        # 路径较多时只渲染可见的行，文本框保持只读
+        detail_window.path_list = VirtualTextList(text_widget, scrollbar, all_paths,
+                                                  lambda i, full_path: f"{i + 1}. {full_path}")
+    
+    def copy_filename(self):
+        """复制选中文件的文件名到剪贴板"""
+        row = self.result_view.selected_row()
+        if row is None:
+            return
+        
+        filename = row[0]
+        self.root.clipboard_clear()
+        self.root.clipboard_append(filename)
+        self.stats_var.set(f"已复制文件名: {filename}")
+    
+    def copy_all_locations(self):
+        """复制选中文件的所有位置到剪贴板"""
+        row = self.result_view.selected_row()
+        if row is None:
+            return
+        
+        all_paths = self._full_paths(row)
+        paths_text = "\n".join(all_paths)
+        
+        self.root.clipboard_clear()
+        self.root.clipboard_append(paths_text)
+        self.stats_var.set(f"已复制 {len(all_paths)} 个文件位置到剪贴板")
+    
+    def _reclaimable_groups(self, selected_only=False):
+        """可以回收空间的重复组，返回 (内容重复组 [(大小, 完整路径列表)], 重复文件夹组 [(总大小, 文件夹列表)])
+
+        只有内容模式下的结果可以回收，硬链接组不占用额外空间，不包括在内。
+        """
+        if self.result_mode != self.MATCH_BY_CONTENT:
+            return [], []
+        if selected_only:
+            row = self.result_view.selected_row()
+            rows = [row] if row is not None else []
+        else:
+            rows = [self.result_model[i] for i in range(len(self.result_model))]
+        return groups_from_rows(rows), folder_groups_from_rows(rows)
+    
+    def show_reclaim_dialog(self):
+        """显示清理重复文件的对话框：选择保留哪一份和其余文件的处理方式，预览后执行"""
+        if self.reclaimer is not None or self.scanning:
+            return
+        if not any(self._reclaimable_groups()):
+            messagebox.showinfo("提示", "只能清理按文件内容扫描得到的重复文件")
+            return
+        
+        window = tk.Toplevel(self.root)
+        window.title("清理重复文件")
+        window.geometry("760x480")
+        window.resizable(True, True)
+        
+        options = ttk.Frame(window)
+        options.pack(fill=tk.X, padx=10, pady=(10, 5))
+        keep_var = tk.StringVar(value=KEEP_NEWEST)
+        ttk.Label(options, text="保留:").grid(row=0, column=0, sticky=tk.W, padx=(0, 5))
+        ttk.Radiobutton(options, text="修改时间最新的", value=KEEP_NEWEST, variable=keep_var).grid(row=0, column=1, sticky=tk.W)
+        ttk.Radiobutton(options, text="位于首选文件夹中的", value=KEEP_PREFERRED_ROOT,
+                        variable=keep_var).grid(row=0, column=2, sticky=tk.W)
+        preferred_var = tk.StringVar(value=self.result_roots[0] if self.result_roots else "")
+        ttk.Combobox(options, textvariable=preferred_var, values=self.result_roots).grid(row=0, column=3, sticky=tk.EW)
+        
+        action_var = tk.StringVar(value=ACTION_HARDLINK)
+        ttk.Label(options, text="其余文件:").grid(row=1, column=0, sticky=tk.W, padx=(0, 5))
+        for column, action in enumerate((ACTION_HARDLINK, ACTION_REFLINK, ACTION_DELETE), 1):
+            ttk.Radiobutton(options, text=ACTION_LABELS[action], value=action,
+                            variable=action_var).grid(row=1, column=column, sticky=tk.W)
+        
+        selected_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(options, text="只处理选中的组", variable=selected_var).grid(row=2, column=1, sticky=tk.W)
+        verify_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(options, text="处理前逐字节确认", variable=verify_var).grid(row=2, column=2, sticky=tk.W)
+        options.grid_columnconfigure(3, weight=1)
+        
+        summary_var = tk.StringVar(value="点击“预览”查看将要处理的文件和可回收的空间")
+        ttk.Label(window, textvariable=summary_var, wraplength=740).pack(fill=tk.X, padx=10, pady=5)
+        
+        text_frame = ttk.Frame(window)
+        text_frame.pack(fill=tk.BOTH, expand=True, padx=10)
+        text_widget = tk.Text(text_frame, font=('SimHei', 9))
+        scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        text_widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        preview = VirtualTextList(text_widget, scrollbar, [])
+        
+        def make_plan():
+            preferred = [preferred_var.get()] if keep_var.get() == KEEP_PREFERRED_ROOT and preferred_var.get() else []
+            groups, folder_groups = self._reclaimable_groups(selected_var.get())
+            try:
+                plan = build_plan(groups, action_var.get(), keep_var.get(), preferred, folder_groups)
+            except ValueError as e:
+                messagebox.showerror("错误", str(e), parent=window)
+                return None
+            # 预演报告：每个文件的处理方式和汇总
+            preview.lines = plan.report()
+            preview.offset = 0
+            preview.refresh()
+            summary_var.set(plan.summary())
+            return plan
+        
+        def execute():
+            plan = make_plan()
+            if plan is None or not plan.actions:
+                return
+            if not messagebox.askyesno("确认", f"{plan.summary()}。\n\n确定要执行吗？", parent=window):
+                return
+            window.destroy()
+            self._start_reclaim(plan, verify_var.get())
+        
+        button_frame = ttk.Frame(window)
+        button_frame.pack(fill=tk.X, padx=10, pady=10)
+        ttk.Button(button_frame, text="关闭", command=window.destroy).pack(side=tk.RIGHT)
+        ttk.Button(button_frame, text="执行", command=execute).pack(side=tk.RIGHT, padx=(0, 5))
+        ttk.Button(button_frame, text="预览", command=make_plan).pack(side=tk.RIGHT, padx=(0, 5))
+    
+    def _start_reclaim(self, plan, verify_content):
+        """在后台线程中按计划回收空间，进度显示在状态栏"""
+        try:
+            journal = ReclaimJournal.create(ReclaimJournal.default_path(), plan)
+        except OSError as e:
+            messagebox.showerror("错误", f"无法创建回收日志: {e}")
+            return
+        self._stop_watch()
+        self.reclaiming = True
+        self.reclaimer = Reclaimer(journal, verify_content=verify_content, keep_running=lambda: self.reclaiming)
+        self.scan_button.config(state=tk.DISABLED)
+        self.reclaim_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        threading.Thread(target=self._reclaim_thread, args=(self.reclaimer,), daemon=True).start()
+        self._check_reclaim_progress()
+    
+    def _reclaim_thread(self, reclaimer):
+        """执行回收计划（在后台线程中运行）"""
+        try:
+            finished = reclaimer.run()
+        except Exception as e:
+            finished, error = None, str(e)
+        else:
+            error = None
+        finally:
+            reclaimer.journal.close()
+        self.root.after(0, lambda: self._finish_reclaim(reclaimer, finished, error))
+    
+    def _check_reclaim_progress(self):
+        """读取回收进度并更新状态栏"""
+        reclaimer = self.reclaimer
+        if reclaimer is None:
+            return
+        if reclaimer.total:
+            self.progress_var.set(reclaimer.processed * 100 / reclaimer.total)
+        self.stats_var.set(f"正在清理重复文件... {reclaimer.processed}/{reclaimer.total}")
+        self.root.after(self.PROGRESS_POLL_INTERVAL, self._check_reclaim_progress)
+    
+    def _finish_reclaim(self, reclaimer, finished, error):
+        """在主线程中报告回收结果"""
+        self.reclaimer = None
+        # 回收后结果已经过期，重新扫描之前不再允许清理
+        self.has_reclaimable = False
+        path = reclaimer.journal.path
+        if error is not None:
+            messagebox.showerror("错误", f"清理过程中发生错误: {error}\n\n可以用 reclaim.py --resume {path} 继续，"
+                                        f"或用 --rollback 撤销已完成的处理")
+            self.stats_var.set("清理失败")
+        elif finished:
+            self.stats_var.set(f"清理完成：{reclaimer.summary()}。结果列表可能已过期，建议重新扫描。日志: {path}")
+        else:
+            self.stats_var.set(f"清理已停止：{reclaimer.summary()}。可以用 reclaim.py --resume {path} 继续")
+        self._reset_scan_ui()
+    
+    def export_metrics(self):
+        """把最近一次扫描的性能指标保存为 JSON 文件"""
+        if self.last_metrics is None:
+            return
+        path = filedialog.asksaveasfilename(title="导出扫描指标", defaultextension=".json",
+                                            initialfile="scan_metrics.json",
+                                            filetypes=[("JSON 文件", "*.json"), ("所有文件", "*.*")])
+        if not path:
+            return
+        try:
+            self.last_metrics.write_json(path)
+        except OSError as e:
+            messagebox.showerror("错误", f"无法保存扫描指标: {e}")
+            return
+        summary = self.last_metrics.summary()
+        phases = "，".join(f"{phase} {times['wall']:.2f} 秒" for phase, times in summary['phases'].items())
+        self.stats_var.set(f"扫描指标已保存到 {path}（{phases}）")
+    
+    def show_usage_dialog(self):
+        """显示最近一次扫描统计的磁盘占用"""
+        usage = self.last_usage
+        if usage is None:
+            return
+        window = tk.Toplevel(self.root)
+        window.title("磁盘占用")
+        window.geometry("760x480")
+        window.resizable(True, True)
+        
+        text_frame = ttk.Frame(window)
+        text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 0))
+        text_widget = tk.Text(text_frame, font=('SimHei', 9))
+        scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        text_widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        VirtualTextList(text_widget, scrollbar, usage_report(usage))
+        
+        def export():
+            path = filedialog.asksaveasfilename(parent=window, title="导出磁盘占用", defaultextension=".json",
+                                                initialfile="disk_usage.json",
+                                                filetypes=[("JSON 文件", "*.json"), ("所有文件", "*.*")])
+            if not path:
+                return
+            try:
+                usage.write_json(path)
+            except OSError as e:
+                messagebox.showerror("错误", f"无法保存磁盘占用统计: {e}", parent=window)
+        
+        button_frame = ttk.Frame(window)
+        button_frame.pack(fill=tk.X, padx=10, pady=10)
+        ttk.Button(button_frame, text="关闭", command=window.destroy).pack(side=tk.RIGHT)
+        ttk.Button(button_frame, text="导出...", command=export).pack(side=tk.RIGHT, padx=(0, 5))
+    
+    def clear_results(self):
+        """清空结果列表"""
+        self._stop_watch()
+        self.result_model.clear()
+        self.result_view.reset()
+        self.has_reclaimable = False
+        self.reclaim_button.config(state=tk.DISABLED)
+        self.stats_var.set("结果已清空")
+    
+    def sort_by_column(self, col):
+        """按指定列排序结果"""
+        # 切换排序顺序
+        if self.sort_column == col:
+            self.sort_order = "descending" if self.sort_order == "ascending" else "ascending"
+        else:
+            self.sort_column = col
+            self.sort_order = "ascending"
+        
+        # 在后备模型中按预先计算的排序键排序，然后只重新渲染可见的行
+        self.result_model.sort(col, reverse=(self.sort_order == "descending"))
+        self.result_view.reset()
+        
+        # 更新标题，只在当前排序列显示排序指示
+        for c in self.RESULT_COLUMNS:
+            text = self.COLUMN_HEADINGS[c]
+            if c == col:
+                text += " ↓" if self.sort_order == "descending" else " ↑"
+            self.result_tree.heading(c, text=text)
+    
+    def _check_scan_progress(self):
+        """检查扫描进度并更新UI"""
+        if self.scanning and self.scan_thread.is_alive():
+            # 按固定频率读取进度通道，界面开销与文件数量无关
+            snap = self.progress.snapshot()
+            self.progress_var.set(self.progress.percent())
+            if time.monotonic() - self._stream_applied_at >= self.STREAM_INTERVAL:
+                self._apply_streamed_results()
+            found = f"，已发现 {len(self.result_model)} 组重复" if len(self.result_model) else ""
+            if snap['phase'] == ScanProgress.PHASE_HASH:
+                self.stats_var.set(f"正在比对文件内容... {snap['hashed_files']}/{snap['hash_total']}{found}")
+            else:
+                self.stats_var.set(f"正在扫描文件... 已扫描 {snap['files']} 个文件，剩余 {snap['dirs_pending']} 个目录{found}")
+            self.root.after(self.PROGRESS_POLL_INTERVAL, self._check_scan_progress)
+    
+    def cancel_scan(self):
+        """取消正在进行的扫描或空间回收"""
+        if self.reclaimer is not None:
+            # 当前文件处理完后停止，日志中保留进度，可以用 reclaim.py --resume 继续
+            self.reclaiming = False
+            self.stats_var.set("正在停止清理...")
+            return
+        self.scanning = False
+        self.stats_var.set("正在取消扫描...")
+    
+    def pause_scan(self):
+        """暂停正在进行的扫描，把进度保存到检查点"""
+        if self.scanner is not None:
+            self.scanner.pause()
+            self.pause_button.config(state=tk.DISABLED)
+            self.stats_var.set("正在暂停扫描并保存进度...")
+        
+    def _reset_scan_ui(self):
+        """重置扫描相关的UI组件状态"""
+        self.scanning = False
+        self.scanner = None
+        self.scan_button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+        self.pause_button.config(state=tk.DISABLED)
+        self.metrics_button.config(state=tk.NORMAL if self.last_metrics is not None else tk.DISABLED)
+        self.usage_button.config(state=tk.NORMAL if self.last_usage is not None else tk.DISABLED)
+        # 不在这里由所有结果行重建重复组：结果很多时代价很高，改用结果到达时更新的标志
+        self.reclaim_button.config(state=tk.NORMAL if self.has_reclaimable else tk.DISABLED)
+        self.progress_var.set(0)
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = FileDuplicateChecker(root)
     root.mainloop()
\ No newline at end of file
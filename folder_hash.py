@@ -0,0 +1,108 @@
+import os
+import hashlib
+import itertools
+
+
+class FolderHasher:
+    """自底向上计算每个目录的 Merkle 哈希，找出内容完全相同的子树
+
+    目录的哈希由其中每个文件的名称、大小和内容标识，以及每个子目录的名称和哈希得出，
+    与目录自身的名称无关，因此 photos 和 photos 副本 这样改了名的副本也能找出。
+    内容标识为文件所在内容重复组的组标识：两个相同的子树中每个文件都在另一个子树中有副本，
+    因此没有进入任何重复组的文件（token 为 None）所在的目录及其所有上级目录都不可能重复，
+    不需要为此额外读取任何文件。空目录和被过滤规则排除的文件不参与比较。
+    """
+
+    def __init__(self, roots):
+        self.roots = set(roots)
+        # 目录路径 -> [(文件名, 大小, 内容标识)]
+        self._files = {}
+        # 直接包含无副本文件的目录
+        self._unique = set()
+        # 目录路径 -> 摘要（不可能重复时为 None）、总大小和文件数
+        self.digests = {}
+        self.sizes = {}
+        self.counts = {}
+        # 至少出现两次的摘要 -> 目录路径列表
+        self._duplicates = {}
+
+    def add_file(self, path, size, token):
+        """记录一个文件；token 为其内容标识，没有副本的文件为 None"""
+        dir_path, name = os.path.split(path)
+        if token is None:
+            self._unique.add(dir_path)
+        else:
+            self._files.setdefault(dir_path, []).append((name, size, token))
+
+    def _tree(self):
+        """返回 目录 -> 子目录列表，包括从每个含有文件的目录到其根目录之间的所有目录"""
+        subdirs = {}
+        for dir_path in itertools.chain(self._files, self._unique):
+            if dir_path in subdirs:
+                continue
+            subdirs[dir_path] = []
+            while dir_path not in self.roots:
+                parent = os.path.dirname(dir_path)
+                if parent == dir_path:
+                    break
+                known = parent in subdirs
+                subdirs.setdefault(parent, []).append(dir_path)
+                if known:
+                    break
+                dir_path = parent
+        return subdirs
+
+    def compute(self):
+        """计算所有目录的摘要，返回重复的目录组 [(摘要, 总大小, 文件数, 目录路径列表)]
+
+        一组目录如果分别是同一组重复的上级目录的副本里的同名子目录，已由上级目录的结果表示，
+        不再单独列出（见 covers）。
+        """
+        subdirs = self._tree()
+        digests, sizes, counts = self.digests, self.sizes, self.counts
+        # 子目录总是比上级目录深，按深度从深到浅计算
+        for dir_path in sorted(subdirs, key=lambda path: path.count(os.sep), reverse=True):
+            children = subdirs[dir_path]
+            if dir_path in self._unique or any(digests[child] is None for child in children):
+                digests[dir_path] = None
+                continue
+            h = hashlib.blake2b(digest_size=16)
+            size = count = 0
+            for name, file_size, token in sorted(self._files.get(dir_path, ())):
+                h.update(b"f\0" + os.fsencode(name) + b"\0" + str(file_size).encode() + b"\0" + token.encode() + b"\n")
+                size += file_size
+                count += 1
+            for child in sorted(children, key=os.path.basename):
+                h.update(b"d\0" + os.fsencode(os.path.basename(child)) + b"\0" + digests[child] + b"\n")
+                size += sizes[child]
+                count += counts[child]
+            digests[dir_path] = h.digest()
+            sizes[dir_path] = size
+            counts[dir_path] = count
+
+        by_digest = {}
+        for dir_path, digest in digests.items():
+            if digest is not None and counts[dir_path]:
+                by_digest.setdefault(digest, []).append(dir_path)
+        self._duplicates = {digest: paths for digest, paths in by_digest.items() if len(paths) > 1}
+
+        groups = []
+        for digest, paths in self._duplicates.items():
+            if not self.roots.intersection(paths) and self.covers(paths):
+                continue
+            groups.append((digest, sizes[paths[0]], counts[paths[0]], sorted(paths)))
+        return groups
+
+    def covers(self, paths):
+        """一组内容相同的文件或目录是否已由上级目录的重复结果表示
+
+        要求它们分别位于同一组重复目录的不同副本中，且在副本中的名称相同，即每个副本中恰好一个、
+        彼此互为对应的位置。同一个副本中有两个相同的文件时，这些重复在保留的副本中仍然存在，不能省略。
+        """
+        parents = [os.path.dirname(path) for path in paths]
+        if len(set(parents)) != len(paths) or len({os.path.basename(path) for path in paths}) != 1:
+            return False
+        digests = {self.digests.get(parent) for parent in parents}
+        if len(digests) != 1:
+            return False
+        return digests.pop() in self._duplicates
@@ -0,0 +1,409 @@
+import os
+import sys
+import errno
+import ctypes
+import ctypes.util
+import select
+import struct
+import threading
+
+
+# 事件类型
+EVENT_CREATED = "created"
+EVENT_DELETED = "deleted"
+EVENT_MODIFIED = "modified"
+
+
+class WatchLimitReached(OSError):
+    """inotify 监视数量达到系统上限（fs.inotify.max_user_watches）"""
+
+
+class PollingWatcher:
+    """定期轮询目录 mtime 的监视器，作为 inotify 不可用时的后备方案
+
+    每轮只 stat 已知目录，mtime 变化的目录才重新列举并与上次结果比较；
+    track_modifications 为 True 时还会比较文件的大小和 mtime，以发现内容修改。
+    回调参数为 (事件类型, 路径, 是否为目录)，在监视线程中调用。
+    accept_dir(目录路径) 返回 False 的子目录不会被列举和监视。
+    """
+    DEFAULT_INTERVAL = 5.0
+
+    def __init__(self, root_path, callback, interval=DEFAULT_INTERVAL, track_modifications=False, accept_dir=None):
+        self.root_path = root_path
+        self.callback = callback
+        self.interval = interval
+        self.track_modifications = track_modifications
+        self.accept_dir = accept_dir or (lambda dir_path: True)
+        self._stop = threading.Event()
+        self._thread = None
+        # 目录路径 -> (mtime_ns, 子目录名集合, {文件名: (大小, mtime_ns)})
+        self._snapshot = {}
+
+    def start(self):
+        """建立初始快照并启动轮询线程"""
+        self._snapshot_tree(self.root_path, emit=False)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止轮询"""
+        self._stop.set()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+
+    def _list(self, dir_path):
+        """列举目录，返回 (mtime_ns, 子目录名集合, {文件名: (大小, mtime_ns)})"""
+        mtime_ns = os.stat(dir_path).st_mtime_ns
+        subdirs = set()
+        files = {}
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.add(entry.name)
+                    elif not (entry.is_symlink() and entry.is_dir()):
+                        if self.track_modifications:
+                            st = entry.stat()
+                            files[entry.name] = (st.st_size, st.st_mtime_ns)
+                        else:
+                            files[entry.name] = None
+                except OSError:
+                    continue
+        return mtime_ns, subdirs, files
+
+    def _snapshot_tree(self, dir_path, emit):
+        """记录整棵子树的快照，emit 为 True 时为其中的文件发出创建事件"""
+        pending = [dir_path]
+        while pending and not self._stop.is_set():
+            current = pending.pop()
+            try:
+                listing = self._list(current)
+            except OSError:
+                continue
+            self._snapshot[current] = listing
+            pending.extend(path for path in (os.path.join(current, name) for name in listing[1])
+                           if self.accept_dir(path))
+            if emit:
+                for name in listing[2]:
+                    self.callback(EVENT_CREATED, os.path.join(current, name), False)
+
+    def _forget_tree(self, dir_path):
+        """从快照中移除整棵子树"""
+        prefix = dir_path.rstrip(os.sep) + os.sep
+        for path in [p for p in self._snapshot if p == dir_path or p.startswith(prefix)]:
+            del self._snapshot[path]
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll_once()
+
+    def poll_once(self):
+        """执行一轮轮询"""
+        for dir_path in list(self._snapshot):
+            if self._stop.is_set():
+                return
+            old = self._snapshot.get(dir_path)
+            if old is None:
+                # 已随父目录一起被移除
+                continue
+
+            try:
+                mtime_ns = os.stat(dir_path).st_mtime_ns
+            except OSError:
+                # 目录已被删除，由父目录的比较负责发出事件
+                continue
+            if mtime_ns == old[0] and not self.track_modifications:
+                continue
+
+            try:
+                new = self._list(dir_path)
+            except OSError:
+                continue
+            self._snapshot[dir_path] = new
+            _, old_subdirs, old_files = old
+            _, new_subdirs, new_files = new
+
+            for name in old_files.keys() - new_files.keys():
+                self.callback(EVENT_DELETED, os.path.join(dir_path, name), False)
+            for name in new_files.keys() - old_files.keys():
+                self.callback(EVENT_CREATED, os.path.join(dir_path, name), False)
+            if self.track_modifications:
+                for name in new_files.keys() & old_files.keys():
+                    if new_files[name] != old_files[name]:
+                        self.callback(EVENT_MODIFIED, os.path.join(dir_path, name), False)
+
+            for name in old_subdirs - new_subdirs:
+                path = os.path.join(dir_path, name)
+                self._forget_tree(path)
+                self.callback(EVENT_DELETED, path, True)
+            for name in new_subdirs - old_subdirs:
+                path = os.path.join(dir_path, name)
+                if self.accept_dir(path):
+                    self._snapshot_tree(path, emit=True)
+
+
+class InotifyWatcher:
+    """基于 Linux inotify 的监视器
+
+    为根目录下的每个子目录添加一个监视，新建或移入的目录会被自动加入监视，
+    其中已有的文件会补发创建事件。移动操作被拆分为源路径的删除事件和目标路径的
+    创建事件。添加监视时达到系统上限会调用 on_limit_reached 回调。
+    """
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+                  | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+    EVENT_HEADER = struct.Struct('iIII')
+    READ_SIZE = 64 * 1024
+
+    def __init__(self, root_path, callback, on_limit_reached=None, on_overflow=None, accept_dir=None):
+        self.root_path = root_path
+        self.callback = callback
+        self.accept_dir = accept_dir or (lambda dir_path: True)
+        self.on_limit_reached = on_limit_reached
+        self.on_overflow = on_overflow
+        self._libc = self._load_libc()
+        self._fd = None
+        self._wd_paths = {}
+        self._path_wds = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def is_supported():
+        """当前系统是否支持 inotify"""
+        return sys.platform.startswith('linux')
+
+    @staticmethod
+    def _load_libc():
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        return libc
+
+    def _check(self, result):
+        if result < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                raise WatchLimitReached(err, "inotify 监视数量已达到系统上限")
+            raise OSError(err, os.strerror(err))
+        return result
+
+    def start(self):
+        """为整棵目录树添加监视并启动读取线程，监视数量不足时抛出 WatchLimitReached"""
+        self._fd = self._check(self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC))
+        try:
+            self._watch_tree(self.root_path, emit=False)
+        except WatchLimitReached:
+            self._close()
+            raise
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止监视并释放 inotify 句柄"""
+        self._stop.set()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._close()
+
+    def _close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _add_watch(self, dir_path):
+        try:
+            wd = self._check(self._libc.inotify_add_watch(self._fd, os.fsencode(dir_path), self.WATCH_MASK))
+        except WatchLimitReached:
+            raise
+        except OSError:
+            # 目录已消失或无权限，忽略
+            return
+        self._wd_paths[wd] = dir_path
+        self._path_wds[dir_path] = wd
+
+    def _watch_tree(self, dir_path, emit):
+        """为子树中的每个目录添加监视，emit 为 True 时为已有文件补发创建事件"""
+        pending = [dir_path]
+        while pending:
+            current = pending.pop()
+            self._add_watch(current)
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if self.accept_dir(entry.path):
+                                    pending.append(entry.path)
+                            elif emit and not (entry.is_symlink() and entry.is_dir()):
+                                self.callback(EVENT_CREATED, entry.path, False)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+
+    def _unwatch_tree(self, dir_path):
+        """移除子树中所有目录的监视"""
+        prefix = dir_path.rstrip(os.sep) + os.sep
+        for path in [p for p in self._path_wds if p == dir_path or p.startswith(prefix)]:
+            wd = self._path_wds.pop(path)
+            self._wd_paths.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                readable, _, _ = select.select([self._fd], [], [], 0.5)
+            except (OSError, ValueError):
+                return
+            if not readable:
+                continue
+            try:
+                data = os.read(self._fd, self.READ_SIZE)
+            except BlockingIOError:
+                continue
+            except OSError:
+                return
+            try:
+                self._dispatch(data)
+            except WatchLimitReached:
+                # 运行中添加新目录时达到上限，交由调用方切换到轮询
+                if self.on_limit_reached:
+                    self.on_limit_reached()
+                return
+
+    def _dispatch(self, data):
+        """解析一批 inotify 事件并转换为回调"""
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(data):
+            wd, mask, _, name_len = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + name_len].rstrip(b'\0'))
+            offset += name_len
+
+            if mask & self.IN_Q_OVERFLOW:
+                # 事件队列溢出，内存中的索引可能已不准确
+                if self.on_overflow:
+                    self.on_overflow()
+                continue
+            if mask & self.IN_IGNORED:
+                continue
+
+            dir_path = self._wd_paths.get(wd)
+            if dir_path is None or not name:
+                continue
+            path = os.path.join(dir_path, name)
+            is_dir = bool(mask & self.IN_ISDIR)
+
+            if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                if is_dir:
+                    if self.accept_dir(path):
+                        self._watch_tree(path, emit=True)
+                elif not os.path.isdir(path):
+                    self.callback(EVENT_CREATED, path, False)
+            elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                if is_dir:
+                    self._unwatch_tree(path)
+                self.callback(EVENT_DELETED, path, is_dir)
+            elif mask & self.IN_CLOSE_WRITE:
+                self.callback(EVENT_MODIFIED, path, False)
+
+
+class DirectoryWatcher:
+    """目录树监视器：Linux 上优先使用 inotify，不可用或监视数量耗尽时退回轮询
+
+    回调参数为 (事件类型, 路径, 是否为目录)，在后台线程中调用。
+    on_resync 在事件可能丢失（inotify 队列溢出）时调用。
+    accept_dir(目录路径) 返回 False 的子目录（例如被过滤规则剪枝的目录）不会被监视。
+    """
+
+    def __init__(self, root_path, callback, track_modifications=False, poll_interval=PollingWatcher.DEFAULT_INTERVAL,
+                 on_resync=None, accept_dir=None):
+        self.root_path = root_path
+        self.callback = callback
+        self.track_modifications = track_modifications
+        self.poll_interval = poll_interval
+        self.on_resync = on_resync
+        self.accept_dir = accept_dir
+        self.backend = None
+        self._lock = threading.Lock()
+        self._stopped = False
+
+    @property
+    def mode(self):
+        """当前使用的监视方式：'inotify' 或 'polling'"""
+        return 'inotify' if isinstance(self.backend, InotifyWatcher) else 'polling'
+
+    def start(self):
+        with self._lock:
+            if InotifyWatcher.is_supported():
+                try:
+                    backend = InotifyWatcher(self.root_path, self.callback,
+                                             on_limit_reached=self._fall_back_to_polling,
+                                             on_overflow=self.on_resync, accept_dir=self.accept_dir)
+                    backend.start()
+                    self.backend = backend
+                    return
+                except (OSError, AttributeError):
+                    # 监视数量不足或系统不支持 inotify
+                    pass
+            self._start_polling()
+
+    def _start_polling(self):
+        self.backend = PollingWatcher(self.root_path, self.callback, interval=self.poll_interval,
+                                      track_modifications=self.track_modifications, accept_dir=self.accept_dir)
+        self.backend.start()
+
+    def _fall_back_to_polling(self):
+        """运行中 inotify 监视数量耗尽时切换到轮询"""
+        with self._lock:
+            if self._stopped:
+                return
+            self.backend.stop()
+            self._start_polling()
+
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+            if self.backend is not None:
+                self.backend.stop()
+                self.backend = None
+
+
+class MultiRootWatcher:
+    """同时监视多个根目录，每个根目录使用一个 DirectoryWatcher，接口与 DirectoryWatcher 相同"""
+
+    def __init__(self, root_paths, callback, **options):
+        self.root_paths = list(root_paths)
+        self.watchers = [DirectoryWatcher(root, callback, **options) for root in self.root_paths]
+
+    @property
+    def mode(self):
+        """全部根目录都使用 inotify 时为 'inotify'，否则为 'polling'"""
+        return 'inotify' if all(watcher.mode == 'inotify' for watcher in self.watchers) else 'polling'
+
+    def start(self):
+        try:
+            for watcher in self.watchers:
+                watcher.start()
+        except OSError:
+            self.stop()
+            raise
+
+    def stop(self):
+        for watcher in self.watchers:
+            watcher.stop()
@@ -0,0 +1,132 @@
+import os
+import heapq
+import queue
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def is_rotational(device):
+    """判断设备号对应的块设备是否为机械硬盘，无法判断时返回 None
+
+    读取 Linux 的 /sys/dev/block/<主设备号>:<次设备号>/queue/rotational，
+    分区没有自己的 queue 目录，改读其所在磁盘的设置。
+    """
+    try:
+        block_dir = os.path.realpath(f"/sys/dev/block/{os.major(device)}:{os.minor(device)}")
+    except (AttributeError, ValueError):
+        return None
+    for candidate in (block_dir, os.path.dirname(block_dir)):
+        try:
+            with open(os.path.join(candidate, "queue", "rotational")) as f:
+                return f.read().strip() == "1"
+        except OSError:
+            continue
+    return None
+
+
+class HashScheduler:
+    """按存储设备调度哈希任务的线程池
+
+    待哈希的文件按 st_dev 分组，每个设备使用独立的线程池和并发上限：固态硬盘
+    可以同时处理多个请求，机械硬盘并发读取只会增加寻道，因此只用一个线程。
+    hashlib 在计算较大数据块时会释放 GIL，多个线程可以同时占用多个 CPU 核心。
+
+    submit() 提交任务，results() 按完成顺序产出 (标签, 路径, 结果)，结果为摘要
+    或任务抛出的 OSError，任务抛出的其他异常由 results() 重新抛出；迭代过程中可以继续
+    提交新任务。同一设备上排队的任务按 priority 从小到大执行，priority 相同时按提交顺序
+    执行，后提交的紧急任务可以插到前面。
+    """
+    # 各类设备的并发上限
+    SSD_CONCURRENCY = min(16, os.cpu_count() or 4)
+    HDD_CONCURRENCY = 1
+    # 无法判断设备类型时（网络文件系统、非 Linux 系统等）使用的并发数
+    DEFAULT_CONCURRENCY = min(4, os.cpu_count() or 4)
+
+    def __init__(self, keep_running=None):
+        self.keep_running = keep_running or (lambda: True)
+        self._executors = {}
+        # 设备 -> 排队任务的小顶堆：(priority, 提交序号, 标签, 路径, 哈希函数)
+        self._pending = {}
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._results = queue.Queue()
+        self._outstanding = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    @classmethod
+    def concurrency_for(cls, device):
+        """返回设备的并发上限"""
+        rotational = is_rotational(device)
+        if rotational is None:
+            return cls.DEFAULT_CONCURRENCY
+        return cls.HDD_CONCURRENCY if rotational else cls.SSD_CONCURRENCY
+
+    def _executor_for(self, device):
+        with self._lock:
+            executor = self._executors.get(device)
+            if executor is None:
+                executor = ThreadPoolExecutor(max_workers=self.concurrency_for(device),
+                                              thread_name_prefix=f"hash-{device}")
+                self._executors[device] = executor
+            return executor
+
+    def submit(self, tag, path, hash_func, device=None, priority=0):
+        """提交一个任务：在 path 所在设备的线程池中执行 hash_func(path)"""
+        self._outstanding += 1
+        if device is None:
+            try:
+                device = os.stat(path).st_dev
+            except OSError as e:
+                self._results.put((tag, path, e))
+                return
+        with self._lock:
+            heapq.heappush(self._pending.setdefault(device, []),
+                           (priority, next(self._sequence), tag, path, hash_func))
+        # 线程池中的每个作业执行时才从堆中取出当前最优先的任务，作业数与排队的任务数相同
+        self._executor_for(device).submit(self._run_next, device)
+
+    def _run_next(self, device):
+        with self._lock:
+            _, _, tag, path, hash_func = heapq.heappop(self._pending[device])
+        self._run(tag, path, hash_func)
+
+    def _run(self, tag, path, hash_func):
+        if not self.keep_running():
+            result = OSError("扫描已取消")
+        else:
+            try:
+                result = hash_func(path)
+            except Exception as e:
+                # 其他异常（例如索引数据库出错）也要送回，否则 results() 会一直等待这个任务
+                result = e
+        self._results.put((tag, path, result))
+
+    def results(self):
+        """按完成顺序产出已提交任务的结果，全部完成或被取消时结束"""
+        while self._outstanding:
+            try:
+                item = self._results.get(timeout=0.1)
+            except queue.Empty:
+                if not self.keep_running():
+                    return
+                continue
+            self._outstanding -= 1
+            if isinstance(item[2], Exception) and not isinstance(item[2], OSError):
+                raise item[2]
+            yield item
+
+    def shutdown(self):
+        """取消尚未开始的任务并等待正在执行的任务结束"""
+        with self._lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+        for executor in executors:
+            executor.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            self._pending.clear()
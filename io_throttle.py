@@ -0,0 +1,218 @@
+import os
+import sys
+import time
+import threading
+
+from scan_filter import parse_size
+
+try:
+    import ctypes
+except ImportError:
+    ctypes = None
+
+
+# Linux ioprio_set 的系统调用号（按架构）和空闲 I/O 调度类
+_IOPRIO_SYSCALLS = {"x86_64": 251, "i386": 289, "i686": 289, "aarch64": 30, "armv7l": 314, "ppc64le": 273}
+_IOPRIO_WHO_PROCESS = 1
+_IOPRIO_CLASS_IDLE = 3
+_IOPRIO_CLASS_SHIFT = 13
+
+
+def set_idle_priority():
+    """把当前线程的 CPU 和 I/O 优先级降到最低，此后创建的线程也会继承
+
+    Linux 上 nice 和 ioprio 都按线程生效，因此只影响扫描线程及其创建的遍历和哈希线程，
+    界面线程不受影响；其他系统上 nice 作用于整个进程。返回实际生效的设置说明列表。
+    """
+    applied = []
+    if hasattr(os, 'nice'):
+        try:
+            os.nice(19 - os.nice(0))
+            applied.append("nice 19")
+        except OSError:
+            pass
+    number = _IOPRIO_SYSCALLS.get(os.uname().machine) if sys.platform.startswith("linux") else None
+    if number is not None and ctypes is not None:
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            # who 为 0 表示当前线程
+            if libc.syscall(number, _IOPRIO_WHO_PROCESS, 0, _IOPRIO_CLASS_IDLE << _IOPRIO_CLASS_SHIFT) == 0:
+                applied.append("idle I/O")
+        except (OSError, AttributeError):
+            pass
+    return applied
+
+
+class _TokenBucket:
+    """令牌桶：按 rate 每秒补充令牌，最多积攒 1 秒的量；令牌不足时允许透支，由调用方等待"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.level = rate
+        self.updated = time.monotonic()
+
+    def take(self, amount, slowdown):
+        """取出 amount 个令牌，返回需要等待的秒数（调用方需持有锁）"""
+        now = time.monotonic()
+        rate = self.rate / slowdown
+        self.level = min(rate, self.level + (now - self.updated) * rate)
+        self.updated = now
+        self.level -= amount
+        return -self.level / rate if self.level < 0 else 0.0
+
+
+class _Latency:
+    """一类操作延迟的快慢两个指数移动平均：快的反映当前状况，慢的作为基准"""
+    FAST = 0.3
+    SLOW = 0.02
+
+    def __init__(self):
+        self.fast = None
+        self.slow = None
+
+    def add(self, seconds):
+        if self.fast is None:
+            self.fast = self.slow = seconds
+        else:
+            self.fast += (seconds - self.fast) * self.FAST
+            self.slow += (seconds - self.slow) * self.SLOW
+
+    @property
+    def ratio(self):
+        return self.fast / self.slow if self.slow else 1.0
+
+
+class IOThrottle:
+    """扫描引擎的 I/O 预算，使扫描可以在繁忙的生产服务器上运行
+
+    bytes_per_sec 限制读取文件内容（哈希和逐字节校验）的速率，ops_per_sec 限制目录列举和
+    stat 等元数据操作的速率，两者由所有遍历和哈希线程共享。adaptive 为 True 时观察每类操作的延迟：
+    当前延迟明显高于长期基准时认为存储已经繁忙，把扫描逐步放慢（两个速率同时降低，未设置速率时
+    在每次操作后等待相应的时间），延迟恢复后再逐步加快。idle 为 True 时扫描线程以最低的
+    CPU 和 I/O 优先级运行（见 set_idle_priority）。
+    """
+    # 当前延迟超过基准的该倍数时放慢一倍，低于 RECOVER_RATIO 时逐步恢复
+    BACKOFF_RATIO = 2.0
+    RECOVER_RATIO = 1.2
+    MAX_SLOWDOWN = 32.0
+    # 两次调整之间的最短间隔（秒）
+    ADJUST_INTERVAL = 0.5
+    # 低于该值的延迟（例如命中页缓存）按该值计，避免基准过小造成误判
+    LATENCY_FLOOR = 0.0005
+    # 单次等待的最长时间（秒），期间检查扫描是否已被取消
+    SLEEP_SLICE = 0.1
+
+    KIND_LIST = "list"
+    KIND_STAT = "stat"
+    KIND_READ = "read"
+
+    def __init__(self, bytes_per_sec=None, ops_per_sec=None, adaptive=False, idle=False):
+        if (bytes_per_sec is not None and bytes_per_sec <= 0) or (ops_per_sec is not None and ops_per_sec <= 0):
+            raise ValueError("限速必须大于 0")
+        self.bytes_per_sec = bytes_per_sec
+        self.ops_per_sec = ops_per_sec
+        self.adaptive = adaptive
+        self.idle = idle
+        self._lock = threading.Lock()
+        self._bytes = _TokenBucket(bytes_per_sec) if bytes_per_sec is not None else None
+        self._ops = _TokenBucket(ops_per_sec) if ops_per_sec is not None else None
+        self._latency = {kind: _Latency() for kind in (self.KIND_LIST, self.KIND_STAT, self.KIND_READ)}
+        self._adjusted = time.monotonic()
+        # 当前的放慢倍数，1 表示按设置的速率运行
+        self.slowdown = 1.0
+        # 每个线程尚未等待的自适应延迟
+        self._debt = threading.local()
+        self.keep_running = lambda: True
+        self.metrics = None
+
+    @property
+    def active(self):
+        """是否设置了任何限制"""
+        return self.bytes_per_sec is not None or self.ops_per_sec is not None or self.adaptive or self.idle
+
+    def bind(self, keep_running, metrics=None):
+        """由扫描器调用：扫描被取消时停止等待，等待时间记录到 metrics"""
+        self.keep_running = keep_running
+        self.metrics = metrics
+
+    def ops(self, count=1):
+        """执行 count 次元数据操作之前调用，超出预算时等待"""
+        if self._ops is not None:
+            with self._lock:
+                wait = self._ops.take(count, self.slowdown)
+            self._sleep(wait)
+
+    def read(self, nbytes):
+        """读取 nbytes 字节之后调用，超出预算时等待"""
+        if self._bytes is not None:
+            with self._lock:
+                wait = self._bytes.take(nbytes, self.slowdown)
+            self._sleep(wait)
+
+    def observe(self, kind, seconds):
+        """记录一次操作的耗时；启用自适应时据此调整放慢倍数，并让出相应的时间"""
+        if not self.adaptive:
+            return
+        with self._lock:
+            latency = self._latency[kind]
+            latency.add(max(seconds, self.LATENCY_FLOOR))
+            now = time.monotonic()
+            if now - self._adjusted >= self.ADJUST_INTERVAL:
+                self._adjusted = now
+                ratio = latency.ratio
+                if ratio > self.BACKOFF_RATIO:
+                    self.slowdown = min(self.MAX_SLOWDOWN, self.slowdown * 2)
+                elif ratio < self.RECOVER_RATIO:
+                    self.slowdown = max(1.0, self.slowdown * 0.8)
+            slowdown = self.slowdown
+        if slowdown > 1.0:
+            # 操作耗时 t 后再等待 t × (倍数 - 1)，使占用存储的时间比例降为 1 / 倍数；
+            # 很短的等待先累积起来，够 10 毫秒再一起等待
+            debt = getattr(self._debt, 'seconds', 0.0) + seconds * (slowdown - 1)
+            if debt >= 0.01:
+                self._sleep(debt)
+                debt = 0.0
+            self._debt.seconds = debt
+
+    def _sleep(self, seconds):
+        if seconds <= 0:
+            return
+        if self.metrics is not None:
+            self.metrics.record_throttle(seconds)
+        deadline = time.monotonic() + seconds
+        while self.keep_running():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, self.SLEEP_SLICE))
+
+    def describe(self):
+        """返回限制的简短中文描述，用于界面状态栏"""
+        parts = []
+        if self.bytes_per_sec is not None:
+            parts.append(f"读取不超过 {self.bytes_per_sec} 字节/秒")
+        if self.ops_per_sec is not None:
+            parts.append(f"元数据操作不超过 {self.ops_per_sec} 次/秒")
+        if self.adaptive:
+            parts.append("存储繁忙时自动放慢")
+        if self.idle:
+            parts.append("最低优先级")
+        return "；".join(parts)
+
+    @staticmethod
+    def add_arguments(parser):
+        """添加限速的命令行参数"""
+        group = parser.add_argument_group("I/O 限速", "在繁忙的服务器上扫描时限制对存储的压力")
+        group.add_argument("--max-read-rate", type=parse_size, default=None, metavar="SIZE",
+                           help="读取文件内容的速率上限（每秒，如 20M）")
+        group.add_argument("--max-ops", type=int, default=None, metavar="N",
+                           help="目录列举和 stat 等元数据操作的速率上限（次/秒）")
+        group.add_argument("--adaptive", action="store_true", help="存储延迟升高时自动放慢扫描，恢复后再加快")
+        group.add_argument("--idle", action="store_true",
+                           help="以最低的 CPU 和 I/O 优先级扫描（Linux 上为 nice 19 和 idle I/O 调度类）")
+
+    @classmethod
+    def from_args(cls, args):
+        """由命令行参数创建限速设置，没有设置任何限制时返回 None"""
+        throttle = cls(args.max_read_rate, args.max_ops, args.adaptive, args.idle)
+        return throttle if throttle.active else None
@@ -0,0 +1,214 @@
+import os
+import unicodedata
+from array import array
+
+
+class DirectoryTable:
+    """目录路径驻留表
+
+    每个目录只分配一个整数编号，并只保存自己的名称和父目录编号（父指针树），
+    完整路径在需要时沿父指针拼接出来。这样一个目录下有再多文件，其路径字符串
+    也只保存一次。
+    """
+    NO_PARENT = -1
+
+    def __init__(self):
+        self.parents = array('i')
+        self.names = []
+        # (父目录编号, 目录名) -> 目录编号；根目录以完整路径为名、父目录编号为 NO_PARENT
+        self._ids = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def _add(self, parent_id, name):
+        dir_id = len(self.names)
+        self.parents.append(parent_id)
+        self.names.append(name)
+        self._ids[(parent_id, name)] = dir_id
+        return dir_id
+
+    def add_root(self, root_path):
+        """登记扫描根目录，返回其编号"""
+        key = (self.NO_PARENT, root_path)
+        dir_id = self._ids.get(key)
+        if dir_id is None:
+            dir_id = self._add(self.NO_PARENT, root_path)
+        return dir_id
+
+    def intern(self, dir_path):
+        """返回目录的编号，必要时为其及尚未登记的上级目录分配编号"""
+        dir_id = self.lookup(dir_path)
+        if dir_id is not None:
+            return dir_id
+
+        # 向上找到已登记的上级目录或文件系统根，再逐级向下登记
+        missing = []
+        current = dir_path
+        parent_id = None
+        while parent_id is None:
+            parent, name = os.path.split(current)
+            if not name or parent == current:
+                parent_id = self.add_root(current)
+                break
+            missing.append(name)
+            parent_id = self.lookup(parent)
+            current = parent
+
+        for name in reversed(missing):
+            child_id = self._ids.get((parent_id, name))
+            parent_id = child_id if child_id is not None else self._add(parent_id, name)
+        return parent_id
+
+    def lookup(self, dir_path):
+        """返回已登记目录的编号，未登记时返回 None"""
+        dir_id = self._ids.get((self.NO_PARENT, dir_path))
+        if dir_id is not None:
+            return dir_id
+        parent, name = os.path.split(dir_path)
+        if not name or parent == dir_path:
+            return None
+        parent_id = self.lookup(parent)
+        if parent_id is None:
+            return None
+        return self._ids.get((parent_id, name))
+
+    def path(self, dir_id):
+        """沿父指针拼接出目录的完整路径"""
+        parts = []
+        while dir_id != self.NO_PARENT:
+            parts.append(self.names[dir_id])
+            dir_id = self.parents[dir_id]
+        return os.path.join(*reversed(parts))
+
+    def is_within(self, dir_id, ancestor_id):
+        """dir_id 是否为 ancestor_id 本身或其下级目录"""
+        while dir_id != self.NO_PARENT:
+            if dir_id == ancestor_id:
+                return True
+            dir_id = self.parents[dir_id]
+        return False
+
+
+class NameKey:
+    """文件名的分组方式，调用时返回文件名的分组键
+
+    normalize_unicode 把文件名规范化为 NFC（macOS 上的文件名常为 NFD），ignore_extension
+    只比较去掉扩展名后的主名，ignore_case 不区分大小写。索引始终保存原始文件名，
+    切换分组方式时只需在内存中重新分组，不需要重新扫描。
+    """
+
+    def __init__(self, ignore_case=False, normalize_unicode=False, ignore_extension=False):
+        self.ignore_case = ignore_case
+        self.normalize_unicode = normalize_unicode
+        self.ignore_extension = ignore_extension
+
+    @property
+    def exact(self):
+        """是否按完整的原始文件名分组"""
+        return not (self.ignore_case or self.normalize_unicode or self.ignore_extension)
+
+    def __call__(self, name):
+        if self.normalize_unicode:
+            name = unicodedata.normalize('NFC', name)
+        if self.ignore_extension:
+            name = os.path.splitext(name)[0]
+        if self.ignore_case:
+            name = name.casefold()
+        return name
+
+    def describe(self):
+        """返回分组方式的简短中文描述"""
+        parts = []
+        if self.ignore_case:
+            parts.append("忽略大小写")
+        if self.normalize_unicode:
+            parts.append("Unicode 规范化")
+        if self.ignore_extension:
+            parts.append("忽略扩展名")
+        return "、".join(parts) or "完整文件名"
+
+
+class NameIndex:
+    """文件名到所在目录编号的紧凑索引
+
+    只出现一次的文件名（绝大多数）直接保存一个整数目录编号，
+    出现多次时才转换为 array('I')，每次出现只占 4 个字节。
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, name, dir_id):
+        """记录一次出现，返回该文件名当前的出现次数"""
+        entry = self._entries.get(name)
+        if entry is None:
+            self._entries[name] = dir_id
+            return 1
+        if type(entry) is int:
+            entry = array('I', (entry,))
+            self._entries[name] = entry
+        entry.append(dir_id)
+        return len(entry)
+
+    def dir_ids(self, name):
+        """返回文件名出现过的所有目录编号"""
+        entry = self._entries.get(name)
+        if entry is None:
+            return []
+        if type(entry) is int:
+            return [entry]
+        return list(entry)
+
+    def remove(self, name, dir_id):
+        """移除一次出现，返回是否确实移除了"""
+        ids = self.dir_ids(name)
+        if dir_id not in ids:
+            return False
+        ids.remove(dir_id)
+        self._set(name, ids)
+        return True
+
+    def remove_where(self, predicate):
+        """移除 predicate(目录编号) 为真的所有出现，返回受影响的文件名"""
+        affected = []
+        for name in list(self._entries):
+            ids = self.dir_ids(name)
+            remaining = [dir_id for dir_id in ids if not predicate(dir_id)]
+            if len(remaining) != len(ids):
+                affected.append(name)
+                self._set(name, remaining)
+        return affected
+
+    def _set(self, name, ids):
+        if not ids:
+            del self._entries[name]
+        elif len(ids) == 1:
+            self._entries[name] = ids[0]
+        else:
+            self._entries[name] = array('I', ids)
+
+    def duplicates(self):
+        """逐个产出出现多次的 (文件名, 目录编号数组)"""
+        for name, entry in self._entries.items():
+            if type(entry) is not int and len(entry) > 1:
+                yield name, entry
+
+    def names_by_key(self, key_func):
+        """按 key_func(文件名) 对所有文件名分组，返回 {分组键: [文件名, ...]}"""
+        groups = {}
+        for name in self._entries:
+            groups.setdefault(key_func(name), []).append(name)
+        return groups
+
+    def count(self, names):
+        """返回一组文件名的总出现次数"""
+        total = 0
+        for name in names:
+            entry = self._entries.get(name)
+            if entry is not None:
+                total += 1 if type(entry) is int else len(entry)
+        return total
@@ -0,0 +1,646 @@
+"""回收重复文件占用的空间
+
+对内容相同的每一组文件保留一份，其余文件替换为指向保留文件的硬链接、reflink
+（共享数据块的副本，只有支持 FICLONE 的文件系统如 Btrfs、XFS 可用），或者直接删除：
+
+    python scan_engine.py /data --mode content > duplicates.jsonl
+    python reclaim.py duplicates.jsonl --action hardlink --keep newest --dry-run
+    python reclaim.py duplicates.jsonl --action hardlink --keep preferred-root --prefer-root /data/master
+
+执行前把计划写入日志（JSON Lines），按批执行并在每批开始和结束时同步到磁盘；
+中断后可以用 --resume 继续，或者用 --rollback 把已处理的文件恢复为独立的副本。
+"""
+import os
+import sys
+import csv
+import json
+import stat
+import time
+import shutil
+import signal
+import filecmp
+import argparse
+from collections import Counter, OrderedDict
+
+from scan_engine import FolderKey, format_size, root_of
+
+try:
+    import fcntl
+except ImportError:
+    # Windows 上没有 fcntl，不支持 reflink
+    fcntl = None
+
+
+# 保留哪一份文件
+KEEP_NEWEST = "newest"
+KEEP_PREFERRED_ROOT = "preferred-root"
+KEEP_STRATEGIES = (KEEP_NEWEST, KEEP_PREFERRED_ROOT)
+
+# 其余文件的处理方式
+ACTION_HARDLINK = "hardlink"
+ACTION_REFLINK = "reflink"
+ACTION_DELETE = "delete"
+ACTIONS = (ACTION_HARDLINK, ACTION_REFLINK, ACTION_DELETE)
+ACTION_LABELS = {ACTION_HARDLINK: "替换为硬链接", ACTION_REFLINK: "替换为 reflink", ACTION_DELETE: "删除"}
+
+# linux/fs.h 中的 FICLONE 请求号
+FICLONE = 0x40049409
+
+# 每批处理的文件数，每批开始和结束时日志各同步一次
+DEFAULT_BATCH_SIZE = 100
+
+# 默认日志目录
+DEFAULT_JOURNAL_DIR = os.path.join(os.path.expanduser("~"), ".file_duplicate_checker", "journals")
+
+JOURNAL_VERSION = 1
+
+
+class ReclaimAction:
+    """对一个重复文件的处理：target 为要替换或删除的文件，keep 为保留的文件
+
+    同时记录制定计划时两个文件的状态，执行前据此确认文件没有被修改，回滚时据此恢复元数据。
+    folder 为目标文件所在的重复目录（按目录回收时），删除其中的文件后会一并删除留下的空目录。
+    """
+    FIELDS = ('id', 'action', 'keep', 'target', 'size', 'dev', 'ino', 'nlink', 'mode', 'uid', 'gid',
+              'atime_ns', 'mtime_ns', 'keep_dev', 'keep_ino', 'keep_mtime_ns', 'folder')
+
+    def __init__(self, **fields):
+        for field in self.FIELDS:
+            setattr(self, field, fields.get(field))
+
+    @classmethod
+    def from_stat(cls, action_id, action, keep, keep_st, target, st, folder=None):
+        return cls(id=action_id, action=action, keep=keep, target=target, size=st.st_size, dev=st.st_dev,
+                   ino=st.st_ino, nlink=st.st_nlink, mode=st.st_mode, uid=st.st_uid, gid=st.st_gid,
+                   atime_ns=st.st_atime_ns, mtime_ns=st.st_mtime_ns, keep_dev=keep_st.st_dev,
+                   keep_ino=keep_st.st_ino, keep_mtime_ns=keep_st.st_mtime_ns, folder=folder)
+
+    def to_record(self):
+        record = {'type': 'action'}
+        record.update((field, getattr(self, field)) for field in self.FIELDS)
+        return record
+
+    @property
+    def reclaimable(self):
+        """处理后能回收的字节数：目标文件还有其他硬链接时数据仍被占用"""
+        return self.size if self.nlink == 1 else 0
+
+    @property
+    def temp_path(self):
+        """替换目标文件时使用的临时文件，与目标位于同一目录，由编号决定，中断后可以找到并清理"""
+        directory, name = os.path.split(self.target)
+        return os.path.join(directory, f".{name}.reclaim-{self.id}.tmp")
+
+
+class ReclaimPlan:
+    """回收计划：actions 为要执行的处理，skipped 为 (路径, 原因) 列表"""
+
+    def __init__(self, action, keep_strategy, preferred_roots=()):
+        self.action = action
+        self.keep_strategy = keep_strategy
+        self.preferred_roots = list(preferred_roots)
+        self.actions = []
+        self.skipped = []
+        self.groups = 0
+        # 已被选为保留或已计划处理的文件和目录，同一个文件只处理一次
+        self.keeps = set()
+        self.targets = set()
+        self.keep_folders = []
+        self.target_folders = []
+
+    @property
+    def reclaimable_bytes(self):
+        return sum(action.reclaimable for action in self.actions)
+
+    def report(self):
+        """预演报告：每个文件的处理方式和汇总，返回文本行列表"""
+        lines = [f"{ACTION_LABELS[a.action]}: {a.target}  (保留 {a.keep})" for a in self.actions]
+        lines.extend(f"跳过: {path}  ({reason})" for path, reason in self.skipped)
+        lines.append(self.summary())
+        return lines
+
+    def summary(self):
+        """一行汇总"""
+        text = (f"共 {self.groups} 组重复文件，将{ACTION_LABELS[self.action]} {len(self.actions)} 个文件，"
+                f"可回收 {format_size(self.reclaimable_bytes)}")
+        if self.skipped:
+            reasons = Counter(reason for _, reason in self.skipped)
+            text += "；跳过 " + "，".join(f"{reason} {count} 个" for reason, count in reasons.most_common())
+        return text
+
+
+def _choose_keep(members, keep_strategy, preferred_roots):
+    """从 [(路径, stat)] 中选出保留的一份
+
+    keep-newest 保留修改时间最新的文件；keep-preferred-root 保留位于首选根目录中的文件
+    （按 preferred_roots 的顺序，同一根目录中取最新的），组内没有文件位于首选根目录时退回到最新的文件。
+    """
+    def newest(candidates):
+        return max(candidates, key=lambda item: (item[1].st_mtime_ns, item[0]))
+
+    if keep_strategy == KEEP_PREFERRED_ROOT:
+        for root in preferred_roots:
+            candidates = [item for item in members if root_of(item[0], [root]) is not None]
+            if candidates:
+                return newest(candidates)
+    return newest(members)
+
+
+def _regular_files(plan, paths, size):
+    """返回 [(路径, stat)]，不是普通文件或大小与 size 不符的路径记入跳过列表"""
+    members = []
+    for path in paths:
+        try:
+            st = os.lstat(path)
+        except NotADirectoryError:
+            # 压缩包成员的虚拟路径（压缩包路径/包内路径）不能直接处理
+            plan.skipped.append((path, "位于压缩包中"))
+            continue
+        except OSError:
+            plan.skipped.append((path, "无法读取"))
+            continue
+        if not stat.S_ISREG(st.st_mode):
+            plan.skipped.append((path, "不是普通文件"))
+        elif size is not None and st.st_size != size:
+            plan.skipped.append((path, "大小已改变"))
+        else:
+            members.append((path, st))
+    return members
+
+
+def _plan_group(plan, members, preferred=None, folders=None):
+    """为一组内容相同的文件 [(路径, stat)] 选出保留的一份，其余加入计划
+
+    同一个文件可能同时出现在重复目录组和内容重复组中：已计划处理的文件不再参与，
+    已被选为保留的文件优先继续保留，也不会被其他组处理。preferred 为按目录回收时保留目录中的文件，
+    folders 为 目标文件 -> 所在的重复目录。
+    """
+    members = [member for member in members if member[0] not in plan.targets]
+    if len(members) < 2:
+        return
+    kept = [member for member in members if member[0] in plan.keeps]
+    if kept:
+        keep, keep_st = _choose_keep(kept, plan.keep_strategy, plan.preferred_roots)
+    elif preferred is not None and preferred in members:
+        keep, keep_st = preferred
+    else:
+        keep, keep_st = _choose_keep(members, plan.keep_strategy, plan.preferred_roots)
+    plan.keeps.add(keep)
+    for path, st in members:
+        if path in plan.keeps:
+            continue
+        if (st.st_dev, st.st_ino) == (keep_st.st_dev, keep_st.st_ino):
+            plan.skipped.append((path, "已是同一文件"))
+        elif plan.action != ACTION_DELETE and st.st_dev != keep_st.st_dev:
+            plan.skipped.append((path, "跨设备"))
+        else:
+            plan.targets.add(path)
+            plan.actions.append(ReclaimAction.from_stat(len(plan.actions), plan.action, keep, keep_st, path, st,
+                                                        (folders or {}).get(path)))
+
+
+def _plan_folder(plan, paths):
+    """重复目录组：整组保留同一个目录，其余目录中的每个文件按相对路径对应到保留目录中的文件
+
+    位于已计划处理的目录中的成员由那个更大的目录组处理；有成员位于已保留的目录中时优先保留它。
+    """
+    folders = []
+    for path in paths:
+        try:
+            st = os.lstat(path)
+        except OSError:
+            plan.skipped.append((path, "无法读取"))
+            continue
+        if not stat.S_ISDIR(st.st_mode):
+            plan.skipped.append((path, "不是文件夹"))
+        elif root_of(path, plan.target_folders) is None:
+            folders.append((path, st))
+    if len(folders) < 2:
+        return
+    plan.groups += 1
+    kept = [folder for folder in folders if root_of(folder[0], plan.keep_folders) is not None]
+    keep_folder = _choose_keep(kept or folders, plan.keep_strategy, plan.preferred_roots)[0]
+    others = [path for path, _ in folders if path != keep_folder]
+    plan.keep_folders.append(keep_folder)
+    plan.target_folders.extend(others)
+    for dir_path, _, filenames in os.walk(keep_folder):
+        relative_dir = os.path.relpath(dir_path, keep_folder)
+        for filename in sorted(filenames):
+            relative = os.path.normpath(os.path.join(relative_dir, filename))
+            kept_files = _regular_files(plan, [os.path.join(keep_folder, relative)], None)
+            if not kept_files:
+                continue
+            targets = {os.path.join(folder, relative): folder for folder in others}
+            members = kept_files + _regular_files(plan, list(targets), kept_files[0][1].st_size)
+            _plan_group(plan, members, kept_files[0], targets)
+
+
+def build_plan(groups, action=ACTION_HARDLINK, keep_strategy=KEEP_NEWEST, preferred_roots=(), folder_groups=()):
+    """制定回收计划，只读取文件状态，不修改任何文件
+
+    groups 为内容相同的文件组 [(大小, 路径列表)]；folder_groups 为内容相同的目录组 [(总大小, 目录路径列表)]，
+    每组按保留策略选出一个目录整体保留，其余目录中的文件都指向（或删除后依赖）这个目录中的对应文件。
+    目录组从大到小处理，嵌套的较小目录组沿用外层目录组的选择。
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"未知的处理方式: {action}")
+    if keep_strategy not in KEEP_STRATEGIES:
+        raise ValueError(f"未知的保留策略: {keep_strategy}")
+    if keep_strategy == KEEP_PREFERRED_ROOT and not preferred_roots:
+        raise ValueError("按首选根目录保留时必须指定至少一个首选根目录")
+    # 首选根目录的顺序就是优先级，嵌套的根目录也要保留，只去掉重复的
+    roots = list(dict.fromkeys(os.path.normpath(os.path.abspath(r)) for r in preferred_roots))
+    plan = ReclaimPlan(action, keep_strategy, roots)
+
+    for _, paths in sorted(folder_groups, key=lambda group: (-group[0], min(p.count(os.sep) for p in group[1]))):
+        _plan_folder(plan, paths)
+    for size, paths in groups:
+        members = _regular_files(plan, paths, size)
+        if len([path for path, _ in members if path not in plan.targets]) < 2:
+            continue
+        plan.groups += 1
+        _plan_group(plan, members)
+    return plan
+
+
+def groups_from_rows(rows):
+    """把界面或 ScanResult 中内容模式的结果项 (显示名称, 路径列表, 分组键) 转换为 [(大小, 路径列表)]
+
+    硬链接组（分组键为 (st_dev, st_ino)）已不占用额外空间，不参与回收。
+    """
+    return [(key, paths) for _, paths, key in rows if type(key) is int]
+
+
+def folder_groups_from_rows(rows):
+    """从结果项中取出重复目录组 [(总大小, 目录路径列表)]"""
+    return [(key.size, paths) for _, paths, key in rows if isinstance(key, FolderKey)]
+
+
+def read_groups(path):
+    """读取 scan_engine.py 输出的 JSON Lines 或 CSV 文件，返回 ([(大小, 路径列表)], [(总大小, 目录路径列表)])
+
+    名称模式的结果（没有文件大小）无法用于回收，抛出 ValueError；硬链接组被忽略，
+    --folders 输出的重复目录组单独返回。
+    """
+    groups = OrderedDict()
+    folders = OrderedDict()
+    with open(path, encoding="utf-8", newline="") as f:
+        first = f.read(1)
+        f.seek(0)
+        if first == "{":
+            records = (json.loads(line) for line in f if line.strip())
+        else:
+            records = csv.DictReader(f)
+        for record in records:
+            group = str(record['group'])
+            if group.startswith("hardlink-"):
+                continue
+            if group.startswith("folder-"):
+                folders.setdefault(group, (int(record['size']), []))[1].append(record['path'])
+                continue
+            size = record.get('size')
+            if size in (None, ""):
+                raise ValueError("结果中没有文件大小，只能对按文件内容扫描的结果回收空间")
+            groups.setdefault(group, (int(size), []))[1].append(record['path'])
+    return list(groups.values()), list(folders.values())
+
+
+class ReclaimJournal:
+    """回收日志（JSON Lines）
+
+    依次记录计划头和全部处理，之后每批写入 begin 记录、各处理的结果和 commit 记录；
+    begin 和 commit 写入后立即同步到磁盘。begin 之后没有结果的处理可能已经执行了一半，
+    继续或回滚时按文件的实际状态判断。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.header = None
+        self.actions = []
+        # 处理编号 -> (结果, 说明)
+        self.status = {}
+        self.begun = set()
+        self.finished = False
+        self.rolled_back = False
+        self._file = None
+
+    @classmethod
+    def default_path(cls):
+        return os.path.join(DEFAULT_JOURNAL_DIR, time.strftime("reclaim-%Y%m%d-%H%M%S.jsonl"))
+
+    @classmethod
+    def create(cls, path, plan, batch_size=DEFAULT_BATCH_SIZE):
+        """新建日志并写入计划"""
+        journal = cls(path)
+        journal.header = {'type': 'plan', 'version': JOURNAL_VERSION, 'action': plan.action,
+                          'keep': plan.keep_strategy, 'batch_size': batch_size,
+                          'created': time.strftime("%Y-%m-%dT%H:%M:%S")}
+        journal.actions = list(plan.actions)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        journal._file = open(path, "x", encoding="utf-8")
+        journal._write(journal.header)
+        for action in journal.actions:
+            journal._write(action.to_record())
+        journal._sync()
+        return journal
+
+    @classmethod
+    def load(cls, path):
+        """读取已有日志并以追加方式打开；最后一行写了一半时忽略该行"""
+        journal = cls(path)
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                kind = record.pop('type')
+                if kind == 'plan':
+                    journal.header = record
+                elif kind == 'action':
+                    journal.actions.append(ReclaimAction(**record))
+                elif kind == 'begin':
+                    journal.begun.update(record['ids'])
+                elif kind in ('done', 'skipped', 'failed', 'restored'):
+                    journal.status[record['id']] = (kind, record.get('reason'))
+                elif kind == 'finished':
+                    journal.finished = True
+                elif kind == 'rolled-back':
+                    journal.rolled_back = True
+        if journal.header is None or journal.header.get('version') != JOURNAL_VERSION:
+            raise ValueError(f"不是有效的回收日志: {path}")
+        journal._file = open(path, "a", encoding="utf-8")
+        return journal
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def record(self, kind, sync=False, **fields):
+        """追加一条记录；处理结果同时更新内存中的状态"""
+        record = {'type': kind}
+        record.update(fields)
+        self._write(record)
+        if kind == 'begin':
+            self.begun.update(fields['ids'])
+        elif 'id' in fields:
+            self.status[fields['id']] = (kind, fields.get('reason'))
+        if sync:
+            self._sync()
+        else:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _stat_or_none(path):
+    try:
+        return os.lstat(path)
+    except FileNotFoundError:
+        return None
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class Reclaimer:
+    """按日志执行、继续或回滚回收计划
+
+    keep_running() 返回 False 时在当前文件处理完后停止，日志中保留已完成的进度，之后可以继续。
+    processed 和 total 可被界面线程读取以显示进度。
+    """
+
+    def __init__(self, journal, batch_size=None, verify_content=True, keep_running=None):
+        self.journal = journal
+        self.batch_size = batch_size or journal.header.get('batch_size') or DEFAULT_BATCH_SIZE
+        self.verify_content = verify_content
+        self.keep_running = keep_running or (lambda: True)
+        # 上次执行时已开始、但没有记录结果的处理，可能已经执行了一半
+        self._interrupted = {action_id for action_id in journal.begun if action_id not in journal.status}
+        self.processed = 0
+        self.total = 0
+        self.counts = Counter()
+        self.reclaimed_bytes = 0
+
+    def run(self):
+        """执行尚未完成的处理，全部完成时返回 True，被中途停止时返回 False"""
+        pending = [a for a in self.journal.actions if a.id not in self.journal.status]
+        self.total = len(pending)
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            self.journal.record('begin', sync=True, ids=[action.id for action in batch])
+            for action in batch:
+                if not self.keep_running():
+                    self.journal.record('commit', sync=True)
+                    return False
+                kind, reason = self._apply(action)
+                self.journal.record(kind, id=action.id, **({'reason': reason} if reason else {}))
+                self.counts[kind] += 1
+                if kind == 'done':
+                    self.reclaimed_bytes += action.reclaimable
+                self.processed += 1
+            self.journal.record('commit', sync=True)
+        self._remove_empty_folders()
+        self.journal.record('finished', sync=True)
+        return True
+
+    def _remove_empty_folders(self):
+        """按目录删除时，删除重复目录中留下的空目录（回滚时会重新创建）"""
+        folders = {action.folder for action in self.journal.actions
+                   if action.folder is not None and action.action == ACTION_DELETE
+                   and self.journal.status.get(action.id, ('',))[0] == 'done'}
+        for folder in folders:
+            for dir_path, _, _ in os.walk(folder, topdown=False):
+                try:
+                    os.rmdir(dir_path)
+                except OSError:
+                    # 目录中还有未处理的文件
+                    pass
+
+    def _applied(self, action, st):
+        """上次执行中断时，目标文件是否已经被处理过"""
+        if action.action == ACTION_DELETE:
+            return st is None
+        if st is None or (st.st_dev, st.st_ino) == (action.dev, action.ino):
+            return False
+        if action.action == ACTION_HARDLINK:
+            return (st.st_dev, st.st_ino) == (action.keep_dev, action.keep_ino)
+        # reflink 生成的是新文件，大小与原文件相同
+        return st.st_size == action.size
+
+    def _apply(self, action):
+        """处理一个文件，返回 (结果, 说明)"""
+        _remove_quietly(action.temp_path)
+        st = _stat_or_none(action.target)
+        if action.id in self._interrupted and self._applied(action, st):
+            return 'done', None
+        if st is None:
+            return 'skipped', "文件已不存在"
+        if (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns) != (action.dev, action.ino, action.size, action.mtime_ns):
+            return 'skipped', "文件已改变"
+        keep_st = _stat_or_none(action.keep)
+        if keep_st is None or (keep_st.st_dev, keep_st.st_ino, keep_st.st_size, keep_st.st_mtime_ns) != \
+                (action.keep_dev, action.keep_ino, action.size, action.keep_mtime_ns):
+            return 'skipped', "保留的文件已改变"
+        try:
+            if self.verify_content and not filecmp.cmp(action.keep, action.target, shallow=False):
+                return 'skipped', "内容不同"
+            if action.action == ACTION_DELETE:
+                os.remove(action.target)
+            elif action.action == ACTION_HARDLINK:
+                os.link(action.keep, action.temp_path)
+                os.replace(action.temp_path, action.target)
+            else:
+                self._reflink(action)
+        except OSError as e:
+            _remove_quietly(action.temp_path)
+            return 'failed', str(e)
+        return 'done', None
+
+    @staticmethod
+    def _reflink(action):
+        """在临时文件中克隆保留文件的数据块，沿用目标文件的权限和时间后替换目标文件"""
+        if fcntl is None:
+            raise OSError("当前系统不支持 reflink")
+        with open(action.keep, "rb") as src, open(action.temp_path, "xb") as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            except OSError as e:
+                raise OSError(e.errno, f"文件系统不支持 reflink: {e.strerror}") from None
+        _restore_metadata(action, action.temp_path)
+        os.replace(action.temp_path, action.target)
+
+    def rollback(self):
+        """把已处理（或可能处理了一半）的文件恢复为独立的副本，返回无法恢复的 (路径, 原因) 列表"""
+        touched = [a for a in self.journal.actions
+                   if a.id in self.journal.begun and self.journal.status.get(a.id, ('done',))[0] == 'done']
+        self.total = len(touched)
+        errors = []
+        for action in reversed(touched):
+            _remove_quietly(action.temp_path)
+            st = _stat_or_none(action.target)
+            if st is None or (st.st_dev, st.st_ino) != (action.dev, action.ino):
+                try:
+                    self._restore(action)
+                except OSError as e:
+                    errors.append((action.target, str(e)))
+                    self.counts['failed'] += 1
+                else:
+                    self.journal.record('restored', id=action.id)
+                    self.counts['restored'] += 1
+            self.processed += 1
+        self.journal.record('rolled-back', sync=True)
+        return errors
+
+    @staticmethod
+    def _restore(action):
+        """从保留的文件复制出目标文件，恢复原来的权限、时间和所有者"""
+        keep_st = os.stat(action.keep)
+        if keep_st.st_size != action.size:
+            raise OSError(f"保留的文件已改变，无法恢复 {action.target}")
+        os.makedirs(os.path.dirname(action.target), exist_ok=True)
+        with open(action.keep, "rb") as src, open(action.temp_path, "xb") as dst:
+            shutil.copyfileobj(src, dst)
+            dst.flush()
+            os.fsync(dst.fileno())
+        _restore_metadata(action, action.temp_path)
+        os.replace(action.temp_path, action.target)
+
+    def summary(self):
+        parts = [f"{label} {self.counts[kind]} 个" for kind, label in
+                 (('done', "已处理"), ('skipped', "跳过"), ('failed', "失败"), ('restored', "已恢复"))
+                 if self.counts[kind]]
+        text = "，".join(parts) or "没有需要处理的文件"
+        if self.reclaimed_bytes:
+            text += f"，回收了 {format_size(self.reclaimed_bytes)}"
+        return text
+
+
+def _restore_metadata(action, path):
+    """把计划中记录的权限、时间和所有者应用到 path；修改所有者需要权限，失败时忽略"""
+    os.chmod(path, stat.S_IMODE(action.mode))
+    os.utime(path, ns=(action.atime_ns, action.mtime_ns))
+    if hasattr(os, 'chown'):
+        try:
+            os.chown(path, action.uid, action.gid)
+        except OSError:
+            pass
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(
+        description="对 scan_engine.py 按文件内容扫描的输出，每组保留一份，把其余文件替换为硬链接、reflink 或删除")
+    parser.add_argument("results", nargs="?", help="scan_engine.py 输出的 JSON Lines 或 CSV 文件")
+    parser.add_argument("--action", choices=ACTIONS, default=ACTION_HARDLINK, help="其余文件的处理方式（默认 hardlink）")
+    parser.add_argument("--keep", choices=KEEP_STRATEGIES, default=KEEP_NEWEST,
+                        help="保留哪一份：修改时间最新的，或位于首选根目录中的（默认 newest）")
+    parser.add_argument("--prefer-root", action="append", default=[], metavar="FOLDER",
+                        help="首选根目录，可重复指定，按指定的顺序优先")
+    parser.add_argument("--dry-run", action="store_true", help="只报告将要处理的文件和可回收的空间，不修改任何文件")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="每批处理的文件数")
+    parser.add_argument("--no-verify", action="store_true", help="处理前不再逐字节比较保留的文件和目标文件")
+    parser.add_argument("--journal", default=None, help=f"日志文件路径（默认在 {DEFAULT_JOURNAL_DIR} 中新建）")
+    parser.add_argument("--resume", metavar="JOURNAL", default=None, help="继续被中断的回收")
+    parser.add_argument("--rollback", metavar="JOURNAL", default=None, help="撤销日志中已完成的处理")
+    args = parser.parse_args(argv)
+    if args.batch_size < 1:
+        parser.error("--batch-size 必须大于 0")
+
+    journal_path = args.resume or args.rollback
+    try:
+        if journal_path:
+            journal = ReclaimJournal.load(journal_path)
+        elif args.results:
+            groups, folder_groups = read_groups(args.results)
+            plan = build_plan(groups, args.action, args.keep, args.prefer_root, folder_groups)
+            if args.dry_run:
+                print("\n".join(plan.report()))
+                return 0
+            journal = ReclaimJournal.create(args.journal or ReclaimJournal.default_path(), plan, args.batch_size)
+            print(plan.summary(), file=sys.stderr)
+        else:
+            parser.error("需要指定扫描结果文件，或者 --resume / --rollback 日志")
+    except (OSError, ValueError, KeyError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+
+    stopping = []
+    reclaimer = Reclaimer(journal, args.batch_size, not args.no_verify, keep_running=lambda: not stopping)
+    signal.signal(signal.SIGINT, lambda signum, frame: stopping.append(True))
+    try:
+        if args.rollback:
+            errors = reclaimer.rollback()
+            for path, reason in errors:
+                print(f"无法恢复: {path}  ({reason})", file=sys.stderr)
+            print(f"回滚完成：{reclaimer.summary()}", file=sys.stderr)
+            return 1 if errors else 0
+        if journal.rolled_back:
+            print(f"日志中的处理已被回滚，不能继续: {journal.path}", file=sys.stderr)
+            return 1
+        if journal.finished:
+            print(f"日志中的处理已全部完成: {journal.path}", file=sys.stderr)
+            return 0
+        if not reclaimer.run():
+            print(f"已中断（{reclaimer.summary()}），以 --resume {journal.path} 运行即可继续", file=sys.stderr)
+            return 130
+        print(f"完成：{reclaimer.summary()}。日志: {journal.path}", file=sys.stderr)
+        return 1 if reclaimer.counts['failed'] else 0
+    finally:
+        journal.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
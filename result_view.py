@@ -0,0 +1,279 @@
+import tkinter as tk
+import tkinter.font as tkfont
+
+
+class ResultModel:
+    """扫描结果的紧凑后备模型
+
+    每个重复组只保存一个 (显示名称, 路径列表, 分组键) 元组，不为每组创建界面控件，
+    界面只把视口内可见的几十行交给 Treeview 显示。
+
+    sort_keys 为 {列名: 由结果行计算排序键的函数}，排序键在行加入模型时计算一次并按列保存，
+    排序时只比较预先算好的键，不再访问界面控件或重新格式化每一行。
+    """
+
+    def __init__(self, sort_keys=None):
+        self.sort_keys = dict(sort_keys or {})
+        self.rows = []
+        self._keys = {name: [] for name in self.sort_keys}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        return self.rows[index]
+
+    def _compute_keys(self, rows):
+        return {name: [key_func(row) for row in rows] for name, key_func in self.sort_keys.items()}
+
+    def set_rows(self, rows):
+        """替换全部结果"""
+        self.rows = list(rows)
+        self._keys = self._compute_keys(self.rows)
+
+    def clear(self):
+        self.rows = []
+        self._keys = {name: [] for name in self.sort_keys}
+
+    def replace_keys(self, updates):
+        """用新的结果替换若干分组键对应的所有行
+
+        updates 为 {分组键: 新的结果行列表}，新行追加在末尾。
+        """
+        if not updates:
+            return
+        kept = [index for index, row in enumerate(self.rows) if row[2] not in updates]
+        new_rows = [row for rows in updates.values() for row in rows]
+        new_keys = self._compute_keys(new_rows)
+        self.rows = [self.rows[index] for index in kept] + new_rows
+        self._keys = {name: [column[index] for index in kept] + new_keys[name]
+                      for name, column in self._keys.items()}
+
+    def sort(self, column, reverse=False):
+        """按预先计算的列排序键排序，键相同的行保持原有顺序"""
+        keys = self._keys[column]
+        order = sorted(range(len(self.rows)), key=keys.__getitem__, reverse=reverse)
+        self.rows = [self.rows[index] for index in order]
+        self._keys = {name: [values[index] for index in order] for name, values in self._keys.items()}
+
+
+class VirtualScroller:
+    """虚拟滚动的公共逻辑
+
+    只渲染视口内可见的行，纵向滚动条映射到后备数据的全部行，
+    因此渲染开销只与窗口高度有关，与数据量无关。子类实现 total()、render()
+    和 _measure_page_size()。
+    """
+    # 鼠标滚轮每一格滚动的行数
+    WHEEL_STEP = 3
+
+    def __init__(self, widget, scrollbar):
+        self.widget = widget
+        self.scrollbar = scrollbar
+        self.offset = 0
+        self.page_size = 1
+        scrollbar.configure(command=self._on_scrollbar)
+
+        widget.bind("<Configure>", lambda event: self.refresh(), add="+")
+        # Windows/macOS 使用 MouseWheel，X11 使用 Button-4/5
+        widget.bind("<MouseWheel>", self._on_mouse_wheel, add="+")
+        widget.bind("<Button-4>", lambda event: self._scroll_by(-self.WHEEL_STEP), add="+")
+        widget.bind("<Button-5>", lambda event: self._scroll_by(self.WHEEL_STEP), add="+")
+
+    def total(self):
+        raise NotImplementedError
+
+    def render(self):
+        raise NotImplementedError
+
+    def _measure_page_size(self):
+        raise NotImplementedError
+
+    def refresh(self):
+        """数据或窗口大小变化后重新计算视口并渲染"""
+        self.page_size = max(1, self._measure_page_size())
+        self.scroll_to(self.offset)
+
+    def scroll_to(self, offset):
+        """滚动到指定的起始行"""
+        max_offset = max(0, self.total() - self.page_size)
+        self.offset = max(0, min(int(offset), max_offset))
+        self.render()
+        self._update_scrollbar()
+
+    def _scroll_by(self, rows):
+        self.scroll_to(self.offset + rows)
+        return "break"
+
+    def _update_scrollbar(self):
+        total = self.total()
+        if total <= self.page_size:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.page_size) / total))
+
+    def _on_scrollbar(self, action, value, unit=None):
+        """响应滚动条拖动和点击"""
+        if action == tk.MOVETO:
+            self.scroll_to(float(value) * self.total())
+        elif action == tk.SCROLL:
+            step = self.page_size if unit == tk.PAGES else 1
+            self.scroll_to(self.offset + int(value) * step)
+
+    def _on_mouse_wheel(self, event):
+        if event.delta:
+            # Windows 每格为 120，macOS 为 1
+            notches = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+            return self._scroll_by(-notches * self.WHEEL_STEP)
+        return "break"
+
+
+class VirtualTreeview(VirtualScroller):
+    """虚拟化的 Treeview：只为视口内可见的行创建条目
+
+    format_row(row) 返回一行在各列中显示的值。选中状态按后备模型中的行号记录，
+    滚动时保持不变。
+    """
+    # 尚未能测量行高时使用的默认值（像素）
+    DEFAULT_ROW_HEIGHT = 20
+    DEFAULT_HEADING_HEIGHT = 24
+
+    def __init__(self, tree, scrollbar, model, format_row):
+        self.tree = tree
+        self.model = model
+        self.format_row = format_row
+        self.slots = []
+        self.selected_index = None
+        self._row_metrics = None
+        super().__init__(tree, scrollbar)
+
+        tree.bind("<<TreeviewSelect>>", self._on_select, add="+")
+        tree.bind("<Button-1>", self._on_click, add="+")
+        for key, delta in (("<Up>", -1), ("<Down>", 1)):
+            tree.bind(key, lambda event, d=delta: self._move_selection(d))
+        tree.bind("<Prior>", lambda event: self._move_selection(-self.page_size))
+        tree.bind("<Next>", lambda event: self._move_selection(self.page_size))
+        tree.bind("<Home>", lambda event: self._select_and_show(0))
+        tree.bind("<End>", lambda event: self._select_and_show(len(self.model) - 1))
+
+    def total(self):
+        return len(self.model)
+
+    def _measure_page_size(self):
+        """根据 Treeview 高度和已渲染行的实际行高计算视口可容纳的行数"""
+        if self._row_metrics is None and self.slots:
+            bbox = self.tree.bbox(self.slots[0])
+            if bbox:
+                self._row_metrics = (bbox[1], bbox[3])
+        top, row_height = self._row_metrics or (self.DEFAULT_HEADING_HEIGHT, self.DEFAULT_ROW_HEIGHT)
+        return (self.tree.winfo_height() - top) // row_height
+
+    def render(self):
+        """把后备模型中当前视口的行写入 Treeview，复用已有条目"""
+        count = max(0, min(self.page_size, len(self.model) - self.offset))
+        while len(self.slots) < count:
+            self.slots.append(self.tree.insert("", tk.END))
+        if len(self.slots) > count:
+            self.tree.delete(*self.slots[count:])
+            del self.slots[count:]
+
+        for slot, index in zip(self.slots, range(self.offset, self.offset + count)):
+            self.tree.item(slot, values=self.format_row(self.model[index]))
+
+        selected_slot = self._slot_of(self.selected_index)
+        if selected_slot is not None:
+            self.tree.selection_set(selected_slot)
+            self.tree.focus(selected_slot)
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+
+    def reset(self):
+        """后备模型被整体替换后调用：回到顶部并清除选中"""
+        self.selected_index = None
+        self.offset = 0
+        self.refresh()
+
+    def _slot_of(self, index):
+        if index is None or not self.offset <= index < self.offset + len(self.slots):
+            return None
+        return self.slots[index - self.offset]
+
+    def index_at(self, y):
+        """返回窗口纵坐标 y 处的行在后备模型中的行号，没有行时返回 None"""
+        slot = self.tree.identify_row(y)
+        if not slot or slot not in self.slots:
+            return None
+        return self.offset + self.slots.index(slot)
+
+    def selected_row(self):
+        """返回当前选中的结果行，没有选中时返回 None"""
+        if self.selected_index is None or not 0 <= self.selected_index < len(self.model):
+            return None
+        return self.model[self.selected_index]
+
+    def select_index(self, index):
+        self._select_and_show(index)
+
+    def _on_click(self, event):
+        index = self.index_at(event.y)
+        if index is not None:
+            self.selected_index = index
+
+    def _on_select(self, event=None):
+        selection = self.tree.selection()
+        if selection and selection[0] in self.slots:
+            self.selected_index = self.offset + self.slots.index(selection[0])
+
+    def _move_selection(self, delta):
+        if not len(self.model):
+            return "break"
+        current = self.selected_index if self.selected_index is not None else self.offset - (1 if delta > 0 else 0)
+        return self._select_and_show(max(0, min(len(self.model) - 1, current + delta)))
+
+    def _select_and_show(self, index):
+        """选中指定行，必要时滚动使其可见"""
+        if not 0 <= index < len(self.model):
+            return "break"
+        self.selected_index = index
+        if index < self.offset:
+            self.scroll_to(index)
+        elif index >= self.offset + self.page_size:
+            self.scroll_to(index - self.page_size + 1)
+        else:
+            self.render()
+        return "break"
+
+
+class VirtualTextList(VirtualScroller):
+    """虚拟化的只读 Text：只把视口内可见的行写入 Text
+
+    lines 为任意支持下标和 len() 的序列，format_line(行号, 元素) 返回一行文本。
+    """
+
+    def __init__(self, text, scrollbar, lines, format_line=None):
+        self.text = text
+        self.lines = lines
+        self.format_line = format_line or (lambda index, item: str(item))
+        text.configure(wrap=tk.NONE)
+        super().__init__(text, scrollbar)
+        # Text 自带的按键滚动只作用于当前已渲染的行，改为滚动后备数据
+        for key, rows in (("<Up>", -1), ("<Down>", 1)):
+            text.bind(key, lambda event, r=rows: self._scroll_by(r))
+        text.bind("<Prior>", lambda event: self._scroll_by(-self.page_size))
+        text.bind("<Next>", lambda event: self._scroll_by(self.page_size))
+
+    def total(self):
+        return len(self.lines)
+
+    def _measure_page_size(self):
+        font = tkfont.Font(font=self.text.cget("font"))
+        return self.text.winfo_height() // max(1, font.metrics("linespace"))
+
+    def render(self):
+        count = max(0, min(self.page_size, len(self.lines) - self.offset))
+        content = "\n".join(self.format_line(index, self.lines[index])
+                            for index in range(self.offset, self.offset + count))
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", content)
+        self.text.configure(state=tk.DISABLED)
@@ -0,0 +1,82 @@
+import os
+import pickle
+import hashlib
+
+
+class ScanCheckpoint:
+    """暂停扫描时保存到磁盘的检查点，用于在程序重启后继续扫描
+
+    保存遍历器尚未列举的目录（遍历前沿）、已建立的内存索引和已计算的哈希。
+    每个 (根目录, 匹配方式) 最多保存一个检查点，文件名由二者的哈希得出；
+    同时扫描多个根目录时，root_path 为根目录列表，整个列表作为一个键。
+    """
+    # 默认检查点目录
+    DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".file_duplicate_checker", "checkpoints")
+
+    # 检查点格式版本，格式不兼容时递增，旧版本的检查点会被忽略
+    VERSION = 2
+
+    def __init__(self, root_path, match_mode, byte_compare, use_index, scan_id, frontier, total_files, state,
+                 hash_cache=None, emitted=None, scan_filter=None):
+        self.version = self.VERSION
+        self.root_path = root_path
+        self.match_mode = match_mode
+        self.byte_compare = byte_compare
+        self.use_index = use_index
+        # 增量扫描时沿用暂停前的扫描编号，已列举的目录不会在扫描结束时被当作过期记录删除
+        self.scan_id = scan_id
+        self.frontier = frontier
+        self.total_files = total_files
+        self.state = state
+        # 未使用扫描索引时，已计算的哈希保存在这里：(类型, 路径) -> ((大小, mtime), 摘要)
+        self.hash_cache = hash_cache if hash_cache is not None else {}
+        # 流式输出时已输出过的内容重复组，恢复后不再重复输出
+        self.emitted = emitted if emitted is not None else set()
+        # 暂停前使用的过滤规则，继续扫描时沿用，使前后两部分的结果一致
+        self.scan_filter = scan_filter
+
+    @property
+    def phase(self):
+        """暂停时所处的阶段：遍历前沿为空说明遍历已完成，暂停在内容比对阶段"""
+        return "walk" if self.frontier else "hash"
+
+    @classmethod
+    def path_for(cls, root_path, match_mode, directory=None):
+        """返回 (根目录, 匹配方式) 对应的检查点文件路径"""
+        roots = [root_path] if isinstance(root_path, str) else root_path
+        key = "\0".join([os.path.abspath(root) for root in roots] + [match_mode]).encode('utf-8', 'surrogateescape')
+        name = hashlib.blake2b(key, digest_size=8).hexdigest() + ".pickle"
+        return os.path.join(directory or cls.DEFAULT_DIR, name)
+
+    def save(self, directory=None):
+        """写入检查点：先写临时文件再替换，中途失败不会损坏已有的检查点"""
+        path = self.path_for(self.root_path, self.match_mode, directory)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, root_path, match_mode, directory=None):
+        """读取检查点，不存在、已损坏或版本不兼容时返回 None"""
+        path = cls.path_for(root_path, match_mode, directory)
+        try:
+            with open(path, "rb") as f:
+                checkpoint = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+        if not isinstance(checkpoint, cls) or getattr(checkpoint, 'version', None) != cls.VERSION:
+            return None
+        return checkpoint
+
+    @classmethod
+    def discard(cls, root_path, match_mode, directory=None):
+        """删除检查点"""
+        try:
+            os.remove(cls.path_for(root_path, match_mode, directory))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,1363 @@
+"""文件重复检查的扫描引擎，不依赖任何图形界面
+
+既可以被 file_duplicate_checker.py 的界面调用，也可以在没有显示器的服务器上
+通过命令行运行，边扫描边以 JSON Lines 或 CSV 格式输出重复文件：
+
+    python scan_engine.py /data --mode content --format jsonl > duplicates.jsonl
+"""
+import os
+import sys
+import csv
+import json
+import queue
+import hashlib
+import filecmp
+import argparse
+import signal
+import time
+import threading
+from collections import deque, namedtuple
+
+from scan_index import ScanIndex
+from hash_scheduler import HashScheduler
+from scan_checkpoint import ScanCheckpoint
+from scan_metrics import ScanMetrics
+from name_index import DirectoryTable, NameIndex, NameKey
+from scan_filter import ScanFilter
+from folder_hash import FolderHasher
+from archive_scan import ArchiveIndex, is_archive_name
+from disk_usage import DiskUsage
+from io_throttle import IOThrottle, set_idle_priority
+
+
+# 匹配方式
+MATCH_BY_NAME = "name"
+MATCH_BY_CONTENT = "content"
+
+# 内容比对参数：头尾各采样的字节数，以及完整哈希时每次读取的块大小
+PARTIAL_HASH_SIZE = 4096
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def format_size(size_bytes):
+    """格式化文件大小显示"""
+    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+        if size_bytes < 1024.0:
+            return f"{size_bytes:.2f} {unit}"
+        size_bytes /= 1024.0
+    return f"{size_bytes:.2f} PB"
+
+
+def usage_report(usage, limit=DiskUsage.TOP_ENTRIES):
+    """把磁盘占用统计（DiskUsage）格式化为多行文本，用于命令行输出和界面显示"""
+    lines = [f"共 {usage.total_files} 个文件，占用 {format_size(usage.total_bytes)}"]
+    if usage.groups:
+        lines.append(f"{len(usage.groups)} 组重复，删除多余副本可回收 {format_size(usage.wasted_bytes)}")
+    lines += ["", "占用最大的文件夹（含子文件夹）:"]
+    for path, size, files in usage.top_directories(limit):
+        lines.append(f"  {format_size(size):>12}  {files:>9} 个文件  {path}")
+    lines += ["", "文件大小分布:"]
+    for low, high, count, size in usage.size_bins():
+        if count:
+            label = f"{format_size(low)} - {format_size(high)}" if high is not None else f"{format_size(low)} 以上"
+            lines.append(f"  {label:<24}  {count:>9} 个文件  {format_size(size):>12}")
+    lines += ["", "按扩展名:"]
+    for ext, count, size in usage.top_extensions(limit):
+        lines.append(f"  {ext or '(无扩展名)':<12}  {count:>9} 个文件  {format_size(size):>12}")
+    if usage.groups:
+        lines += ["", "可回收空间最大的重复组:"]
+        for group_id, size, copies, wasted, path in usage.top_groups(limit):
+            lines.append(f"  {format_size(wasted):>12}  {copies} 份 × {format_size(size)}  {path or group_id}")
+    return lines
+
+
+class ScanProgress:
+    """扫描线程与界面线程之间的进度通道
+
+    工作线程只在锁内更新几个计数器，界面线程按固定频率读取快照并刷新显示，
+    因此界面刷新的开销与文件数量无关。
+    """
+    PHASE_WALK = "walk"
+    PHASE_HASH = "hash"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """清空所有计数，开始新的扫描"""
+        with self._lock:
+            self.phase = self.PHASE_WALK
+            self.files = 0
+            self.dirs_done = 0
+            self.dirs_pending = 0
+            self.hashed_files = 0
+            self.hash_total = 0
+
+    def update(self, **fields):
+        """设置一个或多个字段"""
+        with self._lock:
+            for name, value in fields.items():
+                setattr(self, name, value)
+
+    def add(self, **deltas):
+        """累加一个或多个计数器"""
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def snapshot(self):
+        """返回当前进度的一致快照"""
+        with self._lock:
+            return {
+                'phase': self.phase,
+                'files': self.files,
+                'dirs_done': self.dirs_done,
+                'dirs_pending': self.dirs_pending,
+                'hashed_files': self.hashed_files,
+                'hash_total': self.hash_total,
+            }
+
+    def percent(self):
+        """估算当前阶段的完成百分比：遍历阶段按目录数，哈希阶段按文件数"""
+        snap = self.snapshot()
+        if snap['phase'] == self.PHASE_HASH:
+            total, done = snap['hash_total'], snap['hashed_files']
+        else:
+            done = snap['dirs_done']
+            total = done + snap['dirs_pending']
+        return done / total * 100 if total else 0
+
+
+class ContentMatcher:
+    """按 文件大小 → 头尾采样哈希 → 完整哈希 的顺序逐级筛选内容相同的文件
+
+    大小唯一的文件不会被读取；只有前一级仍然相同的文件才进入下一级。
+    哈希由 HashScheduler 按设备并发计算，某个大小分组的一级全部完成后立即进入下一级，
+    因此不同分组的采样哈希和完整哈希可以交错进行。任务按可能回收的空间（大小 × (文件数 - 1)）
+    从大到小排队，浪费空间最多的重复组最先确认。
+    keep_running() 返回 False 时尽快停止；提供 scan_index 时优先复用其中缓存的哈希，
+    否则提供 hash_cache 字典时把哈希连同文件的大小和 mtime 缓存在其中。
+    提供 metrics 时记录每次哈希读取的字节数和耗时。
+    提供 archives（ArchiveIndex）时，压缩包成员的虚拟路径从压缩包中流式读取：同一个压缩包中
+    所有待比对的成员在一次顺序读取中同时算出采样哈希和完整哈希，不解压到磁盘。
+    提供 throttle（IOThrottle）时，读取的字节数和每次读取的耗时计入其预算，超出时在哈希线程中等待。
+    """
+
+    def __init__(self, byte_compare=False, keep_running=None, scan_index=None, progress=None, hash_cache=None,
+                 metrics=None, archives=None, throttle=None):
+        self.byte_compare = byte_compare
+        self.keep_running = keep_running or (lambda: True)
+        self.scan_index = scan_index
+        self.progress = progress
+        self.hash_cache = hash_cache
+        self.metrics = metrics
+        # 每个哈希线程复用自己的读缓冲区，内存占用与文件大小无关
+        self._buffers = threading.local()
+        self.archives = archives
+        # 压缩包路径 -> 待比对的包内路径集合
+        self._wanted_members = {}
+        # 压缩包路径 -> (读取时的压缩包签名, {包内路径: (采样哈希, 完整哈希)})
+        self._member_digests = {}
+        self._archive_locks = {}
+        self._archive_lock = threading.Lock()
+        self.throttle = throttle
+
+    def find_duplicates(self, size_buckets, on_group=None, collect=True):
+        """返回 (文件大小, 组标识, 完整路径列表) 组成的重复组列表，被取消时返回 None
+
+        on_group 不为 None 时，每确认一组就立即以同样的参数调用一次；
+        collect 为 False 时不在内存中保留结果，只通过 on_group 输出。
+        """
+        # 只有大小相同的文件才可能内容相同；可能浪费空间最多的分组排在最前
+        candidates = [(size, paths) for size, paths in size_buckets.items() if len(paths) > 1]
+        candidates.sort(key=lambda item: self._priority(item[0], len(item[1])))
+        if self.archives is not None:
+            self._wanted_members = {}
+            for _, paths in candidates:
+                for path in paths:
+                    member = self.archives.member(path)
+                    if member is not None:
+                        self._wanted_members.setdefault(member[0], set()).add(member[1])
+        if self.progress is not None:
+            self.progress.update(phase=ScanProgress.PHASE_HASH, hashed_files=0,
+                                 hash_total=sum(len(paths) for _, paths in candidates))
+        groups = []
+        # 每个大小分组当前阶段的状态：[待完成的任务数, {摘要: 文件列表}, 分组文件数]
+        pending = {}
+
+        def finish(size, digest_groups):
+            for digest, full_group in digest_groups:
+                if self.byte_compare:
+                    clusters = self._split_by_bytes(full_group)
+                else:
+                    clusters = [full_group]
+                for i, cluster in enumerate(clusters):
+                    group_id = f"{size}-{digest.hex()}" + (f"-{i}" if i else "")
+                    if collect:
+                        groups.append((size, group_id, cluster))
+                    if on_group is not None:
+                        on_group(size, group_id, cluster)
+            count = pending.pop(size)[2]
+            if self.progress is not None:
+                self.progress.add(hashed_files=count)
+
+        with HashScheduler(self.keep_running) as scheduler:
+            for size, paths in candidates:
+                pending[size] = [len(paths), {}, len(paths)]
+                for path in paths:
+                    scheduler.submit((size, 'partial'), path, self.partial_hash_cached, self._device(path),
+                                     self._priority(size, len(paths)))
+
+            for (size, stage), path, digest in scheduler.results():
+                state = pending[size]
+                state[0] -= 1
+                if not isinstance(digest, OSError):
+                    # 无法读取的文件不参与比对
+                    state[1].setdefault(digest, []).append(path)
+                if state[0]:
+                    continue
+                if not self.keep_running():
+                    # 取消或暂停后未执行的任务同样以 OSError 返回，这一级的结果不完整，不能据此确认重复组；
+                    # 该分组留在 pending 中，恢复扫描时重新比对
+                    continue
+
+                matched = [(key, group) for key, group in state[1].items() if len(group) > 1]
+                # 小文件的头尾采样已经覆盖全部内容，无需再做完整哈希
+                if stage == 'full' or size <= 2 * PARTIAL_HASH_SIZE or not matched:
+                    finish(size, matched)
+                    continue
+                state[0] = sum(len(group) for _, group in matched)
+                state[1] = {}
+                for _, group in matched:
+                    for path in group:
+                        scheduler.submit((size, 'full'), path, self.full_hash_cached, self._device(path),
+                                         self._priority(size, len(group)))
+
+        if pending or not self.keep_running():
+            return None
+        # 哈希按完成顺序返回，排序后保证每次扫描的结果顺序一致
+        groups.sort(key=lambda group: (group[0], group[1]))
+        return groups
+
+    @staticmethod
+    def _priority(size, count):
+        """哈希任务的优先级：一组文件可能浪费的空间越大越先处理"""
+        return -size * (count - 1)
+
+    def _cached_hash(self, path, kind, hash_func):
+        """优先使用扫描索引或哈希缓存中的哈希，没有缓存时计算并写回"""
+        if self.scan_index is not None:
+            digest = self.scan_index.get_hash(path, kind)
+            if digest is None:
+                digest = hash_func(path)
+                self.scan_index.set_hash(path, kind, digest)
+            elif self.metrics is not None:
+                self.metrics.record_cache_hit()
+            return digest
+
+        if self.hash_cache is None:
+            return hash_func(path)
+        # 文件的大小或 mtime 变化（例如在暂停期间被修改）时缓存失效
+        st = os.stat(path)
+        signature = (st.st_size, st.st_mtime_ns)
+        cached = self.hash_cache.get((kind, path))
+        if cached is not None and cached[0] == signature:
+            if self.metrics is not None:
+                self.metrics.record_cache_hit()
+            return cached[1]
+        digest = hash_func(path)
+        self.hash_cache[(kind, path)] = (signature, digest)
+        return digest
+
+    def partial_hash_cached(self, path):
+        if self._is_member(path):
+            return self._member_hashes(path)[0]
+        return self._cached_hash(path, 'partial', self.partial_hash)
+
+    def full_hash_cached(self, path):
+        if self._is_member(path):
+            return self._member_hashes(path)[1]
+        return self._cached_hash(path, 'full', self.full_hash)
+
+    def _is_member(self, path):
+        return self.archives is not None and self.archives.member(path) is not None
+
+    def _device(self, path):
+        """压缩包成员按其所在压缩包的设备调度，普通文件由调度器自行 stat"""
+        return self.archives.device(path) if self._is_member(path) else None
+
+    def _member_hashes(self, path):
+        """返回压缩包成员的 (采样哈希, 完整哈希)
+
+        第一次请求某个压缩包的成员时，顺序读取一遍该压缩包，算出其中所有待比对成员的哈希；
+        同一压缩包的其他成员随后直接使用结果。压缩包被修改后重新读取。
+        """
+        archive_path, name = self.archives.member(path)
+        with self._archive_lock:
+            lock = self._archive_locks.setdefault(archive_path, threading.Lock())
+        with lock:
+            signature = self.archives.signature(archive_path)
+            cached = self._member_digests.get(archive_path)
+            if cached is None or cached[0] != signature:
+                cached = self._member_digests[archive_path] = (signature, {})
+            digests = cached[1]
+            if name not in digests:
+                wanted = (self._wanted_members.get(archive_path, set()) | {name}) - set(digests)
+                for member_name, f in self.archives.read_members(archive_path, wanted):
+                    if not self.keep_running():
+                        raise OSError("扫描已取消")
+                    digests[member_name] = self._hash_stream(f)
+            if name not in digests:
+                raise OSError(f"无法读取压缩包成员: {path}")
+            return digests[name]
+
+    def _hash_stream(self, f):
+        """一次读取同时算出与 partial_hash、full_hash 相同的两个摘要"""
+        started = time.perf_counter()
+        full = hashlib.blake2b()
+        head = b""
+        tail = b""
+        nbytes = 0
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            if self.throttle is not None:
+                self.throttle.read(len(chunk))
+            full.update(chunk)
+            if len(head) < PARTIAL_HASH_SIZE:
+                head += chunk[:PARTIAL_HASH_SIZE - len(head)]
+            tail = (tail + chunk[-PARTIAL_HASH_SIZE:])[-PARTIAL_HASH_SIZE:]
+            nbytes += len(chunk)
+        partial = hashlib.blake2b(head, digest_size=16)
+        if nbytes > PARTIAL_HASH_SIZE:
+            # 与 partial_hash 一致：尾部采样不与头部重叠
+            partial.update(tail[-(nbytes - max(PARTIAL_HASH_SIZE, nbytes - PARTIAL_HASH_SIZE)):])
+        if self.metrics is not None:
+            self.metrics.record_hash('full', nbytes, time.perf_counter() - started)
+        return partial.digest(), full.digest()
+
+    def partial_hash(self, path):
+        """计算文件头部和尾部采样数据的哈希"""
+        started = time.perf_counter()
+        hasher = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            head = f.read(PARTIAL_HASH_SIZE)
+            hasher.update(head)
+            nbytes = len(head)
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size > PARTIAL_HASH_SIZE:
+                f.seek(max(PARTIAL_HASH_SIZE, size - PARTIAL_HASH_SIZE))
+                tail = f.read(PARTIAL_HASH_SIZE)
+                hasher.update(tail)
+                nbytes += len(tail)
+        elapsed = time.perf_counter() - started
+        if self.metrics is not None:
+            self.metrics.record_hash('partial', nbytes, elapsed)
+        if self.throttle is not None:
+            self._throttle_read(nbytes, elapsed)
+        return hasher.digest()
+
+    def full_hash(self, path):
+        """计算文件完整内容的哈希
+
+        不超过一个块的文件一次读入；更大的文件用 readinto 读入线程复用的缓冲区，
+        再把 memoryview 切片直接交给哈希函数，不会为每个块分配新的 bytes 对象。
+        """
+        started = time.perf_counter()
+        hasher = hashlib.blake2b()
+        nbytes = 0
+        # 不使用 Python 层的缓冲，避免数据多复制一次
+        with open(path, 'rb', buffering=0) as f:
+            if os.fstat(f.fileno()).st_size <= HASH_CHUNK_SIZE:
+                data = f.readall()
+                hasher.update(data)
+                nbytes = len(data)
+                if self.throttle is not None:
+                    self._throttle_read(nbytes, time.perf_counter() - started)
+            else:
+                if hasattr(os, 'posix_fadvise'):
+                    # 提示内核顺序读取，加大预读
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                buffer = self._read_buffer()
+                view = memoryview(buffer)
+                while True:
+                    if not self.keep_running():
+                        raise OSError("扫描已取消")
+                    read_started = time.perf_counter()
+                    count = f.readinto(buffer)
+                    if not count:
+                        break
+                    if self.throttle is not None:
+                        self._throttle_read(count, time.perf_counter() - read_started)
+                    hasher.update(view[:count])
+                    nbytes += count
+        if self.metrics is not None:
+            self.metrics.record_hash('full', nbytes, time.perf_counter() - started)
+        return hasher.digest()
+
+    def _throttle_read(self, nbytes, seconds):
+        """把一次读取计入限速预算：先记录耗时供自适应调整，再按字节数等待"""
+        self.throttle.observe(self.throttle.KIND_READ, seconds)
+        self.throttle.read(nbytes)
+
+    def _read_buffer(self):
+        """返回当前线程的读缓冲区"""
+        buffer = getattr(self._buffers, 'buffer', None)
+        if buffer is None:
+            buffer = self._buffers.buffer = bytearray(HASH_CHUNK_SIZE)
+        return buffer
+
+    def _split_by_bytes(self, paths):
+        """逐字节比对哈希相同的文件，防止哈希碰撞造成误判"""
+        clusters = []
+        for path in paths:
+            for cluster in clusters:
+                try:
+                    if self._same_content(cluster[0], path):
+                        cluster.append(path)
+                        break
+                except OSError:
+                    break
+            else:
+                clusters.append([path])
+        return [cluster for cluster in clusters if len(cluster) > 1]
+
+    def _same_content(self, path, other):
+        """逐字节比较两个文件，其中可以有压缩包成员；限速时自行分块读取，以便计入预算"""
+        if not (self._is_member(path) or self._is_member(other) or self.throttle is not None):
+            return filecmp.cmp(path, other, shallow=False)
+        with self._open(path) as f, self._open(other) as g:
+            while True:
+                read_started = time.perf_counter()
+                chunk = f.read(HASH_CHUNK_SIZE)
+                if chunk != g.read(len(chunk) or 1):
+                    return False
+                if not chunk:
+                    return True
+                if self.throttle is not None:
+                    self._throttle_read(2 * len(chunk), time.perf_counter() - read_started)
+
+    def _open(self, path):
+        return self.archives.open_member(path) if self._is_member(path) else open(path, 'rb')
+
+
+def normalize_roots(root_paths):
+    """把一个或多个根目录规范化为列表，保持原有顺序
+
+    去掉重复项；位于其他根目录之下的根目录会被重复遍历，也一并去掉。
+    """
+    if isinstance(root_paths, (str, os.PathLike)):
+        root_paths = [root_paths]
+    roots = []
+    for path in root_paths:
+        path = os.path.normpath(path)
+        if path not in roots:
+            roots.append(path)
+    return [root for root in roots if not any(other != root and root_of(root, [other]) for other in roots)]
+
+
+def root_of(path, roots):
+    """返回 path 所在的根目录，不在任何根目录下时返回 None"""
+    best = None
+    for root in roots:
+        if path == root or path.startswith(root.rstrip(os.sep) + os.sep):
+            if best is None or len(root) > len(best):
+                best = root
+    return best
+
+
+def archive_members(archives, archive_path, scan_filter=None, roots=()):
+    """登记压缩包并返回其中通过过滤规则的成员 [(虚拟路径, 大小)]；压缩包损坏或无法读取时返回空列表"""
+    try:
+        members = archives.scan(archive_path)
+    except OSError:
+        return []
+    if scan_filter is None:
+        return members
+    root = root_of(archive_path, roots)
+    return [(path, size) for path, size in members
+            if scan_filter.accepts_path(root, path) and scan_filter.accepts_size(size)]
+
+
+def root_labels(roots):
+    """为每个根目录生成在结果中显示的简短标签：默认为目录名，重名时使用完整路径"""
+    names = [os.path.basename(root.rstrip(os.sep)) or root for root in roots]
+    return {root: name if names.count(name) == 1 else root for root, name in zip(roots, names)}
+
+
+class ScanResult:
+    """一次完整扫描的结果
+
+    duplicates 为按重复次数排序的 (显示名称, 路径列表, 分组键) 列表：名称模式下
+    路径为所在目录、分组键为文件名（按规范化文件名分组时路径为完整路径、分组键为规范化后的文件名，
+    见 name_duplicates）；内容模式下路径为完整路径、分组键为文件大小。
+    state 保存扫描得到的内存索引，供监视模式增量更新；metrics 为本次扫描的 ScanMetrics。
+    hardlinks 为内容模式下单独列出的硬链接组，格式同上，分组键为 (st_dev, st_ino)；
+    同一 inode 的多个路径不会再作为内容重复出现在 duplicates 中。
+    roots 为扫描的全部根目录，root_path 为其中第一个。
+    folders 为内容模式下内容完全相同的目录组，格式同上，路径为目录路径，分组键为 FolderKey；
+    位于这些目录中的内容重复组不再出现在 duplicates 中。
+    usage 为启用 disk_usage 时同一次遍历得到的磁盘占用统计（DiskUsage），否则为 None。
+    """
+
+    def __init__(self, root_path, match_mode, total_files, duplicates, state, hardlinks=None, metrics=None,
+                 roots=None, folders=None, usage=None):
+        self.root_path = root_path
+        self.roots = roots or [root_path]
+        self.match_mode = match_mode
+        self.total_files = total_files
+        self.duplicates = duplicates
+        self.state = state
+        self.hardlinks = hardlinks or []
+        self.metrics = metrics
+        self.folders = folders or []
+        self.usage = usage
+
+
+# 重复目录组的分组键：目录的总大小、文件数和 Merkle 摘要（十六进制）
+FolderKey = namedtuple('FolderKey', ['size', 'files', 'digest'])
+
+
+def content_result(size, paths):
+    """把内容相同的一组文件转换为结果项 (显示名称, 路径列表, 分组键)"""
+    paths = sorted(paths)
+    return (f"{os.path.basename(paths[0])} ({format_size(size)})", paths, size)
+
+
+def hardlink_result(key, size, paths):
+    """把指向同一 inode 的一组路径转换为结果项，分组键为 (st_dev, st_ino)"""
+    paths = sorted(paths)
+    return (f"{os.path.basename(paths[0])} ({format_size(size)}, 硬链接)", paths, key)
+
+
+def folder_result(digest, size, files, paths):
+    """把内容完全相同的一组目录转换为结果项，分组键为 FolderKey"""
+    paths = sorted(paths)
+    label = f"{os.path.basename(paths[0]) or paths[0]} (文件夹, {files} 个文件, {format_size(size)})"
+    return (label, paths, FolderKey(size, files, digest.hex()))
+
+
+def folder_group_id(key):
+    """重复目录组在流式输出中的组标识"""
+    return f"folder-{key.digest}"
+
+
+def name_key_result(key, members, names, dirs):
+    """把规范化后相同的一组文件名转换为结果项 (显示名称, 完整路径列表, 规范化后的文件名)
+
+    组内的原始文件名可能各不相同，因此路径为完整路径而不是所在目录。
+    """
+    paths = sorted(os.path.join(dirs.path(dir_id), name) for name in members for dir_id in names.dir_ids(name))
+    members = sorted(members)
+    label = members[0] if len(members) == 1 else f"{members[0]} 等 {len(members)} 种写法"
+    return (label, paths, key)
+
+
+def name_duplicates(names, dirs, name_key=None):
+    """从文件名索引中找出重复的文件名，name_key（NameKey）决定分组方式
+
+    索引保存的是原始文件名，因此切换分组方式只需在内存中重新分组，不需要重新扫描。
+    按完整文件名分组时结果项的路径为所在目录，否则为完整路径（见 name_key_result）。
+    """
+    if name_key is None or name_key.exact:
+        return [(name, sorted(dirs.path(dir_id) for dir_id in dir_ids), name) for name, dir_ids in names.duplicates()]
+    return [name_key_result(key, members, names, dirs)
+            for key, members in names.names_by_key(name_key).items() if names.count(members) > 1]
+
+
+def hardlink_group_id(key):
+    """硬链接组在流式输出中的组标识"""
+    return f"hardlink-{key[0]}-{key[1]}"
+
+
+class DuplicateScanner:
+    """重复文件扫描引擎
+
+    keep_running() 返回 False 时扫描会尽快停止，run() 随即返回 None。
+    pause() 请求暂停：扫描停止后把遍历前沿和已建立的索引写入检查点，run() 返回 None
+    且 paused 为 True；之后以 checkpoint=ScanCheckpoint.load(...) 创建的扫描器会从暂停处继续。
+    on_duplicate(分组键, 完整路径, 文件大小) 在扫描过程中每确认一个重复文件就调用一次，
+    调用方可以据此流式输出结果，而不必等待扫描结束。on_group(文件大小, 组标识, 路径列表) 在内容模式下
+    每确认一组内容相同的文件就调用一次，启用 find_folders 时也不等待目录比较，供界面提前显示；
+    其中一些组在扫描结束时可能并入重复目录的结果。
+    各阶段的耗时、目录列举和哈希的统计记录在 metrics（ScanMetrics）中，扫描期间即可读取。
+    scan_filter（ScanFilter）在遍历时过滤目录和文件，被剪枝的目录不会被列举。
+    name_key（NameKey）为名称模式的分组方式，不按完整文件名分组时，重复组在遍历结束后才输出。
+    root_path 可以是一个根目录，也可以是多个根目录的列表：各根目录按所在设备分组，
+    不同设备由各自的遍历线程组并发遍历，所有文件进入同一个内存索引，因此可以找出跨根目录的重复。
+    find_folders 为 True 时，内容模式在比对完成后计算每个目录的 Merkle 哈希（见 FolderHasher），
+    把内容完全相同的目录作为一个结果，其中的文件不再逐组列出；此时内容重复组在比对结束后才输出。
+    scan_archives 为 True 时，.zip 和 .tar(.gz/.bz2/.xz) 压缩包中的文件以 压缩包路径/包内路径 的虚拟路径
+    与普通文件进入同一个索引（见 ArchiveIndex），压缩包本身仍作为普通文件参与比较。
+    disk_usage 为 True 时，在同一次遍历中统计每个目录的总大小、文件大小和扩展名分布以及每个重复组
+    浪费的空间（见 DiskUsage），名称模式下为此需要 stat 每个文件。
+    throttle（IOThrottle）限制目录列举、stat 和读取文件内容的速率，可在存储繁忙时自动放慢，
+    并可让扫描以最低的 CPU 和 I/O 优先级运行；限速设置不随检查点保存，恢复扫描时重新指定。
+    """
+    # 目录遍历线程数：1 表示串行遍历，网络文件系统上可适当调大
+    DEFAULT_WALK_WORKERS = 1
+    MAX_WALK_WORKERS = 32
+
+    def __init__(self, root_path, match_mode=MATCH_BY_NAME, byte_compare=False, walk_workers=DEFAULT_WALK_WORKERS,
+                 use_index=False, index_path=None, progress=None, keep_running=None, on_duplicate=None,
+                 collect_results=True, checkpoint=None, metrics=None, scan_filter=None, name_key=None,
+                 find_folders=False, scan_archives=False, disk_usage=False, on_group=None, throttle=None):
+        self.root_path = root_path
+        self.roots = normalize_roots(root_path)
+        self.match_mode = match_mode
+        self.byte_compare = byte_compare
+        self.walk_workers = max(1, min(self.MAX_WALK_WORKERS, walk_workers))
+        self.use_index = use_index
+        self.index_path = index_path
+        self.progress = progress or ScanProgress()
+        self._cancelled = threading.Event()
+        self._pause_requested = threading.Event()
+        self._keep_running = keep_running or (lambda: True)
+        self.on_duplicate = on_duplicate
+        self.on_group = on_group
+        self.collect_results = collect_results
+        self.scan_index = None
+        self.paused = False
+        self.checkpoint_path = None
+        self.metrics = metrics or ScanMetrics(root_path, match_mode)
+        self._walk_frontier = list
+        self.scan_filter = scan_filter
+        self.name_key = name_key if name_key is not None and not name_key.exact else None
+        self.find_folders = find_folders
+        self.scan_archives = scan_archives
+        self.disk_usage = disk_usage
+        self.throttle = throttle if throttle is not None and throttle.active else None
+        if self.throttle is not None:
+            self.throttle.bind(self.keep_running, self.metrics)
+        # 遍历的根目录，过滤规则中的相对路径以各自所在的根目录为基准
+        self._walk_roots = self.roots
+
+        # 从检查点恢复时沿用暂停前的扫描设置
+        self.checkpoint = checkpoint
+        if checkpoint is not None:
+            self.byte_compare = checkpoint.byte_compare
+            self.use_index = checkpoint.use_index
+            self.scan_filter = checkpoint.scan_filter
+        if self.scan_filter is not None and not self.scan_filter.active:
+            self.scan_filter = None
+
+    def keep_running(self):
+        """扫描是否应继续进行"""
+        return not self._cancelled.is_set() and not self._pause_requested.is_set() and self._keep_running()
+
+    def cancel(self):
+        """请求取消扫描"""
+        self._cancelled.set()
+
+    def pause(self):
+        """请求暂停扫描，已完成的进度会保存到检查点"""
+        self._pause_requested.set()
+
+    def run(self):
+        """执行扫描，返回 ScanResult；扫描被取消或暂停时返回 None"""
+        roots = self.roots
+        result = None
+        if self.throttle is not None and self.throttle.idle:
+            # 在创建遍历和哈希线程之前降低优先级，这些线程都会继承
+            set_idle_priority()
+        try:
+            if self.use_index:
+                # 索引以绝对路径为键
+                roots = [os.path.abspath(root) for root in roots]
+                self.scan_index = ScanIndex(self.index_path)
+                self.scan_index.begin_scan(self.checkpoint.scan_id if self.checkpoint is not None else None)
+            result = self._run(roots)
+        finally:
+            if self.scan_index is not None:
+                self.scan_index.close()
+                self.scan_index = None
+            if self.paused:
+                self.metrics.finish(ScanMetrics.STATE_PAUSED)
+            elif result is not None:
+                self.metrics.finish(ScanMetrics.STATE_FINISHED)
+            elif not self.keep_running():
+                self.metrics.finish(ScanMetrics.STATE_CANCELLED)
+            else:
+                self.metrics.finish(ScanMetrics.STATE_FAILED)
+        if result is not None and self.checkpoint is not None:
+            # 恢复的扫描已完成，检查点不再需要
+            ScanCheckpoint.discard(self.root_path, self.match_mode)
+        return result
+
+    def _new_state(self, roots):
+        """创建空的内存索引，所有根目录共用；root 为第一个根目录，roots 为全部根目录"""
+        if self.match_mode == MATCH_BY_CONTENT:
+            # 按文件大小分桶，存储完整路径；同一 inode 只有第一个路径入桶。
+            # hardlinks 记录链接数大于 1 的文件：(st_dev, st_ino) -> [文件大小, 路径列表]
+            return {'root': roots[0], 'roots': roots, 'mode': self.match_mode, 'byte_compare': self.byte_compare,
+                    'filter': self.scan_filter, 'find_folders': self.find_folders, 'size_buckets': {},
+                    'hardlinks': {}, 'archives': ArchiveIndex() if self.scan_archives else None,
+                    'usage': DiskUsage(roots) if self.disk_usage else None}
+        # 文件名索引：目录路径驻留在 DirectoryTable 中，每次出现只记录目录编号
+        dirs = DirectoryTable()
+        for root in roots:
+            dirs.add_root(root)
+        return {'root': roots[0], 'roots': roots, 'mode': self.match_mode, 'filter': self.scan_filter,
+                'names': NameIndex(), 'dirs': dirs, 'archives': ArchiveIndex() if self.scan_archives else None,
+                'usage': DiskUsage(roots) if self.disk_usage else None}
+
+    def _save_checkpoint(self, frontier, processed_files, state, hash_cache, emitted):
+        """把暂停时的进度写入检查点"""
+        scan_id = self.scan_index.scan_id if self.scan_index is not None else None
+        checkpoint = ScanCheckpoint(self.root_path, self.match_mode, self.byte_compare, self.use_index, scan_id,
+                                    frontier, processed_files, state, hash_cache, emitted, self.scan_filter)
+        self.checkpoint_path = checkpoint.save()
+        self.paused = True
+
+    def _run(self, roots):
+        checkpoint = self.checkpoint
+        if checkpoint is not None:
+            state = checkpoint.state
+            start_dirs = checkpoint.frontier
+            processed_files = checkpoint.total_files
+            # 未使用扫描索引时，已计算的哈希随检查点保存
+            hash_cache = checkpoint.hash_cache
+            emitted = checkpoint.emitted
+        else:
+            state = self._new_state(roots)
+            start_dirs = list(roots)
+            processed_files = 0
+            hash_cache = {}
+            emitted = set()
+        self.progress.update(files=processed_files)
+        self.metrics.begin_phase(ScanMetrics.PHASE_WALK)
+        self._walk_roots = roots
+        # 只有设置了大小限制时，名称模式才需要 stat 每个文件
+        size_filter = self.scan_filter if self.scan_filter is not None and self.scan_filter.size_bounded else None
+
+        content_mode = self.match_mode == MATCH_BY_CONTENT
+        if content_mode:
+            size_buckets = state['size_buckets']
+            hardlinks = state['hardlinks']
+        else:
+            names = state['names']
+            dirs = state['dirs']
+        archives = state.get('archives')
+        usage = state.get('usage')
+        # 内容模式、大小限制和磁盘占用统计需要 stat 每个文件
+        stat_files = content_mode or size_filter is not None or usage is not None
+        throttle = self.throttle
+        on_duplicate = self.on_duplicate
+        # 按规范化文件名分组时，文件名第二次出现并不能确认重复，遍历结束后再输出
+        stream_names = on_duplicate is not None and self.name_key is None
+
+        # 单次遍历扫描文件夹，边遍历边建立索引；不同设备上的目录由各自的线程组并发遍历
+        device_groups = self._device_groups(roots, start_dirs)
+        if self.walk_workers > 1 or len(device_groups) > 1:
+            walker = self._walk_files_parallel(roots, self.walk_workers, device_groups)
+        else:
+            walker = self._walk_files(roots, start_dirs)
+
+        for root_dir, entries in walker:
+            file_stats = []
+            stat_seconds = 0.0
+            accepted = len(entries)
+            dir_id = None if content_mode else dirs.intern(root_dir)
+            for entry in entries:
+                filename = entry.name
+
+                # 处理文件
+                if stat_files:
+                    if throttle is not None:
+                        throttle.ops()
+                    stat_started = time.perf_counter()
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        # 文件在扫描期间被删除或无法访问，跳过
+                        continue
+                    finally:
+                        elapsed = time.perf_counter() - stat_started
+                        stat_seconds += elapsed
+                        if throttle is not None:
+                            throttle.observe(throttle.KIND_STAT, elapsed)
+                    if size_filter is not None and not size_filter.accepts_size(st.st_size):
+                        accepted -= 1
+                        continue
+                if stat_files:
+                    file_stats.append((filename, st))
+                if content_mode:
+                    if st.st_nlink > 1:
+                        key = (st.st_dev, st.st_ino)
+                        links = hardlinks.get(key)
+                        if links is not None:
+                            # 已见过的 inode：只记录路径，不再参与哈希
+                            links[1].append(entry.path)
+                            if on_duplicate is not None:
+                                if len(links[1]) == 2:
+                                    on_duplicate(hardlink_group_id(key), links[1][0], st.st_size)
+                                on_duplicate(hardlink_group_id(key), entry.path, st.st_size)
+                            continue
+                        hardlinks[key] = [st.st_size, [entry.path]]
+                    size_buckets.setdefault(st.st_size, []).append(entry.path)
+                else:
+                    count = names.add(filename, dir_id)
+                    # 文件名第二次出现时即确认重复，可以立即输出
+                    if stream_names and count > 1:
+                        if count == 2:
+                            first_dir = dirs.path(names.dir_ids(filename)[0])
+                            on_duplicate(filename, os.path.join(first_dir, filename), None)
+                        on_duplicate(filename, entry.path, None)
+
+                # 压缩包本身按普通文件处理，其成员作为虚拟路径加入同一个索引
+                if archives is not None and is_archive_name(filename):
+                    members = archive_members(archives, entry.path, self.scan_filter, roots)
+                    accepted += len(members)
+                    for path, size in members:
+                        if content_mode:
+                            size_buckets.setdefault(size, []).append(path)
+                            continue
+                        name = os.path.basename(path)
+                        count = names.add(name, dirs.intern(os.path.dirname(path)))
+                        if stream_names and count > 1:
+                            if count == 2:
+                                first_dir = dirs.path(names.dir_ids(name)[0])
+                                on_duplicate(name, os.path.join(first_dir, name), None)
+                            on_duplicate(name, path, None)
+
+            if stat_files:
+                self.metrics.record_stats(len(entries), stat_seconds)
+            if usage is not None:
+                usage.add_directory(root_dir, file_stats)
+
+            # 文件大小或 mtime 变化时，索引会清除其缓存的哈希
+            if self.scan_index is not None and content_mode and file_stats:
+                self.scan_index.sync_file_stats(root_dir, file_stats)
+
+            # 只更新进度计数器，由界面线程定时读取
+            processed_files += accepted
+            self.progress.add(files=accepted)
+
+        if self._pause_requested.is_set():
+            self._save_checkpoint(self._walk_frontier(), processed_files, state, hash_cache, emitted)
+            return None
+        if not self.keep_running():
+            return None
+
+        if content_mode:
+            self._choose_link_representatives(size_buckets, hardlinks)
+
+        hardlink_groups = []
+        folders = []
+        if content_mode and self.collect_results:
+            hardlink_groups = [hardlink_result(key, size, paths) for key, (size, paths) in hardlinks.items()
+                               if len(paths) > 1]
+            hardlink_groups.sort(key=lambda x: (-len(x[1]), x[0]))
+
+        # 遍历完整结束后，清理索引中已不存在的目录和文件
+        if self.scan_index is not None:
+            for root in roots:
+                self.scan_index.finish_scan(root)
+
+        if content_mode:
+            # 使用扫描索引时哈希已缓存在索引中，否则缓存在内存中，暂停时随检查点保存
+            self.metrics.begin_phase(ScanMetrics.PHASE_HASH)
+            matcher = ContentMatcher(self.byte_compare, self.keep_running, self.scan_index, self.progress,
+                                     hash_cache=None if self.scan_index is not None else hash_cache,
+                                     metrics=self.metrics, archives=archives, throttle=self.throttle)
+            # 查找重复目录时沿用暂停前的设置；重复组要等所有目录的哈希算出后才知道是否属于重复目录
+            find_folders = state.get('find_folders', False)
+            # 重复目录组中除第一个以外的目录，其中的文件已计入重复目录组浪费的空间
+            redundant_folders = set()
+            on_group = None
+            if on_duplicate is not None or usage is not None:
+                def on_group(size, group_id, paths):
+                    # 暂停前已输出过（已统计过）的分组不再重复输出
+                    if group_id in emitted:
+                        return
+                    emitted.add(group_id)
+                    if usage is not None:
+                        self._record_group(usage, archives, redundant_folders, group_id, size, paths)
+                    if on_duplicate is not None:
+                        for path in sorted(paths):
+                            on_duplicate(group_id, path, size)
+            # 查找重复目录时只提前通知 self.on_group，其余输出等目录比较完成后进行
+            emit = None if find_folders else on_group
+            confirmed = emit
+            if self.on_group is not None:
+                def confirmed(size, group_id, paths):
+                    self.on_group(size, group_id, paths)
+                    if emit is not None:
+                        emit(size, group_id, paths)
+            content_groups = matcher.find_duplicates(size_buckets, confirmed,
+                                                     collect=self.collect_results or find_folders)
+            if content_groups is None:
+                if self._pause_requested.is_set():
+                    self._save_checkpoint([], processed_files, state, hash_cache, emitted)
+                return None
+            if find_folders:
+                folders, content_groups, covered = self._find_folders(roots, size_buckets, hardlinks,
+                                                                      content_groups, archives)
+                # 监视模式中文件变化后重复目录结果不再可靠，届时改为逐个列出这些已由重复目录表示的重复组
+                state['folder_covered'] = [(size, paths) for size, _, paths in covered]
+                for _, paths, _ in folders:
+                    redundant_folders.update(paths[1:])
+                for _, paths, key in folders:
+                    if usage is not None:
+                        # 位于其他重复目录副本中的子目录副本已计入外层目录组
+                        self._record_group(usage, archives, redundant_folders, folder_group_id(key), key.size, paths)
+                    if on_duplicate is not None:
+                        for path in paths:
+                            on_duplicate(folder_group_id(key), path, key.size)
+                if on_group is not None:
+                    for size, group_id, paths in content_groups:
+                        on_group(size, group_id, paths)
+                if not self.collect_results:
+                    folders = []
+            duplicates = [content_result(size, paths) for size, _, paths in content_groups] \
+                if self.collect_results else []
+        else:
+            # 找出重复的文件名，只为重复的文件名拼接目录路径
+            duplicates = []
+            if self.collect_results or (on_duplicate is not None and not stream_names):
+                duplicates = name_duplicates(names, dirs, self.name_key)
+            if on_duplicate is not None and not stream_names:
+                for _, paths, key in sorted(duplicates, key=lambda x: x[2]):
+                    for path in paths:
+                        on_duplicate(key, path, None)
+            if not self.collect_results:
+                duplicates = []
+            # 记录结果所用的分组方式，监视模式按同样的方式更新分组
+            state['name_key'] = self.name_key
+
+        # 按重复次数排序，次数相同时按名称排序，保证串行与并行遍历的结果一致
+        duplicates.sort(key=lambda x: (-len(x[1]), x[0]))
+        return ScanResult(roots[0], self.match_mode, processed_files, duplicates, state, hardlink_groups,
+                          self.metrics, roots, folders, usage)
+
+    @staticmethod
+    def _record_group(usage, archives, redundant_folders, group_id, size, paths):
+        """统计一个内容重复组浪费的空间
+
+        paths 可以是文件，也可以是重复目录组中的目录。压缩包中的副本不单独占用磁盘空间，
+        位于（上级）重复目录副本中的文件或目录已由那个重复目录组统计，都不计入副本数。
+        """
+        def counted(path):
+            if archives is not None and archives.member(path) is not None:
+                return False
+            dir_path = os.path.dirname(path)
+            while redundant_folders:
+                if dir_path in redundant_folders:
+                    return False
+                parent = os.path.dirname(dir_path)
+                if parent == dir_path:
+                    break
+                dir_path = parent
+            return True
+
+        on_disk = [path for path in paths if counted(path)]
+        if len(on_disk) > 1:
+            usage.add_group(group_id, size, len(on_disk), min(on_disk))
+
+    @staticmethod
+    def _choose_link_representatives(size_buckets, hardlinks):
+        """每个 inode 以路径最小的链接作为代表参与内容比对，使结果与遍历顺序（串行或并行）无关"""
+        for size, paths in hardlinks.values():
+            if len(paths) < 2:
+                continue
+            representative = min(paths)
+            if representative == paths[0]:
+                continue
+            # 遍历时先见到的链接已入桶，换成路径最小的链接，并让它排在路径列表的第一位
+            bucket = size_buckets[size]
+            bucket[bucket.index(paths[0])] = representative
+            paths.remove(representative)
+            paths.insert(0, representative)
+
+    @staticmethod
+    def _find_folders(roots, size_buckets, hardlinks, content_groups, archives=None):
+        """找出内容完全相同的目录，返回 (重复目录结果列表, 不属于重复目录的内容重复组, 已由重复目录表示的内容重复组)
+
+        同一 inode 只有第一个路径参与比对，其余路径沿用它的内容标识。
+        压缩包成员不是磁盘上的目录，不参与目录比较，压缩包本身按普通文件参与。
+        """
+        tokens = {path: group_id for _, group_id, paths in content_groups for path in paths}
+        links = {paths[0]: paths[1:] for _, paths in hardlinks.values() if len(paths) > 1}
+        hasher = FolderHasher(roots)
+        for size, paths in size_buckets.items():
+            for path in paths:
+                if archives is not None and archives.member(path) is not None:
+                    continue
+                token = tokens.get(path)
+                hasher.add_file(path, size, token)
+                for link in links.get(path, ()):
+                    hasher.add_file(link, size, token)
+        folders = [folder_result(digest, size, files, paths) for digest, size, files, paths in hasher.compute()]
+        folders.sort(key=lambda x: (-len(x[1]), x[0]))
+        kept, covered = [], []
+        for group in content_groups:
+            (covered if hasher.covers(group[2]) else kept).append(group)
+        return folders, kept, covered
+
+    def _list_directory(self, dir_path):
+        """列举单个目录，返回 (子目录路径列表, 文件条目列表)
+
+        启用增量扫描时，mtime 未变化的目录直接复用扫描索引中的结果。
+        索引保存未经过滤的列举结果，因此修改过滤规则后仍可复用；
+        被剪枝的子目录不会进入遍历队列，也就不会被列举。
+        """
+        started = time.perf_counter()
+        if self.scan_index is not None:
+            subdirs, files = self.scan_index.list_directory(dir_path, self._scandir_directory)
+        else:
+            subdirs, files = self._scandir_directory(dir_path)
+        self.metrics.record_directory(dir_path, time.perf_counter() - started, len(subdirs) + len(files))
+        if self.scan_filter is not None:
+            roots = self._walk_roots
+            root = roots[0] if len(roots) == 1 else root_of(dir_path, roots)
+            subdirs, files = self.scan_filter.filter_listing(root, subdirs, files)
+        return subdirs, files
+
+    @staticmethod
+    def _device_groups(roots, dirs):
+        """按所在设备把待遍历的目录分组，返回目录列表的列表
+
+        目录的设备取其所在根目录的设备号，不需要逐个 stat；无法访问的根目录单独成组，
+        遍历时再报告错误。
+        """
+        devices = {}
+        for root in roots:
+            try:
+                devices[root] = os.stat(root).st_dev
+            except OSError:
+                devices[root] = root
+        groups = {}
+        for dir_path in dirs:
+            groups.setdefault(devices.get(root_of(dir_path, roots)), []).append(dir_path)
+        return list(groups.values())
+
+    def _scandir_directory(self, dir_path):
+        """使用 os.scandir 列举目录，目录类型直接由 d_type 判断，不需要额外的 stat 调用"""
+        subdirs = []
+        files = []
+        throttle = self.throttle
+        if throttle is not None:
+            throttle.ops()
+            started = time.perf_counter()
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif not (entry.is_symlink() and entry.is_dir()):
+                        # 与 os.walk 一致：指向目录的符号链接既不计为文件也不进入
+                        files.append(entry)
+                except OSError:
+                    continue
+        if throttle is not None:
+            throttle.observe(throttle.KIND_LIST, time.perf_counter() - started)
+        return subdirs, files
+
+    def _walk_files(self, roots, start_dirs=None):
+        """单次遍历目录树，逐个目录产出 (目录路径, 文件条目列表)
+
+        start_dirs 为开始时待列举的目录，默认为根目录本身，从检查点恢复时为暂停时的遍历前沿。
+        遍历过程中维护已完成和待处理的目录数，用于估算进度；遍历提前结束后，
+        self._walk_frontier() 返回尚未列举的目录。
+        """
+        pending = list(start_dirs) if start_dirs is not None else list(roots)
+        self._walk_frontier = lambda: list(pending)
+        self.progress.update(dirs_done=0, dirs_pending=len(pending))
+
+        while pending:
+            # 允许在遍历过程中取消
+            if not self.keep_running():
+                return
+
+            dir_path = pending.pop()
+            try:
+                subdirs, files = self._list_directory(dir_path)
+            except OSError:
+                # 与 os.walk 一致，跳过无法访问的子目录；根目录无法访问则报错
+                if dir_path in roots:
+                    raise
+                subdirs, files = [], []
+            pending.extend(subdirs)
+
+            self.progress.add(dirs_done=1)
+            self.progress.update(dirs_pending=len(pending))
+            yield dir_path, files
+
+    def _walk_files_parallel(self, roots, workers, device_groups):
+        """使用多个线程并行遍历目录树，产出结果与 _walk_files 相同
+
+        device_groups 为按设备分组的待遍历目录（见 _device_groups），每个设备分配一组
+        workers 个工作线程，各设备互不等待。每个工作线程维护自己的目录双端队列：从队尾取出
+        目录（深度优先，局部性好），空闲时从同组其他线程的队头窃取目录，不会跨设备窃取。
+        工作线程只负责列举，列举结果通过有界队列交给调用方，子目录在调用方处理完所在目录时
+        才加入队列，因此任一时刻 “队列中的目录 + 已取出但调用方尚未处理的目录” 恰好是遍历前沿，
+        暂停时可以准确保存。调用方停止迭代或扫描被取消时所有工作线程都会退出。
+        """
+        total_workers = workers * len(device_groups)
+        deques = [deque() for _ in range(total_workers)]
+        pending = []
+        for group, dirs in enumerate(device_groups):
+            pending.extend(dirs)
+            for i, dir_path in enumerate(dirs):
+                deques[group * workers + i % workers].append(dir_path)
+        lock = threading.Lock()
+        work_available = threading.Condition(lock)
+        stop = threading.Event()
+        results = queue.Queue(maxsize=total_workers * 64)
+        done_marker = object()
+        # 已取出但调用方尚未处理的目录
+        taken = set()
+        # 尚未被调用方处理的目录数，降为 0 时遍历结束
+        state = {'outstanding': len(pending)}
+        self._walk_frontier = lambda: [d for dq in deques for d in dq] + list(taken)
+        self.progress.update(dirs_done=0, dirs_pending=len(pending))
+
+        def take(index):
+            """取出一个待处理目录：优先本地队尾，其次窃取同一设备组其他队列的队头"""
+            group_start = index - index % workers
+            with lock:
+                while not stop.is_set():
+                    dir_path = None
+                    if deques[index]:
+                        dir_path = deques[index].pop()
+                    else:
+                        for offset in range(1, workers):
+                            victim = deques[group_start + (index - group_start + offset) % workers]
+                            if victim:
+                                dir_path = victim.popleft()
+                                break
+                    if dir_path is not None:
+                        taken.add(dir_path)
+                        return dir_path
+                    if state['outstanding'] == 0:
+                        return None
+                    work_available.wait(0.1)
+            return None
+
+        def put(item):
+            """把结果交给调用方，停止时放弃等待"""
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def worker(index):
+            try:
+                while self.keep_running() and not stop.is_set():
+                    dir_path = take(index)
+                    if dir_path is None:
+                        break
+
+                    try:
+                        subdirs, files = self._list_directory(dir_path)
+                    except OSError as e:
+                        if dir_path in roots:
+                            put(e)
+                            stop.set()
+                            break
+                        subdirs, files = [], []
+                    put((index, dir_path, subdirs, files))
+            finally:
+                put(done_marker)
+
+        threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(total_workers)]
+        for t in threads:
+            t.start()
+
+        try:
+            finished = 0
+            while finished < total_workers:
+                try:
+                    item = results.get(timeout=0.1)
+                except queue.Empty:
+                    if not self.keep_running():
+                        return
+                    continue
+                if item is done_marker:
+                    finished += 1
+                elif isinstance(item, OSError):
+                    raise item
+                else:
+                    index, dir_path, subdirs, files = item
+                    # 目录交给调用方后即视为已处理，其子目录进入前沿
+                    with lock:
+                        taken.discard(dir_path)
+                        deques[index].extend(subdirs)
+                        state['outstanding'] += len(subdirs) - 1
+                        outstanding = state['outstanding']
+                        work_available.notify_all()
+                    self.progress.add(dirs_done=1)
+                    self.progress.update(dirs_pending=outstanding)
+                    yield dir_path, files
+                if not self.keep_running():
+                    return
+        finally:
+            # 通知所有工作线程退出，并等待其结束，使遍历前沿不再变化
+            stop.set()
+            with lock:
+                work_available.notify_all()
+            for t in threads:
+                t.join()
+
+
+class JsonLinesWriter:
+    """以 JSON Lines 格式流式输出重复文件，每行一个文件；扫描多个根目录时附带文件所在的根目录"""
+
+    def __init__(self, stream, roots=None):
+        self.stream = stream
+        self.roots = roots if roots and len(roots) > 1 else None
+
+    def write(self, group, path, size):
+        record = {'group': group, 'path': path, 'size': size}
+        if self.roots is not None:
+            record['root'] = root_of(path, self.roots)
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+
+class CsvWriter:
+    """以 CSV 格式流式输出重复文件，每行一个文件；扫描多个根目录时增加 root 列"""
+
+    def __init__(self, stream, roots=None):
+        self.stream = stream
+        self.writer = csv.writer(stream)
+        self.roots = roots if roots and len(roots) > 1 else None
+        # 继续暂停的扫描时追加到已有输出之后，不再重复写表头
+        if not (stream.seekable() and stream.tell() > 0):
+            self.writer.writerow(['group', 'path', 'size'] + (['root'] if self.roots is not None else []))
+
+    def write(self, group, path, size):
+        row = [group, path, '' if size is None else size]
+        if self.roots is not None:
+            row.append(root_of(path, self.roots))
+        self.writer.writerow(row)
+        self.stream.flush()
+
+
+OUTPUT_FORMATS = {'jsonl': JsonLinesWriter, 'csv': CsvWriter}
+
+
+def build_arg_parser():
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(
+        description="扫描文件夹中的重复文件，边扫描边输出结果。每行一个重复文件，"
+                    "同一 group 的文件互为重复（名称模式下 group 为文件名，内容模式下为 大小-哈希）。")
+    parser.add_argument("folders", nargs="+", metavar="folder",
+                        help="要扫描的文件夹，可指定多个，例如两个网络共享和一块本地磁盘，会找出跨文件夹的重复")
+    parser.add_argument("--mode", choices=[MATCH_BY_NAME, MATCH_BY_CONTENT], default=MATCH_BY_NAME,
+                        help="匹配方式：按文件名或按文件内容（默认按文件名）")
+    parser.add_argument("--byte-compare", action="store_true", help="内容模式下对哈希相同的文件逐字节校验")
+    parser.add_argument("--folders", action="store_true", dest="find_folders",
+                        help="内容模式下把内容完全相同的目录作为一组输出（group 为 folder-摘要，path 为目录，"
+                             "size 为目录总大小），其中的文件不再逐组输出")
+    parser.add_argument("--archives", action="store_true",
+                        help="把 .zip 和 .tar(.gz/.bz2/.xz) 压缩包中的文件也作为候选，无需解压；"
+                             "成员路径为 压缩包路径/包内路径")
+    parser.add_argument("--usage", action="store_true",
+                        help="在同一次遍历中统计磁盘占用，扫描结束后把占用最大的文件夹、文件大小和扩展名分布"
+                             "以及可回收空间最大的重复组输出到标准错误")
+    parser.add_argument("--usage-json", default=None, help="扫描结束后把磁盘占用统计写入该 JSON 文件（隐含 --usage）")
+    parser.add_argument("--ignore-case", action="store_true", help="名称模式下比较文件名时不区分大小写")
+    parser.add_argument("--normalize-unicode", action="store_true",
+                        help="名称模式下把文件名规范化为 NFC 后再比较（例如 macOS 上的 NFD 文件名）")
+    parser.add_argument("--ignore-extension", action="store_true", help="名称模式下只比较去掉扩展名后的主名")
+    parser.add_argument("--workers", type=int, default=DuplicateScanner.DEFAULT_WALK_WORKERS,
+                        help="目录遍历线程数，网络文件系统上可适当调大")
+    parser.add_argument("--incremental", action="store_true", help="使用磁盘上的扫描索引进行增量扫描")
+    parser.add_argument("--index", default=None, help=f"扫描索引文件路径（默认 {ScanIndex.DEFAULT_PATH}）")
+    parser.add_argument("--resume", action="store_true",
+                        help="可暂停的扫描：Ctrl+C 或 SIGTERM 时保存进度，再次以 --resume 运行时从暂停处继续，"
+                             "输出追加到 --output 指定的文件之后")
+    parser.add_argument("--format", choices=sorted(OUTPUT_FORMATS), default="jsonl", help="输出格式（默认 jsonl）")
+    parser.add_argument("--metrics-json", default=None, help="扫描结束后把各阶段耗时等性能指标写入该 JSON 文件")
+    parser.add_argument("--live-metrics", default=None, help="扫描期间定期把性能指标写入该 JSON 文件，便于监控")
+    parser.add_argument("--live-interval", type=float, default=5.0, help="写入实时指标的间隔秒数（默认 5）")
+    parser.add_argument("--output", "-o", default="-", help="输出文件，默认为标准输出")
+    ScanFilter.add_arguments(parser)
+    IOThrottle.add_arguments(parser)
+    return parser
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    try:
+        scan_filter = ScanFilter.from_args(args)
+        throttle = IOThrottle.from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+    for folder in args.folders:
+        if not os.path.isdir(folder):
+            print(f"错误: 不是有效的文件夹路径: {folder}", file=sys.stderr)
+            return 2
+    roots = normalize_roots(args.folders)
+
+    checkpoint = ScanCheckpoint.load(roots, args.mode) if args.resume else None
+    if checkpoint is not None:
+        print(f"从暂停处继续扫描（已扫描 {checkpoint.total_files} 个文件）", file=sys.stderr)
+
+    if args.output == "-":
+        stream = sys.stdout
+    else:
+        stream = open(args.output, "a" if checkpoint is not None else "w", encoding="utf-8", newline="")
+
+    try:
+        # 使用扫描索引时输出的路径为绝对路径
+        writer = OUTPUT_FORMATS[args.format](stream, [os.path.abspath(root) for root in roots]
+                                             if args.incremental else roots)
+        scanner = DuplicateScanner(roots, match_mode=args.mode, byte_compare=args.byte_compare,
+                                   walk_workers=args.workers, use_index=args.incremental, index_path=args.index,
+                                   on_duplicate=writer.write, collect_results=False, checkpoint=checkpoint,
+                                   scan_filter=scan_filter, find_folders=args.find_folders,
+                                   scan_archives=args.archives, disk_usage=args.usage or bool(args.usage_json),
+                                   throttle=throttle,
+                                   name_key=NameKey(args.ignore_case, args.normalize_unicode, args.ignore_extension))
+        if args.live_metrics:
+            scanner.metrics.start_live(args.live_metrics, args.live_interval)
+        if args.resume:
+            # 中断信号改为暂停扫描并保存检查点
+            signal.signal(signal.SIGINT, lambda signum, frame: scanner.pause())
+            if hasattr(signal, 'SIGTERM'):
+                signal.signal(signal.SIGTERM, lambda signum, frame: scanner.pause())
+        try:
+            try:
+                result = scanner.run()
+            finally:
+                scanner.metrics.stop_live()
+                if args.metrics_json:
+                    scanner.metrics.write_json(args.metrics_json)
+        except KeyboardInterrupt:
+            scanner.cancel()
+            print("扫描已取消", file=sys.stderr)
+            return 130
+        except BrokenPipeError:
+            # 下游提前关闭了管道（例如 head），静默结束
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 0
+        except OSError as e:
+            print(f"扫描过程中发生错误: {e}", file=sys.stderr)
+            return 1
+        if scanner.paused:
+            print(f"扫描已暂停，进度已保存到 {scanner.checkpoint_path}，再次以 --resume 运行即可继续", file=sys.stderr)
+            return 130
+        print(f"扫描完成。总共扫描了 {result.total_files} 个文件。", file=sys.stderr)
+        if result.usage is not None:
+            if args.usage:
+                print("\n".join(usage_report(result.usage)), file=sys.stderr)
+            if args.usage_json:
+                result.usage.write_json(args.usage_json)
+        return 0
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
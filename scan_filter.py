@@ -0,0 +1,190 @@
+import os
+import re
+import fnmatch
+
+
+# 常见的版本库、依赖和缓存目录，一般不需要查找其中的重复文件
+COMMON_PRUNE_PATTERNS = (".git", ".hg", ".svn", "node_modules", "__pycache__", ".cache", ".tox", ".venv")
+
+# Windows 的文件名不区分大小写，通配符匹配也不区分
+_MATCH_FLAGS = re.IGNORECASE if os.path.normcase("A") == "a" else 0
+
+
+def parse_size(text):
+    """解析带单位的大小，例如 512、64K、1.5M、2G；空字符串返回 None"""
+    value = text.strip().upper().rstrip('B')
+    if not value:
+        return None
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+    try:
+        if value[-1] in units:
+            return int(float(value[:-1]) * units[value[-1]])
+        return int(value)
+    except ValueError:
+        raise ValueError(f"无法识别的大小: {text}") from None
+
+
+def split_patterns(text):
+    """把以逗号或分号分隔的规则文本拆分为列表"""
+    return [part.strip() for part in re.split(r"[,;]", text) if part.strip()]
+
+
+class _PatternSet:
+    """一组通配符规则，预先编译为两个正则表达式
+
+    不含 / 的规则只匹配名称，含 / 的规则匹配相对于扫描根目录的路径（以 / 分隔）。
+    """
+
+    def __init__(self, patterns):
+        self.patterns = tuple(patterns)
+        name_patterns = [p for p in self.patterns if "/" not in p]
+        path_patterns = [p.strip("/") for p in self.patterns if "/" in p]
+        self.name_regex = self._compile(name_patterns)
+        self.path_regex = self._compile(path_patterns)
+
+    @staticmethod
+    def _compile(patterns):
+        if not patterns:
+            return None
+        return re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in patterns), _MATCH_FLAGS)
+
+    def __bool__(self):
+        return bool(self.patterns)
+
+    def matches(self, name, relative_path):
+        """名称或相对路径与任一规则匹配；relative_path 为 None 时只匹配名称"""
+        if self.name_regex is not None and self.name_regex.match(name):
+            return True
+        return self.path_regex is not None and relative_path is not None and \
+            self.path_regex.match(relative_path) is not None
+
+    @property
+    def needs_path(self):
+        return self.path_regex is not None
+
+
+class ScanFilter:
+    """遍历时应用的过滤规则
+
+    prune 为目录剪枝规则，匹配的目录在遍历时直接跳过，其下的整棵子树都不会被列举；
+    include 和 exclude 为文件规则，设置了 include 时只保留匹配的文件，exclude 匹配的文件被丢弃；
+    extensions 为扩展名白名单（如 .jpg、.tar.gz，不区分大小写）；min_size 和 max_size 为
+    文件大小的上下限（字节，包含边界），只有设置时才需要对每个文件调用 stat。
+    规则中不含 / 时匹配文件名或目录名，含 / 时匹配相对于扫描根目录的路径，例如 build/*/tmp。
+    """
+
+    def __init__(self, include=(), exclude=(), prune=(), extensions=(), min_size=None, max_size=None):
+        if min_size is not None and max_size is not None and min_size > max_size:
+            raise ValueError(f"最小文件大小 {min_size} 大于最大文件大小 {max_size}")
+        self.include = _PatternSet(include)
+        self.exclude = _PatternSet(exclude)
+        self.prune = _PatternSet(prune)
+        self.extensions = tuple(sorted({self._normalize_extension(ext) for ext in extensions if ext.strip(". ")}))
+        self.min_size = min_size
+        self.max_size = max_size
+
+    @staticmethod
+    def _normalize_extension(ext):
+        ext = ext.strip().lower()
+        return ext if ext.startswith(".") else "." + ext
+
+    @property
+    def active(self):
+        """是否设置了任何规则"""
+        return bool(self.include or self.exclude or self.prune or self.extensions or self.size_bounded)
+
+    @property
+    def size_bounded(self):
+        """是否设置了文件大小限制"""
+        return self.min_size is not None or self.max_size is not None
+
+    def _relative(self, root_path, path, patterns):
+        """只有规则需要时才计算相对路径"""
+        if not any(p.needs_path for p in patterns) or not path.startswith(root_path):
+            return None
+        return path[len(root_path):].lstrip(os.sep).replace(os.sep, "/")
+
+    def accepts_dir(self, root_path, dir_path):
+        """目录是否需要遍历（根目录本身总是遍历）"""
+        if not self.prune or dir_path == root_path:
+            return True
+        return not self.prune.matches(os.path.basename(dir_path), self._relative(root_path, dir_path, (self.prune,)))
+
+    def accepts_name(self, root_path, path, name):
+        """按文件名和路径规则判断文件是否保留"""
+        if self.extensions and not name.lower().endswith(self.extensions):
+            return False
+        if not (self.include or self.exclude):
+            return True
+        relative_path = self._relative(root_path, path, (self.include, self.exclude))
+        if self.include and not self.include.matches(name, relative_path):
+            return False
+        return not (self.exclude and self.exclude.matches(name, relative_path))
+
+    def accepts_size(self, size):
+        """按大小限制判断文件是否保留"""
+        if self.min_size is not None and size < self.min_size:
+            return False
+        return self.max_size is None or size <= self.max_size
+
+    def accepts_path(self, root_path, path):
+        """判断根目录下任意一个文件是否保留（不检查大小），用于处理监视模式的文件事件
+
+        除文件名规则外，还要检查其所在的每一级目录是否被剪枝。
+        """
+        dir_path = os.path.dirname(path)
+        while dir_path.startswith(root_path) and dir_path != root_path:
+            if not self.accepts_dir(root_path, dir_path):
+                return False
+            dir_path = os.path.dirname(dir_path)
+        return self.accepts_name(root_path, path, os.path.basename(path))
+
+    def filter_listing(self, root_path, subdirs, files):
+        """过滤一个目录的列举结果，返回 (保留的子目录路径, 保留的文件条目)"""
+        if self.prune:
+            subdirs = [path for path in subdirs if self.accepts_dir(root_path, path)]
+        if self.include or self.exclude or self.extensions:
+            files = [entry for entry in files if self.accepts_name(root_path, entry.path, entry.name)]
+        return subdirs, files
+
+    def describe(self):
+        """返回规则的简短中文描述，用于界面状态栏"""
+        parts = []
+        if self.include:
+            parts.append("包含 " + ", ".join(self.include.patterns))
+        if self.exclude:
+            parts.append("排除 " + ", ".join(self.exclude.patterns))
+        if self.prune:
+            parts.append("跳过目录 " + ", ".join(self.prune.patterns))
+        if self.extensions:
+            parts.append("扩展名 " + ", ".join(self.extensions))
+        if self.min_size is not None:
+            parts.append(f"不小于 {self.min_size} 字节")
+        if self.max_size is not None:
+            parts.append(f"不大于 {self.max_size} 字节")
+        return "；".join(parts)
+
+    @staticmethod
+    def add_arguments(parser):
+        """添加过滤规则的命令行参数"""
+        group = parser.add_argument_group("过滤规则", "规则中不含 / 时匹配名称，含 / 时匹配相对于扫描根目录的路径")
+        group.add_argument("--include", action="append", default=[], metavar="GLOB",
+                           help="只扫描匹配的文件，可重复指定")
+        group.add_argument("--exclude", action="append", default=[], metavar="GLOB",
+                           help="跳过匹配的文件，可重复指定")
+        group.add_argument("--prune", action="append", default=[], metavar="GLOB",
+                           help="跳过匹配的目录及其下的整棵子树，可重复指定")
+        group.add_argument("--prune-common", action="store_true",
+                           help="跳过常见的版本库、依赖和缓存目录（" + ", ".join(COMMON_PRUNE_PATTERNS) + "）")
+        group.add_argument("--ext", action="append", default=[], metavar="EXT",
+                           help="只扫描这些扩展名的文件，可重复指定或以逗号分隔，例如 --ext jpg,png")
+        group.add_argument("--min-size", type=parse_size, default=None, help="跳过小于该大小的文件（如 4K）")
+        group.add_argument("--max-size", type=parse_size, default=None, help="跳过大于该大小的文件（如 2G）")
+
+    @classmethod
+    def from_args(cls, args):
+        """由命令行参数创建过滤规则，没有设置任何规则时返回 None"""
+        prune = list(args.prune) + (list(COMMON_PRUNE_PATTERNS) if args.prune_common else [])
+        extensions = [ext for value in args.ext for ext in split_patterns(value)]
+        scan_filter = cls(args.include, args.exclude, prune, extensions, args.min_size, args.max_size)
+        return scan_filter if scan_filter.active else None
@@ -0,0 +1,214 @@
+import os
+import sqlite3
+import threading
+
+
+class IndexedEntry:
+    """从扫描索引中恢复的文件条目，提供与 os.DirEntry 相同的常用接口"""
+    __slots__ = ('name', 'path', '_inode', '_stat')
+
+    def __init__(self, dir_path, name, inode=None):
+        self.name = name
+        self.path = os.path.join(dir_path, name)
+        self._inode = inode
+        self._stat = None
+
+    def inode(self):
+        if self._inode is None:
+            self._inode = self.stat().st_ino
+        return self._inode
+
+    def stat(self):
+        if self._stat is None:
+            self._stat = os.stat(self.path)
+        return self._stat
+
+
+class ScanIndex:
+    """基于 SQLite 的持久化扫描索引，用于增量扫描
+
+    以路径为键保存每个目录的 mtime 和子目录列表，以及每个文件的大小、mtime、
+    inode 和已计算的哈希。再次扫描时，mtime 未变的目录直接复用上次的列举结果；
+    文件的大小或 mtime 变化时才清除其哈希，使其被重新计算。
+
+    数据库连接可被多个遍历线程共享，所有操作都在内部锁中执行。
+    """
+    # 默认索引文件位置
+    DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".file_duplicate_checker", "scan_index.sqlite3")
+
+    # 每累计多少次写操作提交一次事务
+    COMMIT_INTERVAL = 2000
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or self.DEFAULT_PATH
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+        self.scan_id = 0
+
+    def _create_tables(self):
+        """创建索引表"""
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS dirs (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                subdirs TEXT NOT NULL,
+                scan_id INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                dir TEXT NOT NULL,
+                name TEXT NOT NULL,
+                size INTEGER,
+                mtime_ns INTEGER,
+                dev INTEGER,
+                ino INTEGER,
+                partial_hash BLOB,
+                full_hash BLOB,
+                scan_id INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS files_dir ON files(dir);
+        """)
+        self.conn.commit()
+
+    def _wrote(self, count=1):
+        """记录写操作，达到阈值时提交事务（调用方需持有锁）"""
+        self._pending_writes += count
+        if self._pending_writes >= self.COMMIT_INTERVAL:
+            self.conn.commit()
+            self._pending_writes = 0
+
+    def begin_scan(self, scan_id=None):
+        """开始新一轮扫描，返回本轮的扫描编号
+
+        继续暂停的扫描时传入暂停前的 scan_id，使两段扫描被视为同一轮。
+        """
+        if scan_id is not None:
+            self.scan_id = scan_id
+            return scan_id
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT MAX(m) FROM (SELECT MAX(scan_id) AS m FROM dirs UNION ALL SELECT MAX(scan_id) FROM files)"
+            ).fetchone()
+            self.scan_id = (row[0] or 0) + 1
+        return self.scan_id
+
+    def list_directory(self, dir_path, lister):
+        """列举目录，mtime 未变时复用索引中的结果，否则调用 lister 重新列举
+
+        lister(dir_path) 返回 (子目录路径列表, 文件条目列表)，本方法返回同样的结构。
+        目录无法访问时抛出 OSError。
+        """
+        mtime_ns = os.stat(dir_path).st_mtime_ns
+
+        with self._lock:
+            row = self.conn.execute("SELECT mtime_ns, subdirs FROM dirs WHERE path = ?", (dir_path,)).fetchone()
+            if row is not None and row[0] == mtime_ns:
+                # 目录内容未变化：复用上次的列举结果，并标记为本轮已见
+                files = [IndexedEntry(dir_path, name, ino) for name, ino in
+                         self.conn.execute("SELECT name, ino FROM files WHERE dir = ?", (dir_path,))]
+                self.conn.execute("UPDATE dirs SET scan_id = ? WHERE path = ?", (self.scan_id, dir_path))
+                self.conn.execute("UPDATE files SET scan_id = ? WHERE dir = ?", (self.scan_id, dir_path))
+                self._wrote(2)
+                subdirs = [os.path.join(dir_path, name) for name in row[1].split('\0') if name]
+                return subdirs, files
+
+        # 目录有变化或首次扫描：重新列举
+        subdirs, files = lister(dir_path)
+        self._store_listing(dir_path, mtime_ns, subdirs, files)
+        return subdirs, files
+
+    def _store_listing(self, dir_path, mtime_ns, subdirs, files):
+        """保存目录的列举结果，保留仍然存在的文件已有的统计信息和哈希"""
+        subdir_names = '\0'.join(os.path.basename(path) for path in subdirs)
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO dirs (path, mtime_ns, subdirs, scan_id) VALUES (?, ?, ?, ?)",
+                (dir_path, mtime_ns, subdir_names, self.scan_id))
+
+            existing = {name for (name,) in self.conn.execute("SELECT name FROM files WHERE dir = ?", (dir_path,))}
+            current = {entry.name for entry in files}
+            removed = existing - current
+            if removed:
+                self.conn.executemany("DELETE FROM files WHERE path = ?",
+                                      [(os.path.join(dir_path, name),) for name in removed])
+
+            # 同名文件被替换（inode 变化）时清除旧的统计信息和哈希
+            self.conn.executemany(
+                "INSERT INTO files (path, dir, name, ino, scan_id) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET "
+                "size = CASE WHEN ino IS excluded.ino THEN size END, "
+                "mtime_ns = CASE WHEN ino IS excluded.ino THEN mtime_ns END, "
+                "partial_hash = CASE WHEN ino IS excluded.ino THEN partial_hash END, "
+                "full_hash = CASE WHEN ino IS excluded.ino THEN full_hash END, "
+                "ino = excluded.ino, scan_id = excluded.scan_id",
+                [(entry.path, dir_path, entry.name, entry.inode(), self.scan_id) for entry in files])
+            self._wrote(len(files) + len(removed) + 1)
+
+    def sync_file_stats(self, dir_path, stats):
+        """更新目录下文件的大小、mtime、设备号和 inode
+
+        stats 为 (文件名, os.stat_result) 列表。只有统计信息变化的文件才会被写入，
+        并同时清除其已缓存的哈希。
+        """
+        with self._lock:
+            stored = {name: (size, mtime_ns, dev, ino) for name, size, mtime_ns, dev, ino in self.conn.execute(
+                "SELECT name, size, mtime_ns, dev, ino FROM files WHERE dir = ?", (dir_path,))}
+            changed = []
+            for name, st in stats:
+                current = (st.st_size, st.st_mtime_ns, st.st_dev, st.st_ino)
+                if stored.get(name) != current:
+                    changed.append(current + (self.scan_id, os.path.join(dir_path, name), dir_path, name))
+            if changed:
+                self.conn.executemany(
+                    "INSERT INTO files (size, mtime_ns, dev, ino, scan_id, path, dir, name) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(path) DO UPDATE SET size = excluded.size, mtime_ns = excluded.mtime_ns, "
+                    "dev = excluded.dev, ino = excluded.ino, scan_id = excluded.scan_id, "
+                    "partial_hash = NULL, full_hash = NULL",
+                    changed)
+                self._wrote(len(changed))
+
+    def get_hash(self, path, kind):
+        """读取已缓存的哈希，kind 为 'partial' 或 'full'；没有缓存时返回 None"""
+        column = self._hash_column(kind)
+        with self._lock:
+            row = self.conn.execute(f"SELECT {column} FROM files WHERE path = ?", (path,)).fetchone()
+        return row[0] if row else None
+
+    def set_hash(self, path, kind, digest):
+        """缓存文件的哈希"""
+        column = self._hash_column(kind)
+        with self._lock:
+            self.conn.execute(f"UPDATE files SET {column} = ? WHERE path = ?", (digest, path))
+            self._wrote()
+
+    @staticmethod
+    def _hash_column(kind):
+        if kind not in ('partial', 'full'):
+            raise ValueError(f"未知的哈希类型: {kind}")
+        return f"{kind}_hash"
+
+    def finish_scan(self, root_path):
+        """完整扫描结束后，删除 root_path 下本轮未再出现的目录和文件"""
+        prefix_start = root_path.rstrip(os.sep) + os.sep
+        prefix_end = root_path.rstrip(os.sep) + chr(ord(os.sep) + 1)
+        with self._lock:
+            for table in ('dirs', 'files'):
+                self.conn.execute(
+                    f"DELETE FROM {table} WHERE scan_id < ? AND (path = ? OR (path >= ? AND path < ?))",
+                    (self.scan_id, root_path, prefix_start, prefix_end))
+            self.conn.commit()
+            self._pending_writes = 0
+
+    def close(self):
+        """提交未保存的修改并关闭数据库"""
+        with self._lock:
+            self.conn.commit()
+            self.conn.close()
@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import heapq
+import threading
+
+
+class ScanMetrics:
+    """扫描过程的性能指标
+
+    记录各阶段的墙钟时间和 CPU 时间、目录列举、stat 和哈希的次数、字节数和耗时，
+    I/O 限速造成的等待，以及列举最慢的若干个目录。所有记录方法都是线程安全的，可以被遍历线程和哈希线程
+    同时调用；summary() 返回可直接序列化为 JSON 的字典。
+    """
+    PHASE_WALK = "walk"
+    PHASE_HASH = "hash"
+    PHASE_DISPLAY = "display"
+
+    # 保留的最慢目录个数
+    SLOWEST_DIRECTORIES = 10
+
+    STATE_RUNNING = "running"
+    STATE_FINISHED = "finished"
+    STATE_CANCELLED = "cancelled"
+    STATE_PAUSED = "paused"
+    STATE_FAILED = "failed"
+
+    def __init__(self, root_path=None, match_mode=None):
+        self._lock = threading.Lock()
+        self.root_path = root_path
+        self.match_mode = match_mode
+        self.state = self.STATE_RUNNING
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self._finished = None
+
+        # 阶段名 -> [墙钟时间, CPU 时间]；当前阶段另记开始时刻
+        self.phases = {}
+        self._phase = None
+        self._phase_start = None
+
+        self.directories = 0
+        self.entries = 0
+        self.list_seconds = 0.0
+        self.stats = 0
+        self.stat_seconds = 0.0
+        self.hashed = {'partial': [0, 0, 0.0], 'full': [0, 0, 0.0]}
+        self.cache_hits = 0
+        # I/O 限速的等待次数和总等待时间
+        self.throttle_waits = 0
+        self.throttle_seconds = 0.0
+        # 最慢目录的小顶堆：(耗时, 路径, 条目数)
+        self._slowest = []
+
+        self._live_thread = None
+        self._live_stop = None
+
+    def begin_phase(self, phase):
+        """结束当前阶段（如果有）并开始新阶段"""
+        with self._lock:
+            self._end_phase()
+            self._phase = phase
+            self._phase_start = (time.perf_counter(), time.process_time())
+
+    def finish(self, state=STATE_FINISHED):
+        """结束当前阶段，记录扫描的最终状态"""
+        with self._lock:
+            self._end_phase()
+            self.state = state
+            self._finished = time.perf_counter()
+
+    def _end_phase(self):
+        """结束当前阶段（调用方需持有锁）"""
+        if self._phase is None:
+            return
+        wall, cpu = self._phase_elapsed()
+        totals = self.phases.setdefault(self._phase, [0.0, 0.0])
+        totals[0] += wall
+        totals[1] += cpu
+        self._phase = None
+
+    def _phase_elapsed(self):
+        start_wall, start_cpu = self._phase_start
+        return time.perf_counter() - start_wall, time.process_time() - start_cpu
+
+    def add_phase_time(self, phase, wall, cpu=0.0):
+        """累加在扫描线程之外测量的阶段耗时，例如界面显示结果的时间"""
+        with self._lock:
+            totals = self.phases.setdefault(phase, [0.0, 0.0])
+            totals[0] += wall
+            totals[1] += cpu
+
+    def record_directory(self, dir_path, seconds, entries):
+        """记录一次目录列举"""
+        with self._lock:
+            self.directories += 1
+            self.entries += entries
+            self.list_seconds += seconds
+            item = (seconds, dir_path, entries)
+            if len(self._slowest) < self.SLOWEST_DIRECTORIES:
+                heapq.heappush(self._slowest, item)
+            elif seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, item)
+
+    def record_stats(self, count, seconds):
+        """记录一批 stat 调用"""
+        with self._lock:
+            self.stats += count
+            self.stat_seconds += seconds
+
+    def record_hash(self, kind, nbytes, seconds):
+        """记录一次哈希计算，kind 为 'partial' 或 'full'"""
+        with self._lock:
+            totals = self.hashed[kind]
+            totals[0] += 1
+            totals[1] += nbytes
+            totals[2] += seconds
+
+    def record_cache_hit(self):
+        """记录一次从缓存中得到哈希、无需读取文件"""
+        with self._lock:
+            self.cache_hits += 1
+
+    def record_throttle(self, seconds):
+        """记录一次因 I/O 限速而等待"""
+        with self._lock:
+            self.throttle_waits += 1
+            self.throttle_seconds += seconds
+
+    def summary(self):
+        """返回当前指标的快照"""
+        with self._lock:
+            phases = {phase: list(totals) for phase, totals in self.phases.items()}
+            if self._phase is not None:
+                # 正在进行的阶段计入到目前为止的耗时
+                wall, cpu = self._phase_elapsed()
+                totals = phases.setdefault(self._phase, [0.0, 0.0])
+                totals[0] += wall
+                totals[1] += cpu
+            end = self._finished if self._finished is not None else time.perf_counter()
+            walk_wall = phases.get(self.PHASE_WALK, [0.0])[0]
+            hash_wall = phases.get(self.PHASE_HASH, [0.0])[0]
+            hashed_bytes = self.hashed['partial'][1] + self.hashed['full'][1]
+
+            def rate(count, seconds):
+                return count / seconds if seconds > 0 else None
+
+            return {
+                'root': self.root_path,
+                'mode': self.match_mode,
+                'state': self.state,
+                'current_phase': self._phase,
+                'started_at': time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+                'elapsed': end - self._started,
+                'phases': {phase: {'wall': wall, 'cpu': cpu} for phase, (wall, cpu) in phases.items()},
+                'directories': {'count': self.directories, 'per_sec': rate(self.directories, walk_wall),
+                                'list_seconds': self.list_seconds},
+                'entries': {'count': self.entries, 'per_sec': rate(self.entries, walk_wall)},
+                'stat': {'count': self.stats, 'seconds': self.stat_seconds},
+                'hash': {
+                    'files': self.hashed['partial'][0] + self.hashed['full'][0],
+                    'bytes': hashed_bytes,
+                    'bytes_per_sec': rate(hashed_bytes, hash_wall),
+                    'partial': {'files': self.hashed['partial'][0], 'bytes': self.hashed['partial'][1],
+                                'seconds': self.hashed['partial'][2]},
+                    'full': {'files': self.hashed['full'][0], 'bytes': self.hashed['full'][1],
+                             'seconds': self.hashed['full'][2]},
+                    'cache_hits': self.cache_hits,
+                },
+                'throttle': {'waits': self.throttle_waits, 'seconds': self.throttle_seconds},
+                'slowest_directories': [{'path': path, 'seconds': seconds, 'entries': entries}
+                                        for seconds, path, entries in sorted(self._slowest, reverse=True)],
+            }
+
+    def write_json(self, path):
+        """把指标快照写入 JSON 文件：先写临时文件再替换，读取方不会读到写了一半的文件"""
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+
+    def start_live(self, path, interval=5.0):
+        """在后台线程中每隔 interval 秒把指标写入 path，便于监控长时间运行的扫描"""
+        self.stop_live()
+        stop = threading.Event()
+
+        def writer():
+            while True:
+                # 停止请求到达后仍会写入一次，使文件包含最终的指标
+                stopping = stop.is_set()
+                try:
+                    self.write_json(path)
+                except OSError:
+                    pass
+                if stopping:
+                    break
+                stop.wait(interval)
+
+        self._live_stop = stop
+        self._live_thread = threading.Thread(target=writer, daemon=True)
+        self._live_thread.start()
+
+    def stop_live(self):
+        """停止后台写入；停止前会再写入一次最终的指标"""
+        if self._live_thread is not None:
+            self._live_stop.set()
+            self._live_thread.join()
+            self._live_thread = None
+            self._live_stop = None
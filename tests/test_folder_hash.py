@@ -0,0 +1,41 @@
+import os
+
+from folder_hash import FolderHasher
+
+
+def _hasher(files):
+    """files 为 [(路径, 内容标识)]，大小都取 100"""
+    hasher = FolderHasher(["/r"])
+    for path, token in files:
+        hasher.add_file(path, 100, token)
+    return hasher
+
+
+def test_copies_of_duplicate_folders_are_covered():
+    hasher = _hasher([("/r/A/f", "t1"), ("/r/A/g", "t2"), ("/r/B/f", "t1"), ("/r/B/g", "t2")])
+    groups = hasher.compute()
+    assert [paths for _, _, _, paths in groups] == [["/r/A", "/r/B"]]
+    assert hasher.covers(["/r/A/f", "/r/B/f"])
+
+
+def test_duplicates_inside_one_copy_are_not_covered():
+    # A/f1 和 A/f2 相同：保留 A 之后这组重复仍然存在，不能由 A ≡ B 的结果代替
+    hasher = _hasher([("/r/A/f1", "t"), ("/r/A/f2", "t"), ("/r/B/f1", "t"), ("/r/B/f2", "t")])
+    hasher.compute()
+    assert not hasher.covers(["/r/A/f1", "/r/A/f2", "/r/B/f1", "/r/B/f2"])
+
+
+def test_files_with_different_names_are_not_covered():
+    hasher = _hasher([("/r/A/f", "t"), ("/r/A/g", "u"), ("/r/B/f", "t"), ("/r/B/g", "u")])
+    hasher.compute()
+    assert not hasher.covers(["/r/A/f", "/r/B/g"])
+
+
+def test_nested_duplicate_folders_inside_one_copy_are_listed():
+    files = []
+    for top in ("A", "B"):
+        for sub in ("x", "y"):
+            files.append((os.path.join("/r", top, sub, "h"), "t"))
+    groups = {tuple(paths) for _, _, _, paths in _hasher(files).compute()}
+    assert ("/r/A", "/r/B") in groups
+    assert ("/r/A/x", "/r/A/y", "/r/B/x", "/r/B/y") in groups
@@ -0,0 +1,42 @@
+import threading
+
+from hash_scheduler import HashScheduler
+
+
+def _collect(scheduler, outcome):
+    try:
+        outcome['results'] = list(scheduler.results())
+    except Exception as e:
+        outcome['error'] = e
+
+
+def test_non_oserror_is_raised_by_results(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"f{i}"
+        path.write_bytes(b"x")
+        paths.append(str(path))
+
+    def hash_func(path):
+        if path == paths[1]:
+            raise ValueError("索引数据库出错")
+        return path
+
+    outcome = {}
+    with HashScheduler() as scheduler:
+        for path in paths:
+            scheduler.submit(path, path, hash_func)
+        consumer = threading.Thread(target=_collect, args=(scheduler, outcome), daemon=True)
+        consumer.start()
+        consumer.join(timeout=5)
+    assert not consumer.is_alive(), "results() 一直在等待抛出异常的任务"
+    assert isinstance(outcome.get('error'), ValueError)
+
+
+def test_oserror_is_returned_as_result(tmp_path):
+    missing = str(tmp_path / "missing")
+    with HashScheduler() as scheduler:
+        scheduler.submit('tag', missing, lambda path: open(path).read(), device=0)
+        results = list(scheduler.results())
+    assert len(results) == 1
+    assert isinstance(results[0][2], FileNotFoundError)
@@ -0,0 +1,89 @@
+import os
+import re
+import sys
+import threading
+
+import pytest
+
+import io_throttle
+from io_throttle import IOThrottle
+
+
+# 各架构内核头文件中 ioprio_set 的定义，存在时与 io_throttle 中的系统调用号核对
+SYSCALL_HEADERS = {
+    "x86_64": ("/usr/include/x86_64-linux-gnu/asm/unistd_64.h", "/usr/include/asm/unistd_64.h"),
+    "i386": ("/usr/include/x86_64-linux-gnu/asm/unistd_32.h", "/usr/include/i386-linux-gnu/asm/unistd_32.h",
+             "/usr/include/asm/unistd_32.h"),
+    "aarch64": ("/usr/include/asm-generic/unistd.h",),
+    "armv7l": ("/usr/include/arm-linux-gnueabihf/asm/unistd-eabi.h",),
+}
+
+
+@pytest.mark.parametrize("machine", sorted(SYSCALL_HEADERS))
+def test_ioprio_syscall_numbers_match_headers(machine):
+    for header in SYSCALL_HEADERS[machine]:
+        if os.path.exists(header):
+            break
+    else:
+        pytest.skip("没有该架构的系统调用头文件")
+    with open(header) as f:
+        match = re.search(r"#define\s+__NR_ioprio_set\s+(?:\(__NR_SYSCALL_BASE\s*\+\s*)?(\d+)", f.read())
+    assert match is not None
+    assert io_throttle._IOPRIO_SYSCALLS[machine] == int(match.group(1))
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux") or os.uname().machine != "x86_64",
+                    reason="只在 x86_64 Linux 上读取 ioprio 验证")
+def test_idle_priority_applies_to_calling_thread_only():
+    import ctypes
+    libc = ctypes.CDLL(None, use_errno=True)
+    ioprio_get = 252
+    result = {}
+
+    def worker():
+        result['applied'] = io_throttle.set_idle_priority()
+        result['ioprio'] = libc.syscall(ioprio_get, io_throttle._IOPRIO_WHO_PROCESS, 0)
+        result['nice'] = os.nice(0)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    assert "idle I/O" in result['applied']
+    assert result['ioprio'] >> io_throttle._IOPRIO_CLASS_SHIFT == io_throttle._IOPRIO_CLASS_IDLE
+    assert result['nice'] == 19
+    # 调用线程之外的线程不受影响
+    assert os.nice(0) != 19
+
+
+def test_wait_stops_when_scan_is_cancelled():
+    throttle = IOThrottle(bytes_per_sec=1000)
+    running = threading.Event()
+    running.set()
+    throttle.bind(running.is_set)
+    threading.Timer(0.2, running.clear).start()
+    thread = threading.Thread(target=throttle.read, args=(100000,))
+    thread.start()
+    thread.join(timeout=2)
+    assert not thread.is_alive()
+
+
+def test_adaptive_backoff_and_recovery():
+    throttle = IOThrottle(adaptive=True)
+    throttle.ADJUST_INTERVAL = 0
+    throttle._sleep = lambda seconds: None
+    for _ in range(200):
+        throttle.observe(IOThrottle.KIND_READ, 0.001)
+    assert throttle.slowdown == 1.0
+    for _ in range(3):
+        throttle.observe(IOThrottle.KIND_READ, 0.02)
+    assert throttle.slowdown > 1.0
+    for _ in range(300):
+        throttle.observe(IOThrottle.KIND_READ, 0.001)
+    assert throttle.slowdown == 1.0
+
+
+def test_invalid_rates_are_rejected():
+    with pytest.raises(ValueError):
+        IOThrottle(bytes_per_sec=0)
+    with pytest.raises(ValueError):
+        IOThrottle(ops_per_sec=-1)
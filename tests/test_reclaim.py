@@ -0,0 +1,263 @@
+import os
+import json
+
+import pytest
+
+import reclaim
+from reclaim import (ACTION_DELETE, ACTION_HARDLINK, ACTION_REFLINK, KEEP_PREFERRED_ROOT, ReclaimJournal, Reclaimer,
+                     build_plan)
+
+
+class Crash(BaseException):
+    """模拟进程在执行途中被杀死：不是 OSError，不会被 Reclaimer 当作单个文件的失败处理"""
+
+
+def _make_groups(tmp_path, groups=3, copies=3):
+    """每组 copies 个内容相同的文件，组内第一个文件最新，按 newest 策略保留它"""
+    result = []
+    for g in range(groups):
+        data = (f"group {g} " * 500).encode()
+        paths = []
+        for c in range(copies):
+            path = tmp_path / f"d{c}" / f"f{g}"
+            path.parent.mkdir(exist_ok=True)
+            path.write_bytes(data)
+            mtime = 1_000_000_000 + (copies - c)
+            os.utime(path, (mtime, mtime))
+            paths.append(str(path))
+        result.append((len(data), paths))
+    return result
+
+
+def _originals(groups):
+    """每个文件的 (内容, inode, 权限, mtime)"""
+    originals = {}
+    for _, paths in groups:
+        for path in paths:
+            st = os.stat(path)
+            with open(path, "rb") as f:
+                originals[path] = (f.read(), st.st_ino, st.st_mode, st.st_mtime_ns)
+    return originals
+
+
+def _journal(tmp_path, groups, action, batch_size=2):
+    plan = build_plan(groups, action)
+    assert len(plan.actions) == sum(len(paths) - 1 for _, paths in groups)
+    return ReclaimJournal.create(str(tmp_path / "journal.jsonl"), plan, batch_size)
+
+
+def _results(journal_path):
+    """日志中每个处理编号的结果记录列表"""
+    results = {}
+    with open(journal_path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if record['type'] in ('done', 'skipped', 'failed'):
+                results.setdefault(record['id'], []).append(record['type'])
+    return results
+
+
+def _assert_independent_copies(originals):
+    """每个文件都恢复为原来的内容和元数据，且不再与其他文件共享 inode"""
+    inodes = set()
+    for path, (data, _, mode, mtime_ns) in originals.items():
+        st = os.stat(path)
+        with open(path, "rb") as f:
+            assert f.read() == data
+        assert st.st_mode == mode
+        assert st.st_mtime_ns == mtime_ns
+        assert st.st_nlink == 1
+        inodes.add(st.st_ino)
+    assert len(inodes) == len(originals)
+
+
+@pytest.mark.parametrize("action", [ACTION_HARDLINK, ACTION_DELETE])
+def test_run_and_rollback(tmp_path, action):
+    groups = _make_groups(tmp_path)
+    originals = _originals(groups)
+    journal = _journal(tmp_path, groups, action)
+    reclaimer = Reclaimer(journal)
+    assert reclaimer.run()
+    for _, (keep, *targets) in groups:
+        for target in targets:
+            if action == ACTION_HARDLINK:
+                assert os.stat(target).st_ino == os.stat(keep).st_ino
+            else:
+                assert not os.path.exists(target)
+    assert reclaimer.rollback() == []
+    journal.close()
+    _assert_independent_copies(originals)
+
+
+def test_failure_partway_leaves_target_untouched(tmp_path, monkeypatch):
+    groups = _make_groups(tmp_path)
+    originals = _originals(groups)
+    journal = _journal(tmp_path, groups, ACTION_HARDLINK)
+    real_replace = os.replace
+    calls = []
+
+    def failing_replace(src, dst):
+        calls.append(dst)
+        if len(calls) == 3:
+            raise OSError("磁盘已满")
+        return real_replace(src, dst)
+
+    monkeypatch.setattr(reclaim.os, "replace", failing_replace)
+    reclaimer = Reclaimer(journal)
+    assert reclaimer.run()
+    monkeypatch.undo()
+    failed = calls[2]
+    assert reclaimer.counts['failed'] == 1
+    assert os.stat(failed).st_ino == originals[failed][1]
+    # 临时文件已清理
+    assert not [name for name in os.listdir(os.path.dirname(failed)) if name.endswith(".tmp")]
+
+    assert reclaimer.rollback() == []
+    journal.close()
+    _assert_independent_copies(originals)
+
+
+@pytest.mark.parametrize("action", [ACTION_HARDLINK, ACTION_DELETE])
+def test_crash_mid_batch_then_rollback(tmp_path, monkeypatch, action):
+    groups = _make_groups(tmp_path)
+    originals = _originals(groups)
+    journal = _journal(tmp_path, groups, action)
+    name = "replace" if action == ACTION_HARDLINK else "remove"
+    real = getattr(os, name)
+    calls = []
+
+    def crashing(*args):
+        calls.append(args)
+        if len(calls) == 4:
+            # 临时硬链接已创建（或文件即将被删除）时进程被杀死
+            raise Crash()
+        return real(*args)
+
+    monkeypatch.setattr(reclaim.os, name, crashing)
+    with pytest.raises(Crash):
+        Reclaimer(journal).run()
+    monkeypatch.undo()
+    journal.close()
+
+    journal = ReclaimJournal.load(journal.path)
+    assert journal.begun - set(journal.status)
+    errors = Reclaimer(journal).rollback()
+    journal.close()
+    assert errors == []
+    _assert_independent_copies(originals)
+    assert not [name for name in os.listdir(tmp_path / "d1") if name.endswith(".tmp")]
+
+
+@pytest.mark.parametrize("action", [ACTION_HARDLINK, ACTION_DELETE])
+def test_resume_after_crash_does_not_repeat_actions(tmp_path, monkeypatch, action):
+    groups = _make_groups(tmp_path)
+    journal = _journal(tmp_path, groups, action)
+    real_record = ReclaimJournal.record
+    done = []
+
+    def crash_before_recording(self, kind, sync=False, **fields):
+        # 文件已处理，结果还没写入日志时进程被杀死
+        if kind == 'done':
+            done.append(fields['id'])
+            if len(done) == 3:
+                raise Crash()
+        return real_record(self, kind, sync, **fields)
+
+    monkeypatch.setattr(ReclaimJournal, "record", crash_before_recording)
+    with pytest.raises(Crash):
+        Reclaimer(journal).run()
+    monkeypatch.undo()
+    journal.close()
+
+    journal = ReclaimJournal.load(journal.path)
+    # 硬链接通过 os.link 创建临时链接，删除通过 os.remove 删除目标文件
+    name = "link" if action == ACTION_HARDLINK else "remove"
+    real = getattr(os, name)
+    applied = []
+    monkeypatch.setattr(reclaim.os, name, lambda *args: applied.append(args[-1]) or real(*args))
+    reclaimer = Reclaimer(journal)
+    assert reclaimer.run()
+    monkeypatch.undo()
+    journal.close()
+
+    # 已记录完成的处理和中断时已执行、但结果未写入日志的处理都不再执行
+    action_paths = [a.temp_path if action == ACTION_HARDLINK else a.target for a in journal.actions]
+    assert [path for path in applied if path in action_paths] == action_paths[3:]
+    results = _results(journal.path)
+    assert sorted(results) == [a.id for a in journal.actions]
+    assert all(kinds == ['done'] for kinds in results.values())
+    for _, (keep, *targets) in groups:
+        for target in targets:
+            if action == ACTION_HARDLINK:
+                assert os.stat(target).st_ino == os.stat(keep).st_ino
+            else:
+                assert not os.path.exists(target)
+
+
+def test_stopped_run_resumes_remaining_actions_once(tmp_path):
+    groups = _make_groups(tmp_path)
+    journal = _journal(tmp_path, groups, ACTION_HARDLINK)
+    budget = [3]
+
+    def keep_running():
+        budget[0] -= 1
+        return budget[0] >= 0
+
+    assert not Reclaimer(journal, keep_running=keep_running).run()
+    journal.close()
+
+    journal = ReclaimJournal.load(journal.path)
+    reclaimer = Reclaimer(journal)
+    assert reclaimer.run()
+    journal.close()
+    assert reclaimer.processed == len(journal.actions) - 3
+    results = _results(journal.path)
+    assert all(kinds == ['done'] for kinds in results.values())
+    assert len(results) == len(journal.actions)
+
+
+def test_modified_target_is_skipped(tmp_path):
+    groups = _make_groups(tmp_path, groups=1)
+    journal = _journal(tmp_path, groups, ACTION_DELETE)
+    changed = groups[0][1][1]
+    with open(changed, "ab") as f:
+        f.write(b"!")
+    reclaimer = Reclaimer(journal)
+    assert reclaimer.run()
+    journal.close()
+    assert os.path.exists(changed)
+    assert reclaimer.counts['skipped'] == 1
+
+
+def test_reflink_failure_keeps_target(tmp_path, monkeypatch):
+    groups = _make_groups(tmp_path, groups=1)
+    originals = _originals(groups)
+    journal = _journal(tmp_path, groups, ACTION_REFLINK)
+
+    def unsupported(action):
+        # 在临时文件中克隆之后、替换目标文件之前失败
+        open(action.temp_path, "xb").close()
+        raise OSError("文件系统不支持 reflink")
+
+    monkeypatch.setattr(Reclaimer, "_reflink", staticmethod(unsupported))
+    reclaimer = Reclaimer(journal)
+    assert reclaimer.run()
+    journal.close()
+    assert reclaimer.counts['failed'] == len(journal.actions)
+    _assert_independent_copies(originals)
+    assert not [name for name in os.listdir(tmp_path / "d1") if name.endswith(".tmp")]
+
+
+def test_nested_preferred_roots_keep_their_order(tmp_path):
+    keep = tmp_path / "a" / "keep" / "f"
+    other = tmp_path / "b" / "f"
+    for path, mtime in ((keep, 1_000_000_000), (other, 1_000_000_001)):
+        path.parent.mkdir(parents=True)
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (mtime, mtime))
+    groups = [(100, [str(other), str(keep)])]
+    # 位于外层根目录中的另一份更新，但内层根目录排在前面
+    plan = build_plan(groups, ACTION_DELETE, KEEP_PREFERRED_ROOT,
+                      [str(tmp_path / "a" / "keep"), str(tmp_path), str(tmp_path) + os.sep])
+    assert plan.preferred_roots == [str(tmp_path / "a" / "keep"), str(tmp_path)]
+    assert [(a.keep, a.target) for a in plan.actions] == [(str(keep), str(other))]